@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+"""
+Title Classifier Benchmark
+--------------------------
+Compares the compiled single-pass classifier in title_classifier.py with the
+original substring scans (three `any(kw in title)` loops) on synthetic titles.
+
+Usage:
+    python benchmarks/bench_classifier.py              # 1M titles
+    python benchmarks/bench_classifier.py --titles 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from title_classifier import (  # noqa: E402
+    EXCLUDE_TERMS, INTERNSHIP_KEYWORDS, IT_KEYWORDS, is_it_engineering_internship
+)
+
+SENIORITY = ["", "junior", "graduate", "summer", "2025", "6 month", "m/f/d", "h/f"]
+ROLES = [
+    "software engineer", "backend developer", "frontend developer", "data scientist",
+    "devops engineer", "cloud engineer", "qa engineer", "security analyst",
+    "mechanical engineer", "sales", "marketing", "finance", "recruiter",
+    "business development", "product manager", "it support", "ingénieur logiciel",
+    "développeur web", "werkstudent softwareentwicklung", "machine learning engineer",
+]
+CONTRACTS = ["intern", "internship", "interns", "stage", "alternance", "trainee", "",
+             "apprenticeship", "full time"]
+EXTRAS = ["", "python", "java", "react", "c++", "aws", "kubernetes", "paris",
+          "berlin", "remote", "hybrid", "(all genders)"]
+
+
+def legacy_is_it_engineering_internship(title: str) -> bool:
+    """The substring-scan check the classifier replaced, kept for comparison."""
+    title_lower = title.lower()
+    is_it = any(keyword in title_lower for keyword in IT_KEYWORDS)
+    is_internship = any(keyword in title_lower for keyword in INTERNSHIP_KEYWORDS)
+    has_exclusion = any(term in title_lower for term in EXCLUDE_TERMS)
+    return is_it and is_internship and not has_exclusion
+
+
+def generate_titles(count: int, seed: int) -> List[str]:
+    """Generate realistic-looking job titles."""
+    rng = random.Random(seed)
+    titles = []
+    for _ in range(count):
+        parts = [rng.choice(SENIORITY), rng.choice(ROLES), rng.choice(CONTRACTS),
+                 rng.choice(EXTRAS)]
+        title = " ".join(part for part in parts if part)
+        titles.append(title.title() if rng.random() < 0.5 else title)
+    return titles
+
+
+def time_classifier(classify: Callable[[str], bool], titles: List[str]) -> float:
+    """Return titles classified per second."""
+    start = time.perf_counter()
+    for title in titles:
+        classify(title)
+    return len(titles) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the job title classifier")
+    parser.add_argument("--titles", type=int, default=1_000_000,
+                        help="Number of synthetic titles (default: 1000000)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    titles = generate_titles(args.titles, args.seed)
+    print(f"Classifying {len(titles)} synthetic titles")
+
+    legacy_rate = time_classifier(legacy_is_it_engineering_internship, titles)
+    compiled_rate = time_classifier(is_it_engineering_internship, titles)
+    disagreements = sum(
+        1 for title in titles
+        if legacy_is_it_engineering_internship(title) != is_it_engineering_internship(title)
+    )
+
+    print(f"Substring scans:     {legacy_rate:>12,.0f} titles/s")
+    print(f"Compiled classifier: {compiled_rate:>12,.0f} titles/s "
+          f"({compiled_rate / legacy_rate:.1f}x)")
+    print(f"Titles with a different verdict (whole-word matching): {disagreements}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+"""
+Pipeline Benchmark
+------------------
+Times the filter/format stages of it_internship.py on synthetic results files
+and reports the numbers as JSON, so runs on two commits can be compared:
+1. Corpora of 10k, 100k and 1M rows are generated like it_results.csv, with
+   reposted links (tracking parameters, other LinkedIn domains), mixed date
+   formats (ISO, "DD Mon YYYY", English and French relative dates, blanks)
+   and titles in English, French, German, Spanish and Italian
+2. Each stage runs in its own process on a fresh copy of the corpus, so its
+   peak RSS is its own: read_csv_data, is_it_engineering_internship,
+   filter_it_internships, filter_recent_internships and format_telegram_message
+3. Every result has the stage's seconds, rows/s and peak RSS
+
+Usage:
+    python benchmarks/bench_pipeline.py                         # 10k, 100k and 1M rows
+    python benchmarks/bench_pipeline.py --sizes 10000 --output before.json
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from internship_record import RESULT_FIELDS  # noqa: E402
+
+STAGES = ["read_csv_data", "is_it_engineering_internship", "filter_it_internships",
+          "filter_recent_internships", "format_telegram_message"]
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+# Share of rows that repeat an earlier posting under a different link
+DUPLICATE_SHARE = 0.2
+
+TITLES = [
+    "Software Engineering Intern", "Backend Developer Intern (m/f/d)", "Data Science Internship",
+    "IT Support Trainee", "Cloud Engineer Intern - Summer 2025", "Marketing Intern",
+    "Sales Development Intern", "Finance Internship", "Mechanical Engineering Intern",
+    "Stage Développeur Web H/F", "Alternance Ingénieur DevOps", "Stage - Data Analyst",
+    "Alternance Chef de projet marketing", "Werkstudent Softwareentwicklung (w/m/d)",
+    "Praktikum IT-Sicherheit", "Praktikant Vertrieb", "Becario Desarrollo de Software",
+    "Prácticas Ingeniería Informática", "Stage Sviluppatore Java", "Tirocinio Ingegneria del Software",
+    "Machine Learning Engineer Intern 🚀", "Senior Software Engineer", "QA Automation Intern",
+]
+COMPANIES = ["Google", "Microsoft", "Capgemini", "SAP SE", "Accenture", "Société Générale",
+             "Zalando SE", "Deutsche Bank AG", "Banco Santander S.A.", "Unicredit S.p.A."]
+LOCATIONS = ["Paris, Île-de-France, France", "Berlin, Berlin, Germany", "Madrid, Spain",
+             "Milano, Lombardia, Italy", "London, England, United Kingdom", "Amsterdam, Netherlands",
+             "München, Bayern, Deutschland", "Lyon, Auvergne-Rhône-Alpes, France"]
+LINK_VARIANTS = [
+    "https://www.linkedin.com/jobs/view/{id}",
+    "https://fr.linkedin.com/jobs/view/stage-developpeur-at-acme-{id}?refId=abc%3D&trackingId=x",
+    "https://de.linkedin.com/jobs/view/{id}/?position=3&pageNum=0",
+    "https://www.linkedin.com/jobs/search/?currentJobId={id}&keywords=intern",
+]
+
+
+def random_date(rng: random.Random, today: datetime.date) -> str:
+    """A posting date in one of the formats found in real results files."""
+    age = rng.randint(0, 45)
+    kind = rng.random()
+    if kind < 0.6:
+        return (today - datetime.timedelta(days=age)).isoformat()
+    if kind < 0.75:
+        return (today - datetime.timedelta(days=age)).strftime('%d %b %Y')
+    if kind < 0.85:
+        return rng.choice([f"{age} days ago", f"Reposted {max(age // 7, 1)} weeks ago", "yesterday"])
+    if kind < 0.95:
+        return rng.choice([f"il y a {age} jours", "il y a 1 semaine", "aujourd'hui"])
+    return ""
+
+
+def generate_corpus(path: Path, rows: int, seed: int) -> None:
+    """Write a synthetic it_results.csv of `rows` rows."""
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    companies = [f"{company} {i}" if i else company for company in COMPANIES for i in range(50)]
+    job_ids: List[int] = []
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write("|".join(RESULT_FIELDS) + "\n")
+        for _ in range(rows):
+            if job_ids and rng.random() < DUPLICATE_SHARE:
+                job_id = rng.choice(job_ids)
+            else:
+                job_id = rng.randint(10**9, 10**10)
+                job_ids.append(job_id)
+            link = rng.choice(LINK_VARIANTS).format(id=job_id)
+            file.write(f"{rng.choice(companies)}|{rng.choice(TITLES)}|{rng.choice(LOCATIONS)}|"
+                       f"{link}|{random_date(rng, today)}\n")
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_stage(stage: str, project_root: Path) -> Dict[str, Any]:
+    """Time one stage in this process (see --worker)."""
+    os.environ["PROJECT_ROOT"] = str(project_root)
+    with contextlib.redirect_stdout(io.StringIO()):
+        import it_internship
+        from title_classifier import is_it_engineering_internship
+
+        results_file = str(it_internship.RESULTS_FILE)
+        # Inputs of the later stages are prepared outside the timed section
+        internships = it_internship.read_csv_data(results_file) if stage != "read_csv_data" else []
+        if stage == "format_telegram_message":
+            internships = it_internship.filter_recent_internships(internships, days=3)
+        titles = [internship.title for internship in internships]
+        with open(results_file, encoding='utf-8') as file:
+            rows = sum(1 for _ in file) - 1
+        baseline = peak_rss_mb()
+
+        start = time.perf_counter()
+        if stage == "read_csv_data":
+            items = len(it_internship.read_csv_data(results_file))
+        elif stage == "is_it_engineering_internship":
+            for title in titles:
+                is_it_engineering_internship(title)
+            items = len(titles)
+        elif stage == "filter_it_internships":
+            it_internship.filter_it_internships([results_file])
+            items = rows
+        elif stage == "filter_recent_internships":
+            it_internship.filter_recent_internships(internships, days=3)
+            items = len(internships)
+        else:
+            # Every recent posting, so the cost per entry is what is measured
+            it_internship.format_telegram_message(internships, max_entries=len(internships))
+            items = len(internships)
+        seconds = time.perf_counter() - start
+
+    return {"stage": stage, "items": items, "seconds": round(seconds, 4),
+            "rows_per_second": round(items / seconds) if seconds else None,
+            "peak_rss_mb": round(peak_rss_mb(), 1), "baseline_rss_mb": round(baseline, 1)}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the filter/format pipeline")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma-separated corpus sizes in rows (default: 10000,100000,1000000)")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help="Comma-separated stages to time (default: all)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--workdir", help="Where corpora are kept (default: a temporary directory)")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--project_root", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_stage(args.worker, Path(args.project_root))))
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workdir = Path(args.workdir or temp_dir)
+        results = []
+        for rows in (int(size) for size in args.sizes.split(',')):
+            corpus = workdir / f"corpus_{rows}_{args.seed}.csv"
+            if not corpus.exists():
+                print(f"Generating {rows} rows...", file=sys.stderr)
+                os.makedirs(workdir, exist_ok=True)
+                generate_corpus(corpus, rows, args.seed)
+            for stage in args.stages.split(','):
+                # A fresh project root per stage: filter_it_internships writes its outputs there
+                with tempfile.TemporaryDirectory(dir=workdir) as project_root:
+                    output_dir = Path(project_root) / "output"
+                    os.makedirs(output_dir)
+                    shutil.copyfile(corpus, output_dir / "it_results.csv")
+                    worker = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), "--worker", stage,
+                         "--project_root", project_root],
+                        capture_output=True, text=True, check=True)
+                result = {"rows": rows, **json.loads(worker.stdout.strip().splitlines()[-1])}
+                print(f"{rows:>9} rows  {stage:<30} {result['rows_per_second'] or 0:>12,} rows/s  "
+                      f"{result['peak_rss_mb']:>8} MB peak", file=sys.stderr)
+                results.append(result)
+
+    report = {"commit": git_commit(), "python": platform.python_version(),
+              "date": datetime.datetime.now().isoformat(timespec='seconds'), "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
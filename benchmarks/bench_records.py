@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Internship Record Benchmark
+---------------------------
+Compares holding postings as `Internship` records (internship_record.py)
+with the plain csv.DictReader dicts the scripts used before.
+
+For each representation it reports parse throughput and the memory needed to
+keep every row alive at once (measured with tracemalloc).
+
+Usage:
+    python benchmarks/bench_records.py              # 1M rows
+    python benchmarks/bench_records.py --rows 100000
+"""
+import argparse
+import csv
+import datetime
+import gc
+import io
+import os
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from internship_record import RESULT_FIELDS, iter_internships  # noqa: E402
+
+TITLES = ["software engineering intern", "backend developer intern", "data science intern",
+          "stage développeur web", "alternance ingénieur devops", "cloud engineer trainee"]
+
+
+def generate_csv(rows: int, seed: int) -> str:
+    """Generate a results file like the scraper writes it."""
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    companies = [f"company {i}" for i in range(2000)]
+    locations = [f"city {i}, region, country" for i in range(300)]
+    buffer = io.StringIO()
+    buffer.write("|".join(RESULT_FIELDS) + "\n")
+    for _ in range(rows):
+        date = today - datetime.timedelta(days=rng.randint(0, 60))
+        buffer.write(f"{rng.choice(companies)}|{rng.choice(TITLES)} {rng.randint(1, 999)}|"
+                     f"{rng.choice(locations)}|"
+                     f"https://www.linkedin.com/jobs/view/{rng.randint(10**9, 10**10)}|"
+                     f"{date.isoformat()}\n")
+    return buffer.getvalue()
+
+
+def parse_dicts(data: str) -> List[Any]:
+    return list(csv.DictReader(io.StringIO(data), delimiter='|'))
+
+
+def parse_records(data: str) -> List[Any]:
+    return list(iter_internships(io.StringIO(data)))
+
+
+def measure(parse: Callable[[str], List[Any]], data: str) -> Tuple[float, int]:
+    """Return (rows parsed per second, bytes held by the parsed rows)."""
+    gc.collect()
+    start = time.perf_counter()
+    rows = parse(data)
+    rate = len(rows) / (time.perf_counter() - start)
+    del rows
+
+    gc.collect()
+    tracemalloc.start()
+    rows = parse(data)
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return rate, held
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark Internship records against dicts")
+    parser.add_argument("--rows", type=int, default=1_000_000,
+                        help="Number of synthetic rows (default: 1000000)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    args = parser.parse_args()
+
+    data = generate_csv(args.rows, args.seed)
+    print(f"Parsing {args.rows} rows ({len(data) / 1e6:.0f} MB of CSV)")
+
+    for name, parse in (("dict rows", parse_dicts), ("Internship records", parse_records)):
+        rate, held = measure(parse, data)
+        print(f"{name:<20} {rate:>10,.0f} rows/s   {held / 1e6:>8.0f} MB held "
+              f"({held / args.rows:.0f} bytes/row)")
+
+
+if __name__ == "__main__":
+    main()
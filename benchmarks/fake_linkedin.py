@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+"""
+Fake LinkedIn Server
+--------------------
+A local stand-in for LinkedIn's guest job search, so the scrape scheduler's
+concurrency limits, retry policy and throughput can be load-tested offline
+and reproducibly:
+1. Search pages recorded by real runs (the HTTP cache, output/http_cache/)
+   are replayed byte for byte; queries never recorded get synthetic pages of
+   dated job cards, newest first, in the markup jobpilot parses
+2. Every response waits a configurable latency (with jitter), a share of the
+   requests fail with 503, and bursts of 429s come every N requests
+3. Randomness is seeded per request number and per query, so two runs with
+   the same options see the same pages and fail at the same request numbers
+
+Point the scraper at it with LINKEDIN_BASE_URL (see scraper_backends.py):
+    python benchmarks/fake_linkedin.py --port 8765 --latency 0.2 --error_rate 0.05
+    LINKEDIN_BASE_URL=http://127.0.0.1:8765 SCRAPE_BACKENDS=linkedin python it_internship.py --scrape
+
+GET /__stats returns the request counters as JSON.
+"""
+import argparse
+import datetime
+import html
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from http_cache import ResponseCache  # noqa: E402
+
+LINKEDIN_ORIGIN = "https://www.linkedin.com"
+SEARCH_PATH = "/jobs-guest/jobs/api/seeMoreJobPostings/search"
+JOB_PATH = "/jobs/view/"
+RESULTS_PER_PAGE = 25
+
+TITLE_SUFFIXES = ["", " (m/f/d)", " - Summer 2025", " H/F", " - 6 months", " 2025"]
+COMPANIES = ["Google", "Microsoft", "Capgemini", "SAP", "Accenture", "Cisco",
+             "Oracle", "IBM", "Amazon", "Meta"]
+CITIES = ["Capital", "Harbour City", "Old Town", "Tech Park", "University District"]
+
+
+class FakeLinkedInConfig(NamedTuple):
+    latency: float = 0.0        # seconds before every response
+    jitter: float = 0.0         # +/- seconds around the latency
+    error_rate: float = 0.0     # share of requests answered 503
+    burst_every: int = 0        # every this many requests...
+    burst_length: int = 0       # ...the last this many are answered 429
+    retry_after: int = 1        # Retry-After of a 429, in seconds
+    postings: int = 120         # most postings a synthetic query has
+    per_day: int = 10           # synthetic postings per day of age
+    seed: int = 42
+
+
+def fault_for(config: FakeLinkedInConfig, number: int) -> Tuple[Optional[int], float]:
+    """The status forced on request `number` (1-based), if any, and its latency."""
+    rng = random.Random(f"{config.seed}:request:{number}")
+    latency = max(0.0, config.latency + rng.uniform(-config.jitter, config.jitter))
+    if config.burst_every and (number - 1) % config.burst_every >= config.burst_every - config.burst_length:
+        return 429, latency
+    if rng.random() < config.error_rate:
+        return 503, latency
+    return None, latency
+
+
+def query_postings(config: FakeLinkedInConfig, keywords: str, location: str) -> int:
+    return random.Random(f"{config.seed}:{keywords}:{location}").randint(
+        config.postings // 2, config.postings)
+
+
+def job_card(config: FakeLinkedInConfig, keywords: str, location: str, index: int,
+             today: datetime.date) -> str:
+    """The search card of posting `index` (0 is the newest) of a query."""
+    query_id = zlib.crc32(f"{keywords}|{location}".encode('utf-8'))
+    rng = random.Random(f"{config.seed}:{query_id}:{index}")
+    job_id = query_id * 1000 + index
+    title = keywords.title() + rng.choice(TITLE_SUFFIXES)
+    company = rng.choice(COMPANIES)
+    posted = today - datetime.timedelta(days=index // max(config.per_day, 1))
+    slug = urllib.parse.quote(title.lower().replace(' ', '-'))
+    return (
+        '<li><div class="base-card">'
+        f'<a class="base-card__full-link" href="{LINKEDIN_ORIGIN}/jobs/view/{slug}-{job_id}'
+        f'?refId=fake&amp;trackingId=fake">{html.escape(title)}</a>'
+        '<h4 class="base-search-card__subtitle"><a class="hidden-nested-link" '
+        f'href="{LINKEDIN_ORIGIN}/company/{company.lower()}">{company}</a></h4>'
+        f'<span class="job-search-card__location">{rng.choice(CITIES)}, Region, '
+        f'{html.escape(location.title())}</span>'
+        f'<time class="job-search-card__listdate" datetime="{posted.isoformat()}"></time>'
+        '</div></li>'
+    )
+
+
+def search_page(config: FakeLinkedInConfig, keywords: str, location: str, start: int) -> str:
+    """A synthetic search page: up to 25 cards from `start`, newest first."""
+    today = datetime.date.today()
+    end = min(start + RESULTS_PER_PAGE, query_postings(config, keywords, location))
+    return "".join(job_card(config, keywords, location, index, today)
+                   for index in range(start, end))
+
+
+def job_page(job_id: str) -> str:
+    return ('<html><body><div class="show-more-less-html__markup">'
+            f'Synthetic posting {html.escape(job_id)}.</div>'
+            '<ul><li class="description__job-criteria-item"><h3>Seniority level</h3>'
+            '<span>Internship</span></li></ul></body></html>')
+
+
+class FakeLinkedInServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the fault model and request counters."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: FakeLinkedInConfig,
+                 recordings: Optional[ResponseCache] = None) -> None:
+        super().__init__(address, FakeLinkedInHandler)
+        self.config = config
+        self.recordings = recordings
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.stats: Dict[str, int] = {}
+        self.reset_stats()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.requests = 0
+            self.stats = {"requests": 0, "recorded": 0, "synthetic": 0, "job_pages": 0,
+                          "rate_limited": 0, "errors": 0, "not_found": 0}
+
+    def next_request(self) -> int:
+        with self.lock:
+            self.requests += 1
+            self.stats["requests"] += 1
+            return self.requests
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.stats[name] += 1
+
+
+class FakeLinkedInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeLinkedInServer
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def send_body(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {"content-type": "text/html; charset=utf-8"}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        server = self.server
+        url = urllib.parse.urlsplit(self.path)
+        if url.path == "/__stats":
+            with server.lock:
+                body = json.dumps(server.stats).encode('utf-8')
+            self.send_body(200, body, {"content-type": "application/json"})
+            return
+
+        status, latency = fault_for(server.config, server.next_request())
+        if latency:
+            time.sleep(latency)
+        if status == 429:
+            server.count("rate_limited")
+            self.send_body(429, b"Too Many Requests",
+                           {"content-type": "text/plain", "retry-after": str(server.config.retry_after)})
+            return
+        if status is not None:
+            server.count("errors")
+            self.send_body(status, b"Service Unavailable", {"content-type": "text/plain"})
+            return
+
+        if url.path == SEARCH_PATH:
+            recorded = server.recordings.get(LINKEDIN_ORIGIN + self.path) if server.recordings else None
+            if recorded is not None:
+                server.count("recorded")
+                self.send_body(recorded.status, recorded.body,
+                               {name: value for name, value in recorded.headers.items()
+                                if name in ("content-type", "content-encoding")})
+                return
+            params = dict(urllib.parse.parse_qsl(url.query))
+            server.count("synthetic")
+            page = search_page(server.config, params.get("keywords", ""),
+                               params.get("location", ""), int(params.get("start", 0)))
+            self.send_body(200, page.encode('utf-8'))
+        elif url.path.startswith(JOB_PATH):
+            server.count("job_pages")
+            self.send_body(200, job_page(url.path.rstrip('/').rsplit('-', 1)[-1]).encode('utf-8'))
+        else:
+            server.count("not_found")
+            self.send_body(404, b"Not Found", {"content-type": "text/plain"})
+
+
+def start_server(config: FakeLinkedInConfig, host: str = "127.0.0.1", port: int = 0,
+                 recordings: Optional[Path] = None) -> FakeLinkedInServer:
+    """Serve in a background thread (port 0 picks a free port)."""
+    cache = ResponseCache(recordings) if recordings else None
+    server = FakeLinkedInServer((host, port), config, cache)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = FakeLinkedInConfig()
+    parser.add_argument("--latency", type=float, default=defaults.latency,
+                        help="Seconds before every response (default: 0)")
+    parser.add_argument("--jitter", type=float, default=defaults.jitter,
+                        help="Random +/- seconds around the latency (default: 0)")
+    parser.add_argument("--error_rate", type=float, default=defaults.error_rate,
+                        help="Share of requests answered 503 (default: 0)")
+    parser.add_argument("--burst_every", type=int, default=defaults.burst_every,
+                        help="Length of the 429 burst cycle in requests (default: no bursts)")
+    parser.add_argument("--burst_length", type=int, default=defaults.burst_length,
+                        help="Requests answered 429 at the end of each cycle (default: 0)")
+    parser.add_argument("--retry_after", type=int, default=defaults.retry_after,
+                        help="Retry-After of a 429 in seconds (default: 1)")
+    parser.add_argument("--postings", type=int, default=defaults.postings,
+                        help="Most postings of a synthetic query (default: 120)")
+    parser.add_argument("--per_day", type=int, default=defaults.per_day,
+                        help="Synthetic postings per day of age (default: 10)")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed")
+    parser.add_argument("--recordings",
+                        help="HTTP cache directory to replay recorded search pages from "
+                             "(e.g. output/http_cache)")
+
+
+def config_from_args(args: argparse.Namespace) -> FakeLinkedInConfig:
+    return FakeLinkedInConfig(*(getattr(args, field) for field in FakeLinkedInConfig._fields))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve fake LinkedIn search pages")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on (default: 8765)")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    cache = ResponseCache(Path(args.recordings)) if args.recordings else None
+    server = FakeLinkedInServer((args.host, args.port), config_from_args(args), cache)
+    print(f"Fake LinkedIn server on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python
+"""
+Fake Telegram Bot API
+---------------------
+A local stand-in for api.telegram.org, so delivery (telegram_client.py and
+everything sending through it) can be tested and load-tested without a bot:
+1. sendMessage and sendDocument answer like the Bot API, and reject a text
+   over 4096 UTF-16 code units (a caption over 1024) with Telegram's 400
+2. Each chat has Telegram's send budget (1 message per second in a private
+   chat, 20 per minute in a group or channel) and the bot has a global one
+   (30 messages per second); a message over budget gets a 429 with the
+   `retry_after` seconds until the budget frees up
+3. Every accepted message is counted per chat, with the 400s and 429s, so a
+   test can check nothing was lost, duplicated or sent too fast
+
+Point a client at it with TELEGRAM_API_URL:
+    python benchmarks/fake_telegram.py --port 8081 --latency 0.05
+    TELEGRAM_API_URL=http://127.0.0.1:8081 python send_to_telegram.py
+
+GET /__stats returns the counters as JSON.
+"""
+import argparse
+import collections
+import email.parser
+import json
+import math
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, NamedTuple, Optional, Tuple
+
+MESSAGE_LIMIT = 4096
+CAPTION_LIMIT = 1024
+
+
+class FakeTelegramConfig(NamedTuple):
+    latency: float = 0.0                                 # seconds before every answer
+    private_limit: Tuple[int, float] = (1, 1.0)          # messages, seconds
+    group_limit: Tuple[int, float] = (20, 60.0)
+    global_limit: Tuple[int, float] = (30, 1.0)
+    token: str = ""                                      # accept any token when empty
+
+
+def utf16_length(text: str) -> int:
+    return len(text.encode('utf-16-le')) // 2
+
+
+class SendBudget:
+    """Sliding window of accepted messages: how long until one more fits."""
+
+    def __init__(self, limit: Tuple[int, float]) -> None:
+        self.limit, self.period = limit
+        self.sent: Deque[float] = collections.deque()
+
+    def wait_time(self, now: float) -> float:
+        while self.sent and now - self.sent[0] >= self.period:
+            self.sent.popleft()
+        return 0.0 if len(self.sent) < self.limit else self.period - (now - self.sent[0])
+
+
+class FakeTelegramServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the send budgets and counters."""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: FakeTelegramConfig) -> None:
+        super().__init__(address, FakeTelegramHandler)
+        self.config = config
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.budgets: Dict[str, SendBudget] = {}
+            self.global_budget = SendBudget(self.config.global_limit)
+            self.message_id = 0
+            self.delivered: Dict[str, int] = collections.Counter()
+            self.stats = {"requests": 0, "delivered": 0, "rate_limited": 0, "too_long": 0,
+                          "bad_requests": 0}
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.stats[name] += 1
+
+    def accept(self, chat_id: str) -> Tuple[Optional[int], float]:
+        """Take one message from the chat's and the global budget. Returns
+        (message id, 0) or (None, seconds to wait) when over budget."""
+        limit = self.config.group_limit if chat_id.startswith('-') else self.config.private_limit
+        with self.lock:
+            now = time.monotonic()
+            budget = self.budgets.setdefault(chat_id, SendBudget(limit))
+            wait = max(budget.wait_time(now), self.global_budget.wait_time(now))
+            if wait > 0:
+                self.stats["rate_limited"] += 1
+                return None, wait
+            budget.sent.append(now)
+            self.global_budget.sent.append(now)
+            self.message_id += 1
+            self.delivered[chat_id] += 1
+            self.stats["delivered"] += 1
+            return self.message_id, 0.0
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeTelegramServer
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+    def send_json(self, status: int, data: Dict[str, Any]) -> None:
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status: int, description: str,
+                        parameters: Optional[Dict[str, Any]] = None) -> None:
+        data: Dict[str, Any] = {"ok": False, "error_code": status, "description": description}
+        if parameters:
+            data["parameters"] = parameters
+        self.send_json(status, data)
+
+    def do_GET(self) -> None:
+        if self.path == "/__stats":
+            with self.server.lock:
+                stats = dict(self.server.stats, chats=len(self.server.delivered))
+            self.send_json(200, stats)
+        else:
+            self.send_error_json(404, "Not Found")
+
+    def read_fields(self) -> Dict[str, str]:
+        """The form or JSON fields of the request (files as their name)."""
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("application/json"):
+            return {name: str(value) for name, value in json.loads(body or b"{}").items()}
+        if content_type.startswith("multipart/form-data"):
+            message = email.parser.BytesParser().parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode('utf-8') + body)
+            return {part.get_param('name', header='content-disposition'):
+                    part.get_filename() or part.get_payload(decode=True).decode('utf-8')
+                    for part in message.get_payload()}
+        return dict(urllib.parse.parse_qsl(body.decode('utf-8')))
+
+    def do_POST(self) -> None:
+        server = self.server
+        server.count("requests")
+        try:
+            fields = self.read_fields()
+        except ValueError:
+            server.count("bad_requests")
+            self.send_error_json(400, "Bad Request: can't parse request body")
+            return
+        if server.config.latency:
+            time.sleep(server.config.latency)
+
+        token, _, method = self.path.lstrip('/').partition('/')
+        if not token.startswith('bot') or (server.config.token and token[3:] != server.config.token):
+            self.send_error_json(401, "Unauthorized")
+            return
+        if method not in ("sendMessage", "sendDocument"):
+            self.send_error_json(404, "Not Found")
+            return
+
+        chat_id = fields.get('chat_id', '')
+        text = fields.get('text', '') if method == "sendMessage" else fields.get('caption', '')
+        limit = MESSAGE_LIMIT if method == "sendMessage" else CAPTION_LIMIT
+        if not chat_id:
+            server.count("bad_requests")
+            self.send_error_json(400, "Bad Request: chat_id is empty")
+            return
+        if method == "sendMessage" and not text.strip():
+            server.count("bad_requests")
+            self.send_error_json(400, "Bad Request: message text is empty")
+            return
+        if utf16_length(text) > limit:
+            server.count("too_long")
+            what = "message" if method == "sendMessage" else "message caption"
+            self.send_error_json(400, f"Bad Request: {what} is too long")
+            return
+
+        message_id, wait = server.accept(chat_id)
+        if message_id is None:
+            retry_after = max(1, math.ceil(wait))
+            self.send_error_json(429, f"Too Many Requests: retry after {retry_after}",
+                                 {"retry_after": retry_after})
+            return
+        result: Dict[str, Any] = {"message_id": message_id, "date": int(time.time()),
+                                  "chat": {"id": int(chat_id) if chat_id.lstrip('-').isdigit()
+                                           else chat_id}}
+        if method == "sendMessage":
+            result["text"] = text
+        else:
+            result["document"] = {"file_name": fields.get('document', '')}
+        self.send_json(200, {"ok": True, "result": result})
+
+
+def start_server(config: FakeTelegramConfig, host: str = "127.0.0.1",
+                 port: int = 0) -> FakeTelegramServer:
+    """Serve in a background thread (port 0 picks a free port)."""
+    server = FakeTelegramServer((host, port), config)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_limit(value: str) -> Tuple[int, float]:
+    """"20/60" -> 20 messages per 60 seconds."""
+    messages, _, seconds = value.partition('/')
+    return int(messages), float(seconds or 1)
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Seconds before every answer (default: 0)")
+    parser.add_argument("--private_limit", type=parse_limit, default="1/1",
+                        help="Messages/seconds a private chat accepts (default: 1/1)")
+    parser.add_argument("--group_limit", type=parse_limit, default="20/60",
+                        help="Messages/seconds a group or channel accepts (default: 20/60)")
+    parser.add_argument("--global_limit", type=parse_limit, default="30/1",
+                        help="Messages/seconds the bot may send overall (default: 30/1)")
+
+
+def config_from_args(args: argparse.Namespace, token: str = "") -> FakeTelegramConfig:
+    return FakeTelegramConfig(args.latency, args.private_limit, args.group_limit,
+                              args.global_limit, token)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a stand-in Telegram Bot API")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8081, help="Port to listen on (default: 8081)")
+    parser.add_argument("--token", default="", help="Only accept this bot token (default: any)")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = FakeTelegramServer((args.host, args.port), config_from_args(args, args.token))
+    print(f"Fake Telegram Bot API on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""
+Scrape Load Test
+----------------
+Runs the real scrape (it_internship.scrape_it_internships) against the fake
+LinkedIn server of fake_linkedin.py, so concurrency limits, the retry policy
+and throughput can be compared offline, and reports the numbers as JSON:
+1. The fake server runs in this process with the given latency, 503 rate and
+   429 bursts; each scrape runs in its own process with an empty project
+   root, LINKEDIN_BASE_URL pointing at the server and only the LinkedIn backend
+2. One scrape runs per --concurrency value, with the same seed, so every run
+   sees the same pages and the same faults
+3. Every result has the run's seconds, searches and pages per second, the
+   scheduler's retries and failures, and the faults the server answered
+
+Usage:
+    python benchmarks/load_scrape.py --concurrency 1,4,8 --rate 20 --burst 20
+    python benchmarks/load_scrape.py --latency 0.3 --jitter 0.2 --error_rate 0.05 \\
+        --burst_every 100 --burst_length 10 --output retries.json
+"""
+import argparse
+import asyncio
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_pipeline import git_commit  # noqa: E402
+from benchmarks.fake_linkedin import add_config_arguments, config_from_args, start_server  # noqa: E402
+
+SCHEDULER_SUMMARY = re.compile(r"Searches completed: (\d+), retried: (\d+), failed: (\d+)")
+
+
+def run_scrape(concurrency: int, days: int, limit: int) -> Dict[str, Any]:
+    """Run one scrape in this process (see --worker); the environment points
+    it_internship at the fake server."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        import it_internship
+
+        start = time.perf_counter()
+        internships = asyncio.run(it_internship.scrape_it_internships(
+            concurrency, days=days, limit=limit, plan=False))
+        seconds = time.perf_counter() - start
+
+    completed, retried, failed = map(int, SCHEDULER_SUMMARY.search(output.getvalue()).groups())
+    return {"seconds": round(seconds, 3), "searches": completed + failed,
+            "completed": completed, "retried": retried, "failed": failed,
+            "postings": len(internships)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test the scraper against a fake LinkedIn")
+    parser.add_argument("--concurrency", default="1,4,8",
+                        help="Comma-separated searches in flight to compare (default: 1,4,8)")
+    parser.add_argument("--rate", type=float, default=20.0,
+                        help="LINKEDIN_RATE of the runs, requests per second (default: 20)")
+    parser.add_argument("--burst", type=int, default=20,
+                        help="LINKEDIN_BURST of the runs (default: 20)")
+    parser.add_argument("--max_retries", type=int, default=3,
+                        help="SCRAPE_MAX_RETRIES of the runs (default: 3)")
+    parser.add_argument("--days", type=int, default=7,
+                        help="--days window, where LinkedIn paging stops (default: 7)")
+    parser.add_argument("--limit", type=int, default=200,
+                        help="--limit, deepest a search pages (default: 200)")
+    add_config_arguments(parser)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_scrape(args.worker, args.days, args.limit)))
+        return
+
+    config = config_from_args(args)
+    server = start_server(config, recordings=Path(args.recordings) if args.recordings else None)
+    results = []
+    try:
+        for concurrency in (int(value) for value in args.concurrency.split(',')):
+            server.reset_stats()
+            with tempfile.TemporaryDirectory() as project_root:
+                env = dict(os.environ, PROJECT_ROOT=project_root, LINKEDIN_BASE_URL=server.base_url,
+                           SCRAPE_BACKENDS="linkedin", LINKEDIN_RATE=str(args.rate),
+                           LINKEDIN_BURST=str(args.burst), SCRAPE_MAX_RETRIES=str(args.max_retries),
+                           SEARCH_CACHE_TTL="0")
+                worker = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--worker", str(concurrency),
+                     "--days", str(args.days), "--limit", str(args.limit)],
+                    capture_output=True, text=True, check=True, env=env)
+            run = json.loads(worker.stdout.strip().splitlines()[-1])
+            served = dict(server.stats)
+            pages = served["recorded"] + served["synthetic"]
+            result = {"concurrency": concurrency, **run,
+                      "searches_per_second": round(run["searches"] / run["seconds"], 2),
+                      "pages_per_second": round(pages / run["seconds"], 2),
+                      "server": served}
+            print(f"concurrency {concurrency:>3}  {run['seconds']:>8.1f}s  "
+                  f"{result['pages_per_second']:>7} pages/s  retried {run['retried']:>4}  "
+                  f"failed {run['failed']:>4}  429s {served['rate_limited']:>4}  "
+                  f"503s {served['errors']:>4}", file=sys.stderr)
+            results.append(result)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    report = {"commit": git_commit(), "python": platform.python_version(),
+              "date": datetime.datetime.now().isoformat(timespec='seconds'),
+              "server": config._asdict(), "rate": args.rate, "burst": args.burst,
+              "max_retries": args.max_retries, "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+"""
+Telegram Delivery Load Test
+---------------------------
+Drives thousands of digest pages through telegram_client.py into the fake
+Bot API of fake_telegram.py, and reports the numbers as JSON:
+1. Synthetic internships are formatted into real digest pages
+   (it_internship.format_telegram_pages), and each chat gets its share
+2. Chats are sent to from a pool of threads through one shared
+   TelegramClient, the way keep_alive.py delivers, while the fake server
+   enforces the per-chat and global budgets and answers 429 with retry_after
+3. The report has messages delivered per second, the client's retries and
+   429s, the server's counters, and the p50/p90/p99/max latency of a page
+   (from the first attempt until Telegram accepted it)
+4. The client's pacing should keep it within Telegram's budgets, so the test
+   fails (exit status 1) when more than --max_rate_limited of the requests
+   got a 429
+
+Usage:
+    python benchmarks/load_telegram.py                          # 2000 pages over 50 chats
+    python benchmarks/load_telegram.py --pages 5000 --chats 200 --group_share 0.1 --output telegram.json
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.bench_pipeline import COMPANIES, LOCATIONS, TITLES, git_commit  # noqa: E402
+from benchmarks.fake_telegram import add_config_arguments, config_from_args, start_server  # noqa: E402
+from internship_record import Internship  # noqa: E402
+from telegram_client import TelegramClient  # noqa: E402
+
+BOT_TOKEN = "123456:load-test"
+
+
+def digest_pages(pages: int, seed: int) -> List[str]:
+    """At least `pages` real digest pages, from synthetic internships."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        from it_internship import format_telegram_pages
+
+    rng = random.Random(seed)
+    today = datetime.date.today()
+    internships: List[Internship] = []
+    texts: List[str] = []
+    while len(texts) < pages:
+        for _ in range(1000):
+            job_id = rng.randint(10**9, 10**10)
+            internships.append(Internship(
+                rng.choice(COMPANIES), rng.choice(TITLES), rng.choice(LOCATIONS),
+                f"https://www.linkedin.com/jobs/view/{job_id}",
+                today - datetime.timedelta(days=rng.randint(0, 3))))
+        texts = format_telegram_pages(internships, max_entries=len(internships))
+    return texts[:pages]
+
+
+def percentile(values: List[float], share: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load-test Telegram delivery against a fake Bot API")
+    parser.add_argument("--pages", type=int, default=2000, help="Digest pages to deliver (default: 2000)")
+    parser.add_argument("--chats", type=int, default=50, help="Chats they are spread over (default: 50)")
+    parser.add_argument("--group_share", type=float, default=0.0,
+                        help="Share of the chats that are groups/channels (default: 0)")
+    parser.add_argument("--workers", type=int, default=50,
+                        help="Threads delivering at once (default: 50)")
+    parser.add_argument("--max_retries", type=int, default=3,
+                        help="Retries of the client per message (default: 3)")
+    parser.add_argument("--max_rate_limited", type=float, default=0.01,
+                        help="Fail when a larger share of the requests got a 429 (default: 0.01)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    add_config_arguments(parser)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    texts = digest_pages(args.pages, args.seed)
+    groups = round(args.chats * args.group_share)
+    chats = [f"-100{index}" if index < groups else str(10**8 + index) for index in range(args.chats)]
+    server = start_server(config_from_args(args))
+    client = TelegramClient(BOT_TOKEN, base_url=server.base_url, max_retries=args.max_retries)
+    latencies: List[float] = []
+    failed: List[Dict[str, Any]] = []
+    results_lock = threading.Lock()
+
+    def deliver(chat_index: int) -> None:
+        chat_id = chats[chat_index]
+        for text in texts[chat_index::len(chats)]:
+            started = time.perf_counter()
+            result = client.send_message(chat_id, text)
+            with results_lock:
+                if result.get('ok'):
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    failed.append(result)
+
+    print(f"Delivering {len(texts)} pages to {len(chats)} chats ({groups} groups)...", file=sys.stderr)
+    start = time.perf_counter()
+    try:
+        # The client prints every 429 it waits out
+        with contextlib.redirect_stdout(io.StringIO()):
+            with ThreadPoolExecutor(max_workers=args.workers) as executor:
+                list(executor.map(deliver, range(len(chats))))
+        seconds = time.perf_counter() - start
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+
+    result = {
+        "pages": len(texts), "chats": len(chats), "groups": groups, "workers": args.workers,
+        "seconds": round(seconds, 3), "delivered": len(latencies), "failed": len(failed),
+        "messages_per_second": round(len(latencies) / seconds, 2),
+        "rate_limited_share": round(server.stats["rate_limited"] / max(server.stats["requests"], 1), 4),
+        "client": dict(client.stats), "server": dict(server.stats),
+        "latency_ms": {name: round(percentile(latencies, share) * 1000, 1)
+                       for name, share in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))},
+        "failures": failed[:5],
+    }
+    print(f"{result['delivered']} delivered, {result['failed']} failed in {seconds:.1f}s "
+          f"({result['messages_per_second']} msgs/s), {client.stats['retries']} retries, "
+          f"p99 {result['latency_ms']['p99']} ms", file=sys.stderr)
+
+    report = {"commit": git_commit(), "python": platform.python_version(),
+              "date": datetime.datetime.now().isoformat(timespec='seconds'),
+              "server_config": config_from_args(args)._asdict(), "results": [result]}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+    if result["rate_limited_share"] > args.max_rate_limited:
+        print(f"FAILED: {result['rate_limited_share']:.1%} of the requests got a 429 "
+              f"(more than {args.max_rate_limited:.1%})", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
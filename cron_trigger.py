@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+"""
+Cron Trigger
+------------
+Computes when a cron expression next fires, so a long-lived process can sleep
+until its next run instead of polling the clock.
+
+Supports the usual five fields (minute hour day-of-month month day-of-week)
+with `*`, numbers, ranges (`1-5`), lists (`0,30`) and steps (`*/8`, `9-17/2`).
+As in cron, when both day fields are restricted a day matching either one fires.
+"""
+import datetime
+from typing import List, NamedTuple, Set
+
+# (lowest, highest) value of each field; day of week 0 is Sunday (7 is accepted too)
+FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+# Longest search for a matching time: beyond this the expression never fires
+MAX_SEARCH_DAYS = 366 * 5
+
+
+class CronField(NamedTuple):
+    values: Set[int]
+    restricted: bool
+
+
+def parse_field(field: str, lowest: int, highest: int) -> CronField:
+    """Parse one cron field into the set of values it matches."""
+    values: Set[int] = set()
+    for part in field.split(','):
+        expression, _, step_str = part.partition('/')
+        step = int(step_str) if step_str else 1
+        if expression == '*':
+            start, end = lowest, highest
+        elif '-' in expression:
+            start_str, end_str = expression.split('-', 1)
+            start, end = int(start_str), int(end_str)
+        else:
+            start = int(expression)
+            end = highest if step_str else start
+        if step < 1 or not lowest <= start <= end <= highest:
+            raise ValueError(f"Invalid cron field: {field!r}")
+        values.update(range(start, end + 1, step))
+    return CronField(values, field != '*')
+
+
+class CronTrigger:
+    """A parsed five-field cron expression."""
+
+    def __init__(self, expression: str) -> None:
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        parsed: List[CronField] = [parse_field(field, lowest, highest)
+                                   for field, (lowest, highest) in zip(fields, FIELD_RANGES, strict=True)]
+        self.minutes, self.hours, self.days, self.months, weekdays = parsed
+        # Both 0 and 7 mean Sunday
+        self.weekdays = CronField({day % 7 for day in weekdays.values}, weekdays.restricted)
+
+    def __repr__(self) -> str:
+        return f"CronTrigger({self.expression!r})"
+
+    def matches_day(self, date: datetime.date) -> bool:
+        if date.month not in self.months.values:
+            return False
+        day_match = date.day in self.days.values
+        weekday_match = (date.isoweekday() % 7) in self.weekdays.values
+        if self.days.restricted and self.weekdays.restricted:
+            return day_match or weekday_match
+        return day_match and weekday_match
+
+    def next_after(self, moment: datetime.datetime) -> datetime.datetime:
+        """The first time strictly after `moment` at which the trigger fires."""
+        candidate = moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        limit = moment + datetime.timedelta(days=MAX_SEARCH_DAYS)
+        while candidate <= limit:
+            if not self.matches_day(candidate.date()):
+                candidate = (candidate.replace(hour=0, minute=0)
+                             + datetime.timedelta(days=1))
+            elif candidate.hour not in self.hours.values:
+                candidate = (candidate.replace(minute=0)
+                             + datetime.timedelta(hours=1))
+            elif candidate.minute not in self.minutes.values:
+                candidate += datetime.timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression never fires: {self.expression!r}")
@@ -44,7 +44,8 @@ def run_initial_scrape():
     """Run an initial scrape to populate data."""
     logging.info("Running initial scrape (this may take a few minutes)...")
     try:
-        subprocess.run([sys.executable, "it_internship.py", "--scrape", "--days=3"], 
+        # --resume: running this again after the timeout picks up where it stopped
+        subprocess.run([sys.executable, "it_internship.py", "--scrape", "--days=3", "--resume"], 
                      check=True, timeout=300)
         logging.info("Initial scrape completed successfully!")
         return True
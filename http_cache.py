@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""
+HTTP Response Cache
+-------------------
+On-disk cache of scrape responses (output/http_cache/), so runs hours apart
+do not download the same pages again:
+1. A response younger than its TTL is answered from disk, without a request
+2. An older one is revalidated with If-None-Match / If-Modified-Since, so a
+   page that has not changed costs a bodyless 304 instead of a full download
+3. The TTL is chosen per request by the caller (per search query, per feed)
+
+`CachingTransport` plugs the cache into httpx, which jobpilot scrapes with;
+career feeds use `ResponseCache` directly around urllib.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, NamedTuple, Optional
+
+import httpx
+
+# Response headers kept with a cached body
+CACHED_HEADERS = ("content-type", "content-encoding", "etag", "last-modified")
+
+
+class CachedResponse(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    stored_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers revalidating this response."""
+        headers = {}
+        if 'etag' in self.headers:
+            headers['If-None-Match'] = self.headers['etag']
+        if 'last-modified' in self.headers:
+            headers['If-Modified-Since'] = self.headers['last-modified']
+        return headers
+
+
+class ResponseCache:
+    """Successful GET responses stored one file per URL: a JSON line of
+    metadata followed by the raw body."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0}
+
+    def path_for(self, url: str) -> Path:
+        return self.directory / hashlib.sha1(url.encode('utf-8'), usedforsecurity=False).hexdigest()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        try:
+            with open(self.path_for(url), 'rb') as file:
+                meta = json.loads(file.readline())
+                body = file.read()
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url:
+            return None
+        return CachedResponse(meta['status'], meta['headers'], body, meta['stored_at'])
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes) -> CachedResponse:
+        kept = {name: value for name, value in
+                ((name.lower(), value) for name, value in headers.items())
+                if name in CACHED_HEADERS}
+        entry = CachedResponse(status, kept, body, time.time())
+        meta = {'url': url, 'status': status, 'headers': kept, 'stored_at': entry.stored_at}
+        path = self.path_for(url)
+        temp_path = path.with_suffix('.tmp')
+        # Write then rename, so a crash never leaves a half-written entry
+        with open(temp_path, 'wb') as file:
+            file.write(json.dumps(meta).encode('utf-8') + b'\n')
+            file.write(body)
+        os.replace(temp_path, path)
+        return entry
+
+    def touch(self, url: str, entry: CachedResponse) -> CachedResponse:
+        """Restart an entry's TTL after the server confirmed it is unchanged."""
+        return self.put(url, entry.status, entry.headers, entry.body)
+
+    def prune(self, max_age: float) -> int:
+        """Delete entries not refreshed for `max_age` seconds. Returns entries deleted."""
+        cutoff = time.time() - max_age
+        removed = 0
+        for path in self.directory.iterdir():
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                continue
+        return removed
+
+
+class CachingTransport(httpx.AsyncBaseTransport):
+    """httpx transport answering GET requests from a ResponseCache.
+
+    `ttl_for` gives a request's TTL in seconds, or None to bypass the cache.
+    """
+
+    def __init__(self, cache: ResponseCache,
+                 ttl_for: Callable[[httpx.Request], Optional[float]],
+                 transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        self.cache = cache
+        self.ttl_for = ttl_for
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        ttl = self.ttl_for(request) if request.method == "GET" else None
+        if ttl is None:
+            return await self.transport.handle_async_request(request)
+
+        url = str(request.url)
+        entry = self.cache.get(url)
+        if entry is not None and entry.is_fresh(ttl):
+            self.cache.stats["hits"] += 1
+            return self.cached_response(entry, request)
+        if entry is not None:
+            request.headers.update(entry.validators())
+
+        response = await self.transport.handle_async_request(request)
+        if response.status_code == 304 and entry is not None:
+            await response.aclose()
+            self.cache.stats["revalidated"] += 1
+            return self.cached_response(self.cache.touch(url, entry), request)
+
+        self.cache.stats["misses"] += 1
+        if response.status_code != 200:
+            return response
+        # Keep the body as sent (still compressed); the client decodes it
+        body = b"".join([chunk async for chunk in response.aiter_raw()])
+        await response.aclose()
+        self.cache.put(url, response.status_code, dict(response.headers), body)
+        headers = [(name, value) for name, value in response.headers.items()
+                   if name.lower() not in ("content-length", "transfer-encoding")]
+        return httpx.Response(response.status_code, headers=headers, content=body,
+                              request=request)
+
+    @staticmethod
+    def cached_response(entry: CachedResponse, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(entry.status, headers=entry.headers, content=entry.body,
+                              request=request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+"""
+Internship Record
+-----------------
+The compact record every script uses for one posting, instead of a
+five-key dict per row:
+1. `__slots__`, so a record has no per-instance __dict__
+2. The posting date is parsed once, when the row is read, into a datetime.date
+   (through the cached parser in posting_dates.py)
+3. Company and location strings are interned, so the many rows that share
+   them share one string object
+4. The link is canonicalized once into `link_key`, the key used for dedup:
+   LinkedIn links become their job ID, so tracking parameters (refId,
+   trackingId, position) and localized hosts no longer create duplicates
+
+CSV files keep their pipe-delimited company|title|location|link|date layout.
+"""
+import csv
+import datetime
+import os
+import re
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from posting_dates import parse_date
+
+# Columns of the results and filtered results files
+RESULT_FIELDS = ["company", "title", "location", "link", "date"]
+
+# LinkedIn job IDs, from /jobs/view/<id> or /jobs/view/<title-slug>-<id> paths
+# and from the currentJobId parameter of search result links
+LINKEDIN_JOB_PATH = re.compile(r'/jobs/view/(?:[^/?#]*-)?(\d+)(?=[/?#]|$)')
+LINKEDIN_JOB_PARAM = re.compile(r'[?&]currentJobId=(\d+)')
+
+# Location names that mean a country, as they appear in LinkedIn locations
+COUNTRY_ALIASES = {
+    "deutschland": "germany", "allemagne": "germany",
+    "uk": "united kingdom", "england": "united kingdom", "scotland": "united kingdom",
+    "españa": "spain", "espagne": "spain", "italia": "italy", "italie": "italy",
+    "nederland": "netherlands", "the netherlands": "netherlands", "pays-bas": "netherlands",
+    "belgië": "belgium", "belgique": "belgium", "sverige": "sweden", "suède": "sweden",
+    "éire": "ireland", "irlande": "ireland", "schweiz": "switzerland", "suisse": "switzerland",
+    "svizzera": "switzerland", "danmark": "denmark", "danemark": "denmark",
+}
+
+
+def normalize_link(link: str) -> str:
+    """Normalize a posting link so the same posting always gets the same key:
+    no scheme, query string, fragment or trailing slash, and a lowercase host."""
+    link = link.strip().partition('#')[0].partition('?')[0]
+    scheme, separator, rest = link.partition('://')
+    if not separator:
+        rest = scheme
+    host, _, path = rest.partition('/')
+    return f"{host.lower()}/{path}".rstrip('/')
+
+
+def linkedin_job_id(link: str) -> Optional[str]:
+    """Return the LinkedIn job ID in a link, or None for other links."""
+    if 'linkedin.' not in link:
+        return None
+    match = LINKEDIN_JOB_PATH.search(link) or LINKEDIN_JOB_PARAM.search(link)
+    return match.group(1) if match else None
+
+
+def canonical_link_key(link: str) -> str:
+    """The dedup key of a posting link: `linkedin:<job id>` for LinkedIn
+    postings, the normalized link for anything else."""
+    job_id = linkedin_job_id(link)
+    if job_id:
+        return f"linkedin:{job_id}"
+    return normalize_link(link)
+
+
+def place_name(part: str) -> str:
+    """A location part lowercased, with country names in English."""
+    part = part.strip().lower()
+    return COUNTRY_ALIASES.get(part, part)
+
+
+def location_country(location: str) -> str:
+    """The country a location names: its last part ("Berlin, Deutschland" ->
+    "germany"), from the first location of a merged group."""
+    return place_name(location.split(';')[0].rsplit(',', 1)[-1])
+
+
+class Internship:
+    """One internship posting."""
+
+    __slots__ = ('company', 'title', 'location', 'link', 'date', 'link_key')
+
+    def __init__(self, company: str, title: str, location: str, link: str,
+                 date: Optional[datetime.date] = None) -> None:
+        self.company = sys.intern(company)
+        self.title = title
+        self.location = sys.intern(location)
+        self.link = link
+        self.date = date
+        self.link_key = canonical_link_key(link) if link else ''
+
+    @classmethod
+    def from_fields(cls, company: str, title: str, location: str, link: str,
+                    date_str: str) -> "Internship":
+        """Build a record from raw CSV strings, parsing the date."""
+        return cls(company, title, location, link, parse_date(date_str) if date_str else None)
+
+    @classmethod
+    def from_row(cls, row: Dict[str, str]) -> "Internship":
+        """Build a record from a dict with the RESULT_FIELDS keys."""
+        return cls.from_fields(*(row.get(field) or '' for field in RESULT_FIELDS))
+
+    @property
+    def date_str(self) -> str:
+        """The posting date as YYYY-MM-DD, or '' if unknown."""
+        return self.date.isoformat() if self.date else ''
+
+    def to_fields(self) -> List[str]:
+        """The record as a row of CSV strings, in RESULT_FIELDS order."""
+        return [self.company, self.title, self.location, self.link, self.date_str]
+
+    def to_row(self) -> Dict[str, str]:
+        """The record as a dict with the RESULT_FIELDS keys."""
+        return dict(zip(RESULT_FIELDS, self.to_fields(), strict=True))
+
+    def __repr__(self) -> str:
+        return f"Internship({self.company!r}, {self.title!r}, {self.location!r}, {self.link!r}, {self.date_str!r})"
+
+
+def iter_internships(lines: Iterable[str],
+                     fieldnames: Optional[List[str]] = None) -> Iterator[Internship]:
+    """Parse pipe-delimited CSV lines into records.
+    The first line is the header unless `fieldnames` is given."""
+    reader = csv.reader(lines, delimiter='|')
+    if fieldnames is None:
+        fieldnames = next(reader, None)
+        if fieldnames is None:
+            return
+    fieldnames = [name.strip().lower() for name in fieldnames]
+    positions = [fieldnames.index(field) if field in fieldnames else None
+                 for field in RESULT_FIELDS]
+
+    from_fields = Internship.from_fields
+    if positions == list(range(len(RESULT_FIELDS))):
+        # The files we write ourselves: columns already in RESULT_FIELDS order
+        width = len(RESULT_FIELDS)
+        for values in reader:
+            if len(values) == width:
+                yield from_fields(*values)
+            elif values:
+                yield from_fields(*(values + [''] * width)[:width])
+        return
+
+    for values in reader:
+        if not values:
+            continue
+        yield from_fields(*(
+            values[position] if position is not None and position < len(values) else ''
+            for position in positions
+        ))
+
+
+def write_internships(file: TextIO, internships: Iterable[Internship],
+                      header: bool = True) -> int:
+    """Write records to an open text file as pipe-delimited CSV. Returns rows written."""
+    writer = csv.writer(file, delimiter='|', lineterminator='\n')
+    if header:
+        writer.writerow(RESULT_FIELDS)
+    count = 0
+    for internship in internships:
+        writer.writerow(internship.to_fields())
+        count += 1
+    return count
+
+
+def write_csv_stream(rows: Iterable[Internship], file_path: str) -> int:
+    """Write rows to a CSV file as they arrive, without holding them in memory.
+    The file is written to a temporary path and moved into place at the end,
+    so readers never see a half-written file, and an existing file is left
+    alone when there is nothing to write. Returns the number of rows written."""
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    temp_path = f"{file_path}.tmp"
+    count = 0
+    
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            count = write_internships(file, rows)
+        if count:
+            os.replace(temp_path, file_path)
+            print(f"Successfully wrote {count} entries to {file_path}")
+        else:
+            os.remove(temp_path)
+            print(f"No data to write to {file_path}")
+    except Exception as e:
+        print(f"Error writing CSV file {file_path}: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return count
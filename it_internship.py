@@ -3,7 +3,7 @@
 IT Engineering Internship Scraper
 --------------------------------
 A single script that:
-1. Scrapes LinkedIn for IT engineering internships & alternances
+1. Scrapes LinkedIn (and any configured career feeds) for IT engineering internships & alternances
 2. Filters the results for relevant positions
 3. Sends them to Telegram
 
@@ -14,20 +14,36 @@ Usage:
 """
 import asyncio
 import argparse
-import csv
+import functools
+import gzip
+import io
+import itertools
+import json
 import os
-import requests
 import time
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional 
-
-try:
-    from jobpilot.scrapers import LinkedInScraper, ScraperInput
-    JOBPILOT_AVAILABLE = True
-except ImportError:
-    JOBPILOT_AVAILABLE = False
-    print("Warning: jobpilot module not available. Scraping functionality will be disabled.")
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from internship_record import (
+    RESULT_FIELDS, Internship, iter_internships, write_csv_stream, write_internships
+)
+from http_cache import ResponseCache
+from job_store import JobStore
+from near_duplicates import group_near_duplicates, merge_group
+from pipeline_metrics import (
+    SCRAPE_FAILURES, SCRAPE_LATENCY, SCRAPE_ROWS, observe_classifier, observe_dedup, stage_timer
+)
+from posting_dates import date_window
+from query_planner import plan_queries, query_key
+from scrape_scheduler import HostBudget, ScrapeScheduler, ScrapeTask
+from scraper_backends import (
+    JOBPILOT_AVAILABLE, LinkedInBackend, ScraperBackend, host_budgets, load_career_feeds
+)
+from subscriptions import SubscriptionIndex, load_subscriptions, widest_window
+from telegram_client import MESSAGE_LIMIT, paginate, shared_client, truncate
+from title_classifier import is_it_engineering_internship
 
 # === CONFIGURATION ===
 BOT_TOKEN = os.environ.get("BOT_TOKEN", "8041545402:AAFvZBdheN74kl6_juAfPPJ-wVNCSi7Yq6k")
@@ -38,17 +54,11 @@ PROJECT_ROOT = Path(os.environ.get("PROJECT_ROOT", os.path.dirname(os.path.abspa
 OUTPUT_DIR = PROJECT_ROOT / "output"
 RESULTS_FILE = OUTPUT_DIR / "it_results.csv"
 FILTERED_RESULTS_FILE = OUTPUT_DIR / "it_internships.csv"
-
-# IT Engineering keywords for filtering
-IT_KEYWORDS = [
-    "software", "developer", "development", "engineering", "it", "tech", 
-    "computer", "programming", "web", "mobile", "data", "devops", "cloud",
-    "fullstack", "backend", "frontend", "qa", "sde", "swe", "code", "coding",
-    "systems", "cybersecurity", "database", "application"
-]
-
-# Internship/alternance keywords
-INTERNSHIP_KEYWORDS = ["intern", "internship", "alternance", "stage", "trainee"]
+JOBS_DB_FILE = OUTPUT_DIR / "jobs.db"
+FILTER_STATE_FILE = OUTPUT_DIR / "filter_state.json"
+HTTP_CACHE_DIR = OUTPUT_DIR / "http_cache"
+CAREER_FEEDS_FILE = Path(os.environ.get("CAREER_FEEDS_FILE", PROJECT_ROOT / "career_feeds.json"))
+SUBSCRIPTIONS_FILE = Path(os.environ.get("SUBSCRIPTIONS_FILE", PROJECT_ROOT / "subscriptions.json"))
 
 # Companies to focus on
 TECH_COMPANIES = [
@@ -62,6 +72,54 @@ EU_COUNTRIES = [
     "belgium", "sweden", "ireland", "switzerland", "portugal", "denmark"
 ]
 
+# Scrape scheduling: how many (term, country) searches run at once, and the
+# request budget per host (tokens per second, with bursts up to LINKEDIN_BURST)
+SCRAPE_CONCURRENCY = int(os.environ.get("SCRAPE_CONCURRENCY", "4"))
+LINKEDIN_HOST = "www.linkedin.com"
+LINKEDIN_RATE = float(os.environ.get("LINKEDIN_RATE", "0.6"))
+LINKEDIN_BURST = int(os.environ.get("LINKEDIN_BURST", "5"))
+SCRAPE_MAX_RETRIES = int(os.environ.get("SCRAPE_MAX_RETRIES", "3"))
+
+# Deepest a LinkedIn search pages (25 postings per page); paging stops earlier
+# at the first page with nothing new inside the --days window
+LINKEDIN_SEARCH_LIMIT = int(os.environ.get("LINKEDIN_SEARCH_LIMIT", "200"))
+
+# Replay mode: send LinkedIn requests to this server instead (e.g. the fake
+# server of benchmarks/fake_linkedin.py), for offline load tests
+LINKEDIN_BASE_URL = os.environ.get("LINKEDIN_BASE_URL", "")
+
+# Runs over which the postings each query found are kept to detect redundant
+# queries (see query_planner.py)
+QUERY_HISTORY_RUNS = int(os.environ.get("QUERY_HISTORY_RUNS", "30"))
+
+# --resume continues an interrupted scrape run started less than this long ago
+RESUME_WINDOW_HOURS = float(os.environ.get("RESUME_WINDOW_HOURS", "8"))
+
+# Sources to scrape ("linkedin", "feeds"), and the default budget of a career
+# feed host; each feed in CAREER_FEEDS_FILE may set its own
+SCRAPE_BACKENDS = os.environ.get("SCRAPE_BACKENDS", "linkedin,feeds")
+FEED_CONCURRENCY = int(os.environ.get("FEED_CONCURRENCY", "2"))
+FEED_RATE = float(os.environ.get("FEED_RATE", "1.0"))
+FEED_BURST = int(os.environ.get("FEED_BURST", "2"))
+
+# HTTP response cache: how long a search page or feed is reused without asking
+# the server again (after that it is revalidated with ETag/Last-Modified), and
+# when an entry nobody refreshed is deleted.
+SEARCH_CACHE_TTL = float(os.environ.get("SEARCH_CACHE_TTL", "3600"))
+FEED_CACHE_TTL = float(os.environ.get("FEED_CACHE_TTL", "3600"))
+HTTP_CACHE_MAX_AGE = float(os.environ.get("HTTP_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+
+# Entries previewed in the summary message of a --digest delivery
+DIGEST_PREVIEW_ENTRIES = 5
+
+# Chats sent to at the same time; the Telegram client keeps them all within
+# the bot's global budget
+TELEGRAM_SEND_WORKERS = int(os.environ.get("TELEGRAM_SEND_WORKERS", "8"))
+
+_scraper_backends: Dict[str, ScraperBackend] = {}
+_http_cache: Optional[ResponseCache] = None
+_send_executor: Optional[ThreadPoolExecutor] = None
+
 
 # === UTILITY FUNCTIONS ===
 def ensure_dir_exists(directory: Path) -> None:
@@ -69,25 +127,25 @@ def ensure_dir_exists(directory: Path) -> None:
     os.makedirs(directory, exist_ok=True)
 
 
-def read_csv_data(file_path: str) -> List[Dict[str, str]]:
-    """Read internship data from a CSV file."""
+def iter_csv_data(file_path: str) -> Iterator[Internship]:
+    """Yield internship records from a CSV file one at a time."""
     if not os.path.exists(file_path):
         print(f"Warning: File {file_path} does not exist")
-        return []
+        return
         
-    internships = []
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file, delimiter='|')
-            for row in reader:
-                internships.append(row)
-        return internships
+            yield from iter_internships(file)
     except Exception as e:
         print(f"Error reading CSV file {file_path}: {e}")
-        return []
 
 
-def write_csv_data(data: List[Dict[str, str]], file_path: str) -> bool:
+def read_csv_data(file_path: str) -> List[Internship]:
+    """Read internship data from a CSV file."""
+    return list(iter_csv_data(file_path))
+
+
+def write_csv_data(data: List[Internship], file_path: str) -> bool:
     """Write data to a CSV file."""
     if not data:
         print(f"No data to write to {file_path}")
@@ -97,9 +155,7 @@ def write_csv_data(data: List[Dict[str, str]], file_path: str) -> bool:
     
     try:
         with open(file_path, 'w', encoding='utf-8') as file:
-            writer = csv.DictWriter(file, fieldnames=list(data[0].keys()), delimiter='|')
-            writer.writeheader()
-            writer.writerows(data)
+            write_internships(file, data)
         print(f"Successfully wrote {len(data)} entries to {file_path}")
         return True
     except Exception as e:
@@ -107,6 +163,21 @@ def write_csv_data(data: List[Dict[str, str]], file_path: str) -> bool:
         return False
 
 
+def append_csv_data(data: List[Internship], file_path: str) -> bool:
+    """Append rows to an existing CSV file (written by write_csv_data)."""
+    if not data:
+        return False
+    
+    try:
+        with open(file_path, 'a', encoding='utf-8') as file:
+            write_internships(file, data, header=False)
+        print(f"Successfully appended {len(data)} entries to {file_path}")
+        return True
+    except Exception as e:
+        print(f"Error appending to CSV file {file_path}: {e}")
+        return False
+
+
 def find_all_result_files() -> List[str]:
     """Find all result CSV files in the output directory."""
     result_files = []
@@ -118,8 +189,18 @@ def find_all_result_files() -> List[str]:
     return result_files
 
 
+def open_job_store() -> JobStore:
+    """Open the SQLite job store, importing the legacy results CSV on first use."""
+    store = JobStore(JOBS_DB_FILE)
+    if store.count(it_only=False) == 0 and os.path.exists(RESULTS_FILE):
+        print(f"Importing existing results from {RESULTS_FILE} into {JOBS_DB_FILE}...")
+        imported = store.import_csv(str(RESULTS_FILE), is_it_engineering_internship)
+        print(f"Imported {imported} rows")
+    return store
+
+
 # === SCRAPING FUNCTIONS ===
-def append_to_results_file(internships: List[Dict[str, str]]) -> None:
+def append_to_results_file(internships: List[Internship]) -> None:
     """Append internships to the results file."""
     if not internships:
         return
@@ -128,52 +209,15 @@ def append_to_results_file(internships: List[Dict[str, str]]) -> None:
     if not os.path.exists(RESULTS_FILE):
         ensure_dir_exists(OUTPUT_DIR)
         with open(RESULTS_FILE, 'w', encoding='utf-8') as file:
-            file.write("company|title|location|link|date\n")
+            write_internships(file, [])
     
-    # Append internships
+    # Append internships, quoted like every other CSV we write (unknown dates stay blank)
     with open(RESULTS_FILE, 'a', encoding='utf-8') as file:
-        for internship in internships:
-            date_value = internship.get('date', datetime.datetime.now().strftime('%Y-%m-%d'))
-            line = f"{internship['company']}|{internship['title']}|{internship['location']}|{internship['link']}|{date_value}\n"
-            file.write(line)
+        write_internships(file, internships, header=False)
 
 
-def convert_jobpilot_results(jobs: List[Any]) -> List[Dict[str, str]]:
-    """Convert jobpilot job results to dictionary format."""
-    results = []
-    current_date = datetime.datetime.now().strftime('%Y-%m-%d')
-    
-    for job in jobs:
-        if not hasattr(job, 'company') or not hasattr(job, 'title') or not hasattr(job, 'link'):
-            continue
-        
-        # Try to extract date info from job details
-        posting_date = current_date
-        if hasattr(job, 'details') and job.details:
-            if hasattr(job.details, 'date'):
-                posting_date = job.details.date
-        
-        results.append({
-            'company': job.company.name if hasattr(job.company, 'name') else 'Unknown Company',
-            'title': job.title,
-            'location': str(job.location),
-            'link': job.link,
-            'date': posting_date  # Add the posting date to our data
-        })
-    return results
-
-
-async def scrape_it_internships() -> List[Dict[str, str]]:
-    """Scrape IT engineering internships from LinkedIn."""
-    if not JOBPILOT_AVAILABLE:
-        print("Error: jobpilot module not available. Cannot scrape internships.")
-        return []
-    
-    print("Starting IT engineering internship scraper...")
-    scraper = LinkedInScraper()
-    all_internships = []
-    
-    # Generate focused search terms for IT engineering internships/alternances
+def build_search_terms() -> List[str]:
+    """Build the focused search terms for IT engineering internships/alternances."""
     search_terms = [
         "software engineering intern",
         "it engineering intern", 
@@ -184,71 +228,302 @@ async def scrape_it_internships() -> List[Dict[str, str]]:
     ]
     
     # Add company-specific searches
-    for company in TECH_COMPANIES[:5]:  # Limit to top 5 companies
+    for company in TECH_COMPANIES:
         search_terms.append(f"{company} software intern")
         search_terms.append(f"{company} engineering intern")
     
-    print(f"Using {len(search_terms)} search terms for IT engineering positions")
+    return search_terms
+
+
+def get_http_cache() -> ResponseCache:
+    """The on-disk HTTP response cache, shared by every backend."""
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = ResponseCache(HTTP_CACHE_DIR)
+    return _http_cache
+
+
+def get_scraper_backends(concurrency: int = SCRAPE_CONCURRENCY,
+                         limit: int = LINKEDIN_SEARCH_LIMIT) -> List[ScraperBackend]:
+    """The enabled scraper backends that can run here. Backends are created
+    once per process, so their scrapers stay warm between runs."""
+    enabled = {name.strip() for name in SCRAPE_BACKENDS.split(',')}
+    cache = get_http_cache()
+    backends: List[ScraperBackend] = []
+    if 'linkedin' in enabled:
+        linkedin = _scraper_backends.get('linkedin')
+        if linkedin is None:
+            linkedin = LinkedInBackend('linkedin', LINKEDIN_HOST, HostBudget(
+                concurrency, LINKEDIN_RATE, LINKEDIN_BURST),
+                base_url=LINKEDIN_BASE_URL, cache=cache, search_ttl=SEARCH_CACHE_TTL)
+            _scraper_backends['linkedin'] = linkedin
+        # --concurrency and --limit apply to every run, even with a warm backend
+        linkedin.budget = linkedin.budget._replace(concurrency=concurrency)
+        linkedin.limit = limit
+        backends.append(linkedin)
+    if 'feeds' in enabled:
+        # The feeds file is read on every run, so edits apply without a restart
+        feed_budget = HostBudget(FEED_CONCURRENCY, FEED_RATE, FEED_BURST)
+        backends.extend(load_career_feeds(CAREER_FEEDS_FILE, feed_budget, cache, FEED_CACHE_TTL))
+    return [backend for backend in backends if backend.available()]
+
+
+async def scrape_it_internships(concurrency: int = SCRAPE_CONCURRENCY,
+                                days: Optional[int] = None,
+                                limit: int = LINKEDIN_SEARCH_LIMIT,
+                                plan: bool = True,
+                                resume: bool = False) -> List[Internship]:
+    """Scrape IT engineering internships from every enabled source.
+    Each source host has its own scheduler queue and budget, so the whole
+    (search term, country) matrix is covered with at most `concurrency`
+    LinkedIn searches in flight while career feeds are fetched alongside.
+    With `days`, LinkedIn searches stop paging at postings older than the
+    --days window. With `plan`, the query planner orders the searches by
+    yield and leaves out redundant and low-yield ones whose turn has not come.
+    Every completed search is checkpointed; with `resume`, an unfinished run
+    from the last RESUME_WINDOW_HOURS is continued instead of starting over."""
+    backends = {backend.name: backend for backend in get_scraper_backends(concurrency, limit)}
+    cutoff = date_window(days)[0] if days is not None and days >= 0 else None
+    if not backends:
+        if not JOBPILOT_AVAILABLE:
+            print("Error: jobpilot module not available. Cannot scrape internships.")
+        else:
+            print("Error: no scraper backend enabled. Check SCRAPE_BACKENDS.")
+        return []
     
-    # Search for each term in multiple countries
-    for search_term in search_terms:
-        print(f"Searching for: {search_term}")
-        try:
-            results = await asyncio.gather(
-                *[
-                    scraper.scrape(
-                        ScraperInput(keywords=search_term, location=country, limit=10),
-                        concurrent=False,
-                        retry_delay=1
-                    )
-                    for country in EU_COUNTRIES[:5]  # Limit to first 5 countries
-                ],
-                return_exceptions=True
-            )
-            
-            # Process results
-            for result in results:
-                if isinstance(result, Exception):
-                    print(f"Error during search: {result}")
-                else:
-                    # Convert and save results
-                    converted_jobs = convert_jobpilot_results(result)
-                    append_to_results_file(converted_jobs)
-                    all_internships.extend(converted_jobs)
-                    
-        except Exception as e:
-            print(f"Error during search for {search_term}: {e}")
+    print("Starting IT engineering internship scraper...")
+    cache = get_http_cache()
+    pruned = cache.prune(HTTP_CACHE_MAX_AGE)
+    if pruned:
+        print(f"Removed {pruned} stale responses from the HTTP cache")
+    cache_stats = dict(cache.stats)
+    store = open_job_store()
+    all_internships = []
     
+    search_terms = build_search_terms()
+    tasks = [task for backend in backends.values()
+             for task in backend.tasks(search_terms, EU_COUNTRIES)]
+    print(f"Using {len(search_terms)} search terms across {len(EU_COUNTRIES)} countries "
+          f"({len(tasks)} searches from {', '.join(backends)}, {concurrency} LinkedIn searches at a time)")
+    
+    run = None
+    if resume:
+        run = store.resumable_run(
+            datetime.datetime.now() - datetime.timedelta(hours=RESUME_WINDOW_HOURS))
+    if run is None:
+        run = store.start_scrape_run()
+        store.prune_query_postings(run - QUERY_HISTORY_RUNS)
+    else:
+        completed = store.completed_queries(run)
+        tasks = [task for task in tasks if query_key(task) not in completed]
+        print(f"Resuming scrape run {run}: {len(completed)} searches already done, "
+              f"{len(tasks)} left")
+    if plan:
+        sizes, shared = store.query_overlaps()
+        query_plan = plan_queries(tasks, run, store.query_stats(), sizes, shared)
+        merged = sum(1 for task in query_plan.deferred if query_key(task) in query_plan.merged)
+        print(f"Query plan: {len(query_plan.tasks)} searches this run, {merged} merged into "
+              f"other queries, {len(query_plan.deferred) - merged} low-yield ones deferred")
+        tasks = query_plan.tasks
+    
+    async def scrape_task(task: ScrapeTask) -> List[Internship]:
+        with SCRAPE_LATENCY.time(term=task.term, country=task.country):
+            return await backends[task.source].search(task, store.known_link_keys, cutoff)
+    
+    def handle_results(task: ScrapeTask, converted_jobs: List[Internship]) -> None:
+        SCRAPE_ROWS.observe(len(converted_jobs), term=task.term, country=task.country)
+        # Yield statistics for the query planner: new postings per request
+        link_keys = {job.link_key for job in converted_jobs if job.link_key}
+        new_postings = len(link_keys - store.known_link_keys(link_keys))
+        report = backends[task.source].pop_report(task, converted_jobs)
+        # Classify the batch up front so the classifier's throughput can be measured
+        started = time.perf_counter()
+        verdicts = {job.title: is_it_engineering_internship(job.title) for job in converted_jobs}
+        observe_classifier(len(converted_jobs), time.perf_counter() - started)
+        store.upsert_many(converted_jobs, verdicts.__getitem__)
+        append_to_results_file(converted_jobs)
+        all_internships.extend(converted_jobs)
+        # Checkpoint last: a search interrupted before this point is redone on --resume
+        store.record_query(run, query_key(task), report.requests, new_postings, report.link_keys)
+    
+    scheduler = ScrapeScheduler(
+        scrape_task,
+        concurrency=concurrency,
+        rate_per_host=LINKEDIN_RATE,
+        burst=LINKEDIN_BURST,
+        max_retries=SCRAPE_MAX_RETRIES,
+        host_budgets=host_budgets(list(backends.values())),
+        # Backends charge every HTTP request, not just every search
+        charge_per_task=False
+    )
+    for backend in backends.values():
+        backend.throttle = functools.partial(scheduler.acquire, backend.host)
+    try:
+        stats = await scheduler.run(
+            tasks, handle_results,
+            lambda task, error: SCRAPE_FAILURES.inc(term=task.term, country=task.country))
+        # A run with failed searches stays open, so --resume can retry just those
+        if not stats['failed']:
+            store.finish_scrape_run(run)
+    finally:
+        store.close()
+    
+    print(f"Searches completed: {stats['completed']}, retried: {stats['retried']}, failed: {stats['failed']}")
+    print("HTTP cache: " + ", ".join(f"{name} {cache.stats[name] - cache_stats[name]}"
+                                     for name in cache.stats))
     print(f"Found {len(all_internships)} total internship positions")
     return all_internships
 
 
 # === FILTERING FUNCTIONS ===
-def is_it_engineering_internship(title: str) -> bool:
-    """Check if a job title is an IT engineering internship/alternance.
-    Now with stricter filtering to ensure only IT engineering positions."""
-    title_lower = title.lower()
+def iter_it_internships(internships: Iterable[Internship]) -> Iterator[Internship]:
+    """Yield only IT engineering internships/alternances. A posting without a
+    parseable date keeps it unknown, so the --days window leaves it out."""
+    for internship in internships:
+        if not internship.title:
+            continue
+        
+        if is_it_engineering_internship(internship.title):
+            yield internship
+
+
+def iter_unique_internships(internships: Iterable[Internship],
+                            seen_links: set) -> Iterator[Internship]:
+    """Yield internships whose canonical link key is not in `seen_links` (updated in place)."""
+    total = unique = 0
+    try:
+        for internship in internships:
+            total += 1
+            link = internship.link_key
+            if link and link not in seen_links:
+                seen_links.add(link)
+                unique += 1
+                yield internship
+    finally:
+        observe_dedup("link", total, unique)
+
+
+def select_it_internships(internships: Iterable[Internship],
+                          seen_links: set) -> List[Internship]:
+    """Keep IT engineering internships whose link is not in `seen_links` (updated in place)."""
+    return list(iter_unique_internships(iter_it_internships(internships), seen_links))
+
+
+def iter_new_results(offset: int, progress: Dict[str, int]) -> Iterator[Internship]:
+    """Yield the rows appended to the results file after byte `offset`.
+    `progress['offset']` always holds the offset to resume from next time."""
+    with open(RESULTS_FILE, 'rb') as file:
+        fieldnames = file.readline().decode('utf-8').strip().split('|')
+        position = max(offset, file.tell())
+        file.seek(position)
+        progress['offset'] = position
+        
+        def complete_lines() -> Iterator[str]:
+            for line in file:
+                # Only consume complete lines; a line still being written is picked up next run
+                if not line.endswith(b'\n'):
+                    return
+                progress['offset'] += len(line)
+                yield line.decode('utf-8')
+        
+        yield from iter_internships(complete_lines(), fieldnames)
+
+
+def read_new_results(offset: int) -> Tuple[List[Internship], int]:
+    """Read the rows appended to the results file after byte `offset`.
+    Returns the rows and the offset to resume from next time."""
+    progress: Dict[str, int] = {}
+    rows = list(iter_new_results(offset, progress))
+    return rows, progress['offset']
+
+
+def load_filter_state() -> Dict[str, Any]:
+    """Load the incremental filtering high-water mark, if any."""
+    try:
+        with open(FILTER_STATE_FILE, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_filter_state(results_offset: int, filtered_links: Iterable[str],
+                      replace: bool = False) -> None:
+    """Remember how far the results file has been filtered, and the filtered
+    file it was merged into, so the next run only processes new rows. The
+    links written to the filtered file (all of them with `replace`) go to the
+    job store, which answers "already filtered" for the next run."""
+    store = JobStore(JOBS_DB_FILE)
+    try:
+        store.add_filtered_links(filtered_links, replace)
+    finally:
+        store.close()
+
+    results_stat = os.stat(RESULTS_FILE)
+    state = {'results_offset': results_offset, 'results_inode': results_stat.st_ino,
+             'filtered_links': True}
+    if os.path.exists(FILTERED_RESULTS_FILE):
+        filtered_stat = os.stat(FILTERED_RESULTS_FILE)
+        state['filtered_size'] = filtered_stat.st_size
+        state['filtered_mtime_ns'] = filtered_stat.st_mtime_ns
     
-    # Check if it's an IT position
-    is_it = any(keyword in title_lower for keyword in IT_KEYWORDS)
+    with open(FILTER_STATE_FILE, 'w', encoding='utf-8') as file:
+        json.dump(state, file)
+
+
+def filter_state_is_valid(state: Dict[str, Any]) -> bool:
+    """Check the high-water mark still matches the files on disk.
+    It is invalid if the results file was replaced or truncated, or if the
+    filtered file was rewritten by something else (e.g. enhance_filtering.py)."""
+    # States from before the job store kept the filtered links are refiltered once
+    if not state or not state.get('filtered_links') or not os.path.exists(FILTERED_RESULTS_FILE):
+        return False
     
-    # Check if it's an internship/alternance
-    is_internship = any(keyword in title_lower for keyword in INTERNSHIP_KEYWORDS)
+    results_stat = os.stat(RESULTS_FILE)
+    filtered_stat = os.stat(FILTERED_RESULTS_FILE)
+    return (state.get('results_inode') == results_stat.st_ino
+            and state.get('results_offset', 0) <= results_stat.st_size
+            and state.get('filtered_size') == filtered_stat.st_size
+            and state.get('filtered_mtime_ns') == filtered_stat.st_mtime_ns)
+
+
+def filter_new_internships() -> List[Internship]:
+    """Classify only the rows appended to the results file since the last run
+    and append them to the existing filtered results. Returns the new ones."""
+    state = load_filter_state()
+    if not filter_state_is_valid(state):
+        print("No valid filtering checkpoint - filtering the full results history")
+        return filter_it_internships()
+    
+    new_rows, new_offset = read_new_results(state['results_offset'])
+    print(f"Processing {len(new_rows)} new internships since the last run")
     
-    # Exclude non-IT positions that might match keywords accidentally
-    exclude_terms = ["non-tech", "non tech", "accounting", "finance", "sales", 
-                     "marketing", "recruiter", "hr ", "human resources", 
-                     "administrative", "business development"]
+    # Only the new rows' links are looked up, however long the filtered history
+    store = JobStore(JOBS_DB_FILE)
+    try:
+        seen_links = store.filtered_link_keys(row.link_key for row in new_rows)
+    finally:
+        store.close()
+    new_internships = select_it_internships(new_rows, seen_links)
     
-    has_exclusion = any(term in title_lower for term in exclude_terms)
+    if new_internships:
+        append_csv_data(new_internships, str(FILTERED_RESULTS_FILE))
+    save_filter_state(new_offset, (internship.link_key for internship in new_internships))
     
-    # Must be both IT and internship, but not contain exclusion terms
-    return is_it and is_internship and not has_exclusion
+    print(f"Found {len(new_internships)} new unique IT engineering internships/alternances")
+    return new_internships
 
 
-def filter_it_internships(input_files: List[str] = None) -> List[Dict[str, str]]:
-    """Filter for IT engineering internships and alternances."""
+def filter_it_internships(input_files: List[str] = None,
+                          incremental: bool = False) -> List[Internship]:
+    """Filter for IT engineering internships and alternances.
+    With `incremental`, only rows added to the results file since the last run
+    are classified and appended to the existing filtered results, and only
+    those are returned."""
+    if incremental and not input_files and os.path.exists(RESULTS_FILE):
+        return filter_new_internships()
+    
     all_internships = []
+    results_offset = None
     
     # Determine input files
     if not input_files:
@@ -262,51 +537,76 @@ def filter_it_internships(input_files: List[str] = None) -> List[Dict[str, str]]
     # Read all input files
     for file_path in input_files:
         print(f"Reading {file_path}...")
-        all_internships.extend(read_csv_data(file_path))
+        if (os.path.exists(file_path) and os.path.exists(RESULTS_FILE)
+                and os.path.samefile(file_path, RESULTS_FILE)):
+            # Track how far we read so the next incremental run starts there
+            rows, results_offset = read_new_results(0)
+            all_internships.extend(rows)
+        else:
+            all_internships.extend(read_csv_data(file_path))
     
     print(f"Processing {len(all_internships)} total internships")
     
-    # Filter for IT engineering internships/alternances
-    filtered_internships = []
-    for internship in all_internships:
-        if not internship or 'title' not in internship:
-            continue
-        
-        title = internship.get('title', '')
-        if not title:
-            continue
-        
-        if is_it_engineering_internship(title):
-            # Ensure the internship has a date field
-            if 'date' not in internship:
-                # If we don't have a date, add today's date as default
-                internship['date'] = datetime.datetime.now().strftime('%Y-%m-%d')
-            filtered_internships.append(internship)
-    
-    # Remove duplicates based on link
-    seen_links = set()
-    unique_internships = []
-    for internship in filtered_internships:
-        link = internship.get('link', '')
-        if link and link not in seen_links:
-            seen_links.add(link)
-            unique_internships.append(internship)
+    unique_internships = select_it_internships(all_internships, set())
     
     print(f"Found {len(unique_internships)} unique IT engineering internships/alternances")
     
     # Save filtered results
     if unique_internships:
-        # Make sure our data has the date field in every record
-        for internship in unique_internships:
-            if 'date' not in internship:
-                internship['date'] = datetime.datetime.now().strftime('%Y-%m-%d')
-        
         write_csv_data(unique_internships, str(FILTERED_RESULTS_FILE))
+        if results_offset is not None:
+            save_filter_state(results_offset, (internship.link_key for internship in unique_internships),
+                              replace=True)
     
     return unique_internships
 
 
-def filter_recent_internships(internships: List[Dict[str, str]], days: int = 4) -> List[Dict[str, str]]:
+def stream_filter_it_internships(input_files: List[str] = None,
+                                 days: Optional[int] = None) -> int:
+    """Streaming variant of filter_it_internships.
+    Rows flow one at a time from the CSV reader through classification, link
+    dedup and (optionally) the date window into the filtered results file, so
+    memory use depends on the number of unique links, not on the size of the
+    results file. Returns the number of internships written."""
+    progress: Dict[str, int] = {}
+    if not input_files and os.path.exists(RESULTS_FILE):
+        print(f"Streaming {RESULTS_FILE}...")
+        rows = iter_new_results(0, progress)
+    else:
+        rows = itertools.chain.from_iterable(
+            iter_csv_data(file_path) for file_path in input_files or find_all_result_files()
+        )
+    
+    seen_links: set = set()
+    internships = iter_unique_internships(iter_it_internships(rows), seen_links)
+    if days is not None and days >= 0:
+        internships = iter_recent_internships(internships, days)
+    
+    count = write_csv_stream(internships, str(FILTERED_RESULTS_FILE))
+    print(f"Found {count} unique IT engineering internships/alternances")
+    
+    # Only a full, undated filtered set can be extended incrementally later
+    if count and 'offset' in progress and days is None:
+        save_filter_state(progress['offset'], seen_links, replace=True)
+    return count
+
+
+def iter_recent_internships(internships: Iterable[Internship],
+                            days: int) -> Iterator[Internship]:
+    """Yield internships posted in the last N days (today only when days=0).
+    Entries without a parseable date are skipped."""
+    # One cutoff for the whole pass; today only when days=0
+    cutoff, today = date_window(days)
+    latest = today if days == 0 else datetime.date.max
+    for internship in internships:
+        # The date was parsed when the record was read; if it is
+        # missing or was unparseable, don't include it (we want to be strict)
+        post_date = internship.date
+        if post_date is not None and cutoff <= post_date <= latest:
+            yield internship
+
+
+def filter_recent_internships(internships: List[Internship], days: int = 4) -> List[Internship]:
     """Filter internships to only include those posted in the last N days."""
     if not internships:
         return []
@@ -315,13 +615,8 @@ def filter_recent_internships(internships: List[Dict[str, str]], days: int = 4)
     if days < 0:
         return internships
         
-    today = datetime.datetime.now().date()
-    recent_internships = []
-    
-    # Check if 'date' field exists in the data
-    has_date_field = False
-    if internships and 'date' in internships[0]:
-        has_date_field = True
+    # Check if any internship has date information
+    has_date_field = any(internship.date is not None for internship in internships)
     
     # If no date field exists but days=0 (today only), return empty list as we can't determine today's posts
     if days == 0 and not has_date_field:
@@ -336,175 +631,243 @@ def filter_recent_internships(internships: List[Dict[str, str]], days: int = 4)
         return internships
         
     # At this point we have date information, so filter by it
-    for internship in internships:
-        try:
-            # Get the date from the internship data
-            date_str = internship.get('date', '')
-            
-            # If no date field, don't include it (we want to be strict)
-            if not date_str:
-                continue
-                
-            # Try to parse the date
-            try:
-                post_date = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
-            except ValueError:
-                # Try alternate format
-                try:
-                    post_date = datetime.datetime.strptime(date_str, '%d %b %Y').date()
-                except ValueError:
-                    # If we can't parse the date, don't include it (we want to be strict)
-                    continue
-            
-            # Calculate days difference
-            days_old = (today - post_date).days
-            
-            # Keep only recent posts with correct dates
-            if days == 0:  # Today only
-                if days_old == 0:
-                    recent_internships.append(internship)
-            else:  # Last N days
-                if days_old <= days:
-                    recent_internships.append(internship)
-                
-        except Exception as e:
-            # If there's any error processing the date, don't include it (we want to be strict)
-            print(f"Error processing date: {e}")
+    recent_internships = list(iter_recent_internships(internships, days))
     
     print(f"Filtered to {len(recent_internships)} internships from the last {days} days")
     return recent_internships
 
 
 # === TELEGRAM FUNCTIONS ===
-def format_telegram_message(internships: List[Dict[str, str]], max_entries: int = 20) -> str:
-    """Format internship data for a Telegram message."""
+def telegram_message_blocks(internships: List[Internship],
+                            max_entries: int = 20) -> Tuple[str, List[str], str]:
+    """The header, one block per shown entry, and the footer of a Telegram digest."""
     total_count = len(internships)
-    
-    message = f"🚀 IT Engineering Internships & Alternances 🚀\n\n"
+    header = "🚀 IT Engineering Internships & Alternances 🚀"
     
     # Simplified message format to avoid Telegram parsing issues
-    # Only show a subset of the internships to avoid message length issues
-    shown_internships = internships[:max_entries]
-    
-    for i, internship in enumerate(shown_internships):
+    entries = []
+    for i, internship in enumerate(internships[:max_entries]):
         # Strip any problematic characters that could affect markdown
-        company = internship.get('company', 'Unknown Company').replace('*', '').replace('_', '')
-        title = internship.get('title', 'Unknown Position').replace('*', '').replace('_', '')
-        location = internship.get('location', 'Unknown Location').replace('*', '').replace('_', '')
-        link = internship.get('link', '#')
-        date = internship.get('date', 'Unknown Date')
-        
-        message += f"{i+1}. {company}\n"
-        message += f"📌 {title}\n"
-        message += f"📍 {location}\n"
-        message += f"🗓 Posted: {date}\n"
-        message += f"🔗 {link}\n\n"
+        company = (internship.company or 'Unknown Company').replace('*', '').replace('_', '')
+        title = (internship.title or 'Unknown Position').replace('*', '').replace('_', '')
+        location = (internship.location or 'Unknown Location').replace('*', '').replace('_', '')
+        link = internship.link or '#'
+        date = internship.date_str or 'Unknown Date'
+        entries.append(f"{i+1}. {company}\n📌 {title}\n📍 {location}\n🗓 Posted: {date}\n🔗 {link}")
     
     # Add summary
+    footer = []
     if total_count > max_entries:
-        message += f"\n...and {total_count - max_entries} more opportunities"
-    
-    message += f"\n\nUpdated: {time.strftime('%d %b %Y')}"
-    return message
+        footer.append(f"...and {total_count - max_entries} more opportunities")
+    footer.append(f"Updated: {time.strftime('%d %b %Y')}")
+    return header, entries, "\n\n".join(footer)
 
 
-def send_to_telegram(bot_token: str, chat_id: str, message: str) -> bool:
-    """Send a message to a Telegram chat."""
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-    
+def format_telegram_message(internships: List[Internship], max_entries: int = 20) -> str:
+    """Format internship data as a single Telegram message."""
+    header, entries, footer = telegram_message_blocks(internships, max_entries)
+    return "\n\n".join([header, *entries, footer])
+
+
+def format_telegram_pages(internships: List[Internship], max_entries: int = 20) -> List[str]:
+    """Format internship data as Telegram-sized messages, never splitting an entry."""
+    header, entries, footer = telegram_message_blocks(internships, max_entries)
+    return paginate(entries, header, footer)
+
+
+def send_to_telegram(bot_token: str, chat_id: str, pages: List[str]) -> bool:
+    """Send pre-split messages to a Telegram chat, one request per page."""
     # For simplicity, send without markdown to avoid parsing issues
-    payload = {
-        'chat_id': chat_id,
-        'text': message,
-        'disable_web_page_preview': True
-    }
-    
     try:
-        response = requests.post(url, data=payload)
-        
-        if response.status_code == 200:
-            print(f"Message successfully sent to Telegram chat {chat_id}")
-            return True
-        else:
-            print(f"Failed to send message. Status code: {response.status_code}")
-            print(f"Response: {response.text}")
-            
-            # If message is too long, try splitting and sending in chunks
-            if response.status_code == 400 and len(message) > 4000:
-                print("Message too long, splitting into chunks...")
-                
-                # Split message into chunks of maximum 3900 characters
-                # Try to split at double newlines to maintain formatting
-                chunks = []
-                current_chunk = ""
-                
-                for line in message.split('\n\n'):
-                    if len(current_chunk) + len(line) + 2 > 3900:  # +2 for the newline chars
-                        chunks.append(current_chunk)
-                        current_chunk = line + "\n\n"
-                    else:
-                        current_chunk += line + "\n\n"
-                
-                if current_chunk:
-                    chunks.append(current_chunk)
-                
-                # Send chunks
-                success = True
-                for i, chunk in enumerate(chunks):
-                    chunk_payload = {
-                        'chat_id': chat_id,
-                        'text': f"Part {i+1}/{len(chunks)}\n\n{chunk}",
-                        'disable_web_page_preview': True
-                    }
-                    
-                    chunk_response = requests.post(url, data=chunk_payload)
-                    if chunk_response.status_code != 200:
-                        print(f"Failed to send chunk {i+1}. Status code: {chunk_response.status_code}")
-                        print(f"Response: {chunk_response.text}")
-                        success = False
-                    else:
-                        print(f"Chunk {i+1}/{len(chunks)} sent successfully")
-                
-                return success
-            
-            return False
+        return shared_client(bot_token).send_messages(chat_id, pages)
     except Exception as e:
         print(f"Error sending to Telegram: {e}")
         return False
 
 
+def build_digest_attachment(internships: List[Internship]) -> Tuple[str, bytes]:
+    """The whole set as a gzipped CSV in the layout of FILTERED_RESULTS_FILE.
+    Returns (file name, compressed bytes)."""
+    buffer = io.StringIO()
+    write_internships(buffer, internships)
+    filename = f"{FILTERED_RESULTS_FILE.stem}_{datetime.date.today().isoformat()}.csv.gz"
+    return filename, gzip.compress(buffer.getvalue().encode('utf-8'))
+
+
+def send_digest_to_telegram(bot_token: str, chat_id: str, internships: List[Internship]) -> bool:
+    """Send a short summary message plus every internship as one compressed
+    CSV document: two requests, however many internships there are."""
+    summary = truncate(format_telegram_message(internships, DIGEST_PREVIEW_ENTRIES), MESSAGE_LIMIT)
+    filename, data = build_digest_attachment(internships)
+    try:
+        client = shared_client(bot_token)
+        summary_result = client.send_message(chat_id, summary)
+        document_result = client.send_document(
+            chat_id, filename, data, mime_type="application/gzip",
+            caption=f"All {len(internships)} internships ({'|'.join(RESULT_FIELDS)})")
+    except Exception as e:
+        print(f"Error sending to Telegram: {e}")
+        return False
+    
+    if not document_result.get('ok'):
+        print(f"Failed to send digest document. Response: {document_result}")
+        return False
+    if not summary_result.get('ok'):
+        print(f"Failed to send digest summary. Response: {summary_result}")
+    print(f"Digest of {len(internships)} internships ({len(data)} bytes) sent to Telegram chat {chat_id}")
+    return True
+
+
+def get_send_executor() -> ThreadPoolExecutor:
+    """The threads delivering to chats. They live as long as the process, so
+    each keeps reusing its keep-alive connection to the Bot API from run to run."""
+    global _send_executor
+    if _send_executor is None:
+        _send_executor = ThreadPoolExecutor(max_workers=TELEGRAM_SEND_WORKERS,
+                                            thread_name_prefix="telegram-send")
+    return _send_executor
+
+
+def deliver_to_chat(bot_token: str, chat_id: str, groups: List[List[Internship]],
+                    max_entries: int = 20, digest: bool = False) -> List[Internship]:
+    """Send one chat its groups of reposts, as pages or as a digest.
+    Returns the postings delivered (for pages, only the entries shown)."""
+    entries = [merge_group(group) for group in groups]
+    if digest:
+        delivered = groups if send_digest_to_telegram(bot_token, chat_id, entries) else []
+    else:
+        pages = format_telegram_pages(entries, max_entries)
+        delivered = groups[:max_entries] if send_to_telegram(bot_token, chat_id, pages) else []
+    return list(itertools.chain.from_iterable(delivered))
+
+
 # === MAIN FUNCTIONS ===
-async def main_async(args: argparse.Namespace) -> None:
-    """Asynchronous main function for scraping and processing."""
+async def main_async(args: argparse.Namespace) -> Dict[str, int]:
+    """Asynchronous main function for scraping and processing.
+    Returns a summary of the run: IT internships known ("jobs"), recent ones
+    ("recent") and postings delivered to Telegram ("sent")."""
+    days_to_include = args.days if hasattr(args, 'days') else 3
+    subscriptions = load_subscriptions(SUBSCRIPTIONS_FILE, CHAT_ID)
+    default_days = days_to_include
+    if args.send:
+        # Wide enough for the subscriber with the longest --days profile
+        days_to_include = widest_window(subscriptions, default_days)
+
     # Step 1: Run the scraper if requested
     if args.scrape:
         if JOBPILOT_AVAILABLE:
             print("\n=== SCRAPING IT ENGINEERING INTERNSHIPS ===")
-            await scrape_it_internships()
+            with stage_timer("scrape"):
+                # Stop paging at the widest window, so no subscriber loses postings
+                await scrape_it_internships(getattr(args, 'concurrency', SCRAPE_CONCURRENCY),
+                                            days_to_include if hasattr(args, 'days') else None,
+                                            getattr(args, 'limit', LINKEDIN_SEARCH_LIMIT),
+                                            not getattr(args, 'no_plan', False),
+                                            getattr(args, 'resume', False))
         else:
             print("\nError: Cannot scrape - jobpilot module not available")
     
-    # Step 2: Filter results if there's data to filter
-    filtered_internships = []
-    if os.path.exists(FILTERED_RESULTS_FILE):
-        # If we already have filtered results, use them directly
-        print("\n=== USING EXISTING FILTERED RESULTS ===")
-        filtered_internships = read_csv_data(str(FILTERED_RESULTS_FILE))
-    else:
-        # Otherwise filter from raw data
-        print("\n=== FILTERING FOR IT ENGINEERING POSITIONS ===")
-        filtered_internships = filter_it_internships()
-    
-    # Step 3: Filter for recent results (last 3 days only)
-    print("\n=== FILTERING FOR RECENT POSTINGS (3 DAYS MAX) ===")
-    days_to_include = args.days if hasattr(args, 'days') else 3
-    recent_internships = filter_recent_internships(filtered_internships, days_to_include)
-    
-    # Step 4: Send to Telegram
+    # Step 2: Query the job store - IT classification, dedup and the date
+    # window are all answered by indexed queries
+    recent_internships = []
+    job_count = 0
+    sent_count = 0
+    store = open_job_store()
+    try:
+        use_store = store.count(it_only=False) > 0
+        if use_store:
+            if args.scrape:
+                # Keep the filtered CSV up to date for send_to_telegram.py and the status page,
+                # classifying only the rows this run added to the results file
+                print("\n=== UPDATING FILTERED RESULTS ===")
+                with stage_timer("filter"):
+                    if getattr(args, 'stream', False):
+                        stream_filter_it_internships()
+                    else:
+                        filter_it_internships(incremental=not getattr(args, 'full_refilter', False))
+            
+            print(f"\n=== QUERYING JOB STORE FOR RECENT POSTINGS ({days_to_include} DAYS MAX) ===")
+            with stage_timer("query"):
+                recent_internships = store.query_internships(days_to_include)
+                job_count = store.count()
+            print(f"Found {len(recent_internships)} internships from the last {days_to_include} days")
+    finally:
+        store.close()
+    
+    if not use_store:
+        # Step 2 (fallback): Filter results from CSV files if the store has no data
+        with stage_timer("filter"):
+            filtered_internships = []
+            if getattr(args, 'stream', False):
+                # Constant-memory pass over the whole history, then only the
+                # recent postings are read back from the filtered file
+                print("\n=== STREAMING FILTER FOR IT ENGINEERING POSITIONS ===")
+                job_count = stream_filter_it_internships()
+                rows = iter_csv_data(str(FILTERED_RESULTS_FILE))
+                if days_to_include >= 0:
+                    rows = iter_recent_internships(rows, days_to_include)
+                recent_internships = list(rows)
+                print(f"Found {len(recent_internships)} internships from the last {days_to_include} days")
+            elif os.path.exists(RESULTS_FILE):
+                # Classify only rows added since the last run and merge them in
+                print("\n=== FILTERING FOR IT ENGINEERING POSITIONS ===")
+                incremental = not getattr(args, 'full_refilter', False)
+                filtered_internships = filter_it_internships(incremental=incremental)
+                if incremental:
+                    # The incremental pass only returns the rows it added
+                    filtered_internships = read_csv_data(str(FILTERED_RESULTS_FILE))
+            elif os.path.exists(FILTERED_RESULTS_FILE):
+                # If we already have filtered results, use them directly
+                print("\n=== USING EXISTING FILTERED RESULTS ===")
+                filtered_internships = read_csv_data(str(FILTERED_RESULTS_FILE))
+            else:
+                # Otherwise filter from raw data
+                print("\n=== FILTERING FOR IT ENGINEERING POSITIONS ===")
+                filtered_internships = filter_it_internships()
+        
+            if filtered_internships:
+                job_count = len(filtered_internships)
+        
+            # Step 3: Filter for recent results (last 3 days only)
+            if filtered_internships:
+                print("\n=== FILTERING FOR RECENT POSTINGS (3 DAYS MAX) ===")
+                recent_internships = filter_recent_internships(filtered_internships, days_to_include)
+    
+    # Step 4: Send to Telegram. Each subscribed chat (see subscriptions.py)
+    # gets the postings its profile matches, one entry per group of reposts,
+    # skipping postings it has already received; chats are sent to concurrently
     if args.send and recent_internships:
-        print(f"\n=== SENDING {len(recent_internships)} RECENT RESULTS TO TELEGRAM ===")
-        message = format_telegram_message(recent_internships, args.max_entries)
-        send_to_telegram(BOT_TOKEN, CHAT_ID, message)
+        assignments = SubscriptionIndex(subscriptions).assign(recent_internships, default_days)
+        store = open_job_store()
+        try:
+            deliveries = []
+            with stage_timer("dedup"):
+                for chat_id, internships in assignments.items():
+                    groups = group_near_duplicates(internships)
+                    observe_dedup("repost", len(internships), len(groups))
+                    if not getattr(args, 'resend', False):
+                        distinct_count = len(groups)
+                        groups = store.unsent_groups(chat_id, groups)
+                        observe_dedup("already_sent", distinct_count, len(groups))
+                    print(f"Chat {chat_id}: {len(internships)} matching postings, "
+                          f"{len(groups)} distinct ones not sent yet")
+                    if groups:
+                        deliveries.append((chat_id, groups))
+            if deliveries:
+                mode = "DIGESTS" if getattr(args, 'digest', False) else "RECENT RESULTS"
+                print(f"\n=== SENDING {mode} TO {len(deliveries)} TELEGRAM CHAT(S) ===")
+                with stage_timer("send"):
+                    delivered = list(get_send_executor().map(
+                        lambda delivery: deliver_to_chat(
+                            BOT_TOKEN, *delivery, args.max_entries, getattr(args, 'digest', False)),
+                        deliveries))
+                # The job store stays on this thread
+                for (chat_id, _), internships in zip(deliveries, delivered, strict=True):
+                    sent_count += store.mark_sent(chat_id, internships)
+        finally:
+            store.close()
+    
+    return {"jobs": job_count, "recent": len(recent_internships), "sent": sent_count}
 
 
 def main() -> None:
@@ -522,6 +885,23 @@ def main() -> None:
                       help="Only include internships from the last N days (default: 3)")
     parser.add_argument("--today", action="store_true",
                       help="Only include today's internships (overrides --days)")
+    parser.add_argument("--concurrency", type=int, default=SCRAPE_CONCURRENCY,
+                      help=f"Maximum searches to run at the same time (default: {SCRAPE_CONCURRENCY})")
+    parser.add_argument("--limit", type=int, default=LINKEDIN_SEARCH_LIMIT,
+                      help=f"Most postings one LinkedIn search may page through (default: {LINKEDIN_SEARCH_LIMIT})")
+    parser.add_argument("--no_plan", action="store_true",
+                      help="Run every search in order instead of following the query planner")
+    parser.add_argument("--resume", action="store_true",
+                      help=f"Continue an interrupted scrape run from the last {RESUME_WINDOW_HOURS:g} hours, "
+                           "skipping the searches it completed")
+    parser.add_argument("--full_refilter", action="store_true",
+                      help="Re-filter the whole results history instead of only new rows")
+    parser.add_argument("--stream", action="store_true",
+                      help="Re-filter the whole results history with the constant-memory streaming pipeline")
+    parser.add_argument("--digest", action="store_true",
+                      help="Send every result as one compressed CSV document plus a short summary")
+    parser.add_argument("--resend", action="store_true",
+                      help="Also send postings this chat has already received")
     parser.add_argument("--all", action="store_true",
                       help="Run all steps (scrape, filter, send)")
     
@@ -0,0 +1,512 @@
+#!/usr/bin/env python
+"""
+Internship Job Store
+--------------------
+SQLite-backed storage for scraped internships:
+1. One row per posting, deduplicated by a unique index on the normalized link
+2. The IT-internship verdict is computed once, when a posting is first stored
+3. Filtering, dedup and the --days window are indexed queries instead of
+   full scans of the results CSV
+4. A per-chat index of the postings already sent, so each chat only ever
+   receives a posting once, across runs
+5. Per-query yield statistics and the postings each query found, which the
+   query planner (query_planner.py) schedules scrape runs from
+6. A checkpoint per completed (term, country) query of a scrape run, so an
+   interrupted run can be resumed where it stopped
+7. An inverted index from title and company tokens to postings, plus the
+   country of every posting, so posting_index.py answers questions about the
+   whole history ("backend interns in Germany this week") without a scan
+8. The link keys written to the filtered results CSV, so incremental
+   filtering checks only the new rows instead of re-reading that file
+
+The database runs in WAL mode so the status page can read while a scrape writes.
+"""
+import datetime
+import os
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from internship_record import (
+    RESULT_FIELDS, Internship, canonical_link_key, iter_internships, location_country, place_name
+)
+from near_duplicates import TOKEN_PATTERN
+from posting_dates import parse_date
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    link_key TEXT NOT NULL,
+    company TEXT NOT NULL,
+    title TEXT NOT NULL,
+    location TEXT NOT NULL,
+    link TEXT NOT NULL,
+    date TEXT NOT NULL,
+    is_it INTEGER NOT NULL DEFAULT 0,
+    first_seen TEXT NOT NULL,
+    country TEXT NOT NULL DEFAULT ''
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_link_key ON jobs (link_key);
+CREATE INDEX IF NOT EXISTS idx_jobs_date ON jobs (date);
+CREATE INDEX IF NOT EXISTS idx_jobs_company ON jobs (company);
+CREATE TABLE IF NOT EXISTS sent_jobs (
+    chat_id TEXT NOT NULL,
+    link_key TEXT NOT NULL,
+    sent_at TEXT NOT NULL,
+    PRIMARY KEY (chat_id, link_key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS filtered_links (
+    link_key TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scrape_runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    finished_at TEXT
+);
+CREATE TABLE IF NOT EXISTS scrape_checkpoints (
+    run INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    term TEXT NOT NULL,
+    country TEXT NOT NULL,
+    completed_at TEXT NOT NULL,
+    PRIMARY KEY (run, source, term, country)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS query_stats (
+    source TEXT NOT NULL,
+    term TEXT NOT NULL,
+    country TEXT NOT NULL,
+    runs INTEGER NOT NULL DEFAULT 0,
+    requests INTEGER NOT NULL DEFAULT 0,
+    new_postings INTEGER NOT NULL DEFAULT 0,
+    yield_rate REAL NOT NULL DEFAULT 0,
+    last_run INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (source, term, country)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS query_postings (
+    source TEXT NOT NULL,
+    term TEXT NOT NULL,
+    country TEXT NOT NULL,
+    link_key TEXT NOT NULL,
+    run INTEGER NOT NULL,
+    PRIMARY KEY (source, term, country, link_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_query_postings_link ON query_postings (source, country, link_key);
+CREATE TABLE IF NOT EXISTS job_terms (
+    term TEXT NOT NULL,
+    job_id INTEGER NOT NULL,
+    PRIMARY KEY (term, job_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_job_terms_job ON job_terms (job_id);
+"""
+
+# PRAGMA user_version of a store whose link keys are canonical (1) and whose
+# posting index is built (2); older stores are migrated when opened
+LINK_KEYS_VERSION = 1
+INDEX_VERSION = 2
+
+# Prefix of the company tokens in the posting index
+COMPANY_TERM = "company:"
+
+# Weight of the latest run in a query's yield (moving average)
+YIELD_SMOOTHING = 0.3
+
+# (source, term, country) of a scrape query
+QueryKey = Tuple[str, str, str]
+
+
+class QueryStats(NamedTuple):
+    """What a scrape query has paid off so far. `yield_rate` is a moving
+    average of new postings per request; `last_run` the last run that polled it."""
+    runs: int
+    requests: int
+    new_postings: int
+    yield_rate: float
+    last_run: int
+
+
+# Keep the earliest known posting date when a posting is scraped again
+# ('' is an unknown date, replaced by any known one)
+UPSERT_SQL = """
+INSERT INTO jobs (link_key, company, title, location, link, date, is_it, first_seen, country)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (link_key) DO UPDATE SET
+    company = excluded.company,
+    title = excluded.title,
+    location = excluded.location,
+    date = CASE WHEN jobs.date = '' THEN excluded.date
+                WHEN excluded.date = '' THEN jobs.date
+                ELSE MIN(jobs.date, excluded.date) END,
+    is_it = excluded.is_it,
+    country = excluded.country
+"""
+
+
+def index_term(token: str) -> str:
+    """A lowercase token as the posting index stores it: plural "s" dropped
+    from longer words, so "developers" finds "Developer"."""
+    token = token.lower()
+    if len(token) > 4 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def posting_terms(title: str, company: str = "") -> Set[str]:
+    """The index terms of a posting: its title tokens and its company tokens."""
+    terms = {index_term(token) for token in TOKEN_PATTERN.findall(title.lower())}
+    terms.update(COMPANY_TERM + index_term(token) for token in TOKEN_PATTERN.findall(company.lower()))
+    return terms
+
+
+def earliest_date(first: str, second: str) -> str:
+    """The earlier of two stored dates; '' (unknown) only if both are unknown."""
+    return min(first, second) if first and second else first or second
+
+
+class JobStore:
+    """Persistent, deduplicated store of scraped internships."""
+
+    def __init__(self, db_path: Path, read_only: bool = False) -> None:
+        self.db_path = db_path
+        if read_only:
+            # For queries only: no schema changes, and the store must be up to date
+            self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] < INDEX_VERSION:
+                self.conn.close()
+                raise sqlite3.OperationalError(f"{db_path} has no posting index yet")
+            return
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        # Stores created before runs could be resumed lack finished_at
+        if 'finished_at' not in {column for _, column, *_ in
+                                 self.conn.execute("PRAGMA table_info(scrape_runs)")}:
+            self.conn.execute("ALTER TABLE scrape_runs ADD COLUMN finished_at TEXT")
+        # ...and stores created before the posting index lack the country
+        if 'country' not in {column for _, column, *_ in
+                             self.conn.execute("PRAGMA table_info(jobs)")}:
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN country TEXT NOT NULL DEFAULT ''")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_country_date ON jobs (country, date)")
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < LINK_KEYS_VERSION:
+            self.rekey_links()
+        if version < INDEX_VERSION:
+            self.rebuild_index()
+
+    def rekey_links(self) -> int:
+        """Recompute every stored link key with canonical_link_key, merging
+        postings that turn out to be the same job. Returns rows merged away."""
+        survivors: Dict[str, Tuple[int, str]] = {}
+        updates = []
+        duplicates = []
+        for row_id, link_key, link, date in self.conn.execute(
+                "SELECT id, link_key, link, date FROM jobs ORDER BY id"):
+            key = canonical_link_key(link) or link_key
+            if key in survivors:
+                # Same job stored twice: keep the first row and its earliest known date
+                survivor_id, survivor_date = survivors[key]
+                survivors[key] = (survivor_id, earliest_date(survivor_date, date))
+                duplicates.append((row_id,))
+            else:
+                survivors[key] = (row_id, date)
+                if key != link_key:
+                    updates.append((key, row_id))
+
+        with self.conn:
+            self.conn.executemany("DELETE FROM jobs WHERE id = ?", duplicates)
+            # Move keys out of the way first so the unique index never sees two rows
+            # swapping keys mid-update
+            self.conn.executemany("UPDATE jobs SET link_key = '~' || link_key WHERE id = ?",
+                                  [(row_id,) for _, row_id in updates])
+            self.conn.executemany("UPDATE jobs SET link_key = ? WHERE id = ?", updates)
+            self.conn.executemany("UPDATE jobs SET date = ? WHERE id = ?",
+                                  [(date, row_id) for row_id, date in survivors.values()])
+            self.conn.execute(f"PRAGMA user_version = {LINK_KEYS_VERSION}")
+        if duplicates:
+            print(f"Merged {len(duplicates)} duplicate postings in {self.db_path}")
+        return len(duplicates)
+
+    def rebuild_index(self) -> int:
+        """Build the posting index of every stored posting from scratch.
+        Returns postings indexed."""
+        rows = self.conn.execute("SELECT id, company, title, location FROM jobs").fetchall()
+        with self.conn:
+            self.conn.execute("DELETE FROM job_terms")
+            self.conn.executemany("UPDATE jobs SET country = ? WHERE id = ?",
+                                  [(location_country(location), row_id)
+                                   for row_id, _, _, location in rows])
+            self.conn.executemany("INSERT OR IGNORE INTO job_terms (term, job_id) VALUES (?, ?)",
+                                  ((term, row_id) for row_id, company, title, _ in rows
+                                   for term in posting_terms(title, company)))
+            self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+        return len(rows)
+
+    def index_postings(self, link_keys: List[str]) -> None:
+        """Re-index the terms of the given stored postings (call inside a transaction)."""
+        for start in range(0, len(link_keys), 500):
+            chunk = link_keys[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT id, company, title FROM jobs WHERE link_key IN ({', '.join('?' * len(chunk))})",
+                chunk).fetchall()
+            self.conn.executemany("DELETE FROM job_terms WHERE job_id = ?",
+                                  [(row_id,) for row_id, _, _ in rows])
+            self.conn.executemany("INSERT OR IGNORE INTO job_terms (term, job_id) VALUES (?, ?)",
+                                  [(term, row_id) for row_id, company, title in rows
+                                   for term in posting_terms(title, company)])
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def upsert_many(self, internships: Iterable[Internship],
+                    classify: Callable[[str], bool]) -> int:
+        """Insert or update postings in a single transaction. Returns rows written."""
+        today = datetime.date.today().isoformat()
+        rows = []
+        for internship in internships:
+            if not internship.link_key or not internship.title:
+                continue
+            rows.append((
+                internship.link_key,
+                internship.company or 'Unknown Company',
+                internship.title,
+                internship.location or 'Unknown Location',
+                internship.link,
+                internship.date_str,
+                int(classify(internship.title)),
+                today,
+                location_country(internship.location),
+            ))
+        with self.conn:
+            self.conn.executemany(UPSERT_SQL, rows)
+            self.index_postings([row[0] for row in rows])
+        return len(rows)
+
+    def import_csv(self, file_path: str, classify: Callable[[str], bool]) -> int:
+        """Bulk-load an existing pipe-delimited results CSV into the store."""
+        with open(file_path, 'r', encoding='utf-8') as file:
+            return self.upsert_many(iter_internships(file), classify)
+
+    def count(self, it_only: bool = True) -> int:
+        """Number of stored postings (only IT internships by default)."""
+        sql = "SELECT COUNT(*) FROM jobs"
+        if it_only:
+            sql += " WHERE is_it = 1"
+        return self.conn.execute(sql).fetchone()[0]
+
+    def query_internships(self, days: Optional[int] = None,
+                          it_only: bool = True) -> List[Internship]:
+        """Return stored postings, newest first.
+
+        days=None or a negative value returns every posting, days=0 returns
+        today's postings only, and days=N returns postings from the last N days.
+        """
+        clauses = []
+        params: List[str] = []
+        if it_only:
+            clauses.append("is_it = 1")
+        if days is not None and days >= 0:
+            cutoff = datetime.date.today() - datetime.timedelta(days=days)
+            clauses.append("date >= ?")
+            params.append(cutoff.isoformat())
+
+        sql = f"SELECT {', '.join(RESULT_FIELDS)} FROM jobs"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY date DESC, id"
+
+        cursor = self.conn.execute(sql, params)
+        return [Internship(company, title, location, link, parse_date(date))
+                for company, title, location, link, date in cursor]
+
+    def posting_filter(self, terms: Iterable[str] = (), company: str = "",
+                       country: str = "", days: Optional[int] = None,
+                       it_only: bool = True) -> Tuple[str, List[str]]:
+        """The WHERE clause (and its parameters) selecting postings with every
+        one of the index `terms`, from `company` and `country`, in the last
+        `days` days. Terms are looked up in the posting index."""
+        clauses: List[str] = []
+        params: List[str] = []
+        if it_only:
+            clauses.append("is_it = 1")
+        if days is not None and days >= 0:
+            clauses.append("date >= ?")
+            params.append((datetime.date.today() - datetime.timedelta(days=days)).isoformat())
+        if country:
+            clauses.append("country = ?")
+            params.append(place_name(country))
+        terms = sorted({index_term(term) for term in terms} | posting_terms("", company))
+        if terms:
+            clauses.append("id IN (" + " INTERSECT ".join(
+                ["SELECT job_id FROM job_terms WHERE term = ?"] * len(terms)) + ")")
+            params.extend(terms)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def search_postings(self, terms: Iterable[str] = (), company: str = "",
+                        country: str = "", days: Optional[int] = None,
+                        it_only: bool = True, limit: int = 50) -> Tuple[int, List[Internship]]:
+        """Postings matching a posting_filter, newest first. Returns
+        (how many match, the first `limit` of them)."""
+        where, params = self.posting_filter(terms, company, country, days, it_only)
+        total = self.conn.execute(f"SELECT COUNT(*) FROM jobs{where}", params).fetchone()[0]
+        cursor = self.conn.execute(
+            f"SELECT {', '.join(RESULT_FIELDS)} FROM jobs{where} ORDER BY date DESC, id LIMIT ?",
+            [*params, limit])
+        return total, [Internship(company, title, location, link, parse_date(date))
+                       for company, title, location, link, date in cursor]
+
+    def top_companies(self, terms: Iterable[str] = (), country: str = "",
+                      days: Optional[int] = None, it_only: bool = True,
+                      limit: int = 10) -> List[Tuple[str, int]]:
+        """The companies with the most postings matching a posting_filter."""
+        where, params = self.posting_filter(terms, "", country, days, it_only)
+        return self.conn.execute(
+            f"SELECT company, COUNT(*) FROM jobs{where} GROUP BY company COLLATE NOCASE "
+            "ORDER BY COUNT(*) DESC, company LIMIT ?", [*params, limit]).fetchall()
+
+    def postings_per_day(self, terms: Iterable[str] = (), company: str = "",
+                         country: str = "", days: Optional[int] = None,
+                         it_only: bool = True) -> List[Tuple[str, int]]:
+        """How many postings matching a posting_filter each date has, oldest first."""
+        where, params = self.posting_filter(terms, company, country, days, it_only)
+        return self.conn.execute(
+            f"SELECT date, COUNT(*) FROM jobs{where} GROUP BY date ORDER BY date", params).fetchall()
+
+    def countries(self) -> Set[str]:
+        """Every country a stored posting is in."""
+        return {country for (country,) in self.conn.execute("SELECT DISTINCT country FROM jobs")
+                if country}
+
+    def _present_link_keys(self, table: str, link_keys: Iterable[str]) -> Set[str]:
+        keys = [key for key in link_keys if key]
+        known: Set[str] = set()
+        # Stay under SQLite's limit on bound parameters per statement
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            known.update(link_key for (link_key,) in self.conn.execute(
+                f"SELECT link_key FROM {table} WHERE link_key IN ({', '.join('?' * len(chunk))})",
+                chunk))
+        return known
+
+    def known_link_keys(self, link_keys: Iterable[str]) -> Set[str]:
+        """The subset of `link_keys` already stored."""
+        return self._present_link_keys("jobs", link_keys)
+
+    def filtered_link_keys(self, link_keys: Iterable[str]) -> Set[str]:
+        """The subset of `link_keys` already in the filtered results CSV."""
+        return self._present_link_keys("filtered_links", link_keys)
+
+    def add_filtered_links(self, link_keys: Iterable[str], replace: bool = False) -> None:
+        """Record link keys written to the filtered results CSV (with `replace`,
+        the file was rewritten and these are all of them)."""
+        with self.conn:
+            if replace:
+                self.conn.execute("DELETE FROM filtered_links")
+            self.conn.executemany("INSERT OR IGNORE INTO filtered_links (link_key) VALUES (?)",
+                                  [(key,) for key in link_keys if key])
+
+    def start_scrape_run(self) -> int:
+        """Record the start of a scrape run. Returns its run number."""
+        with self.conn:
+            cursor = self.conn.execute("INSERT INTO scrape_runs (started_at) VALUES (?)",
+                                       (datetime.datetime.now().isoformat(timespec='seconds'),))
+        return cursor.lastrowid
+
+    def finish_scrape_run(self, run: int) -> None:
+        """Mark a scrape run as done, so it is never resumed."""
+        with self.conn:
+            self.conn.execute("UPDATE scrape_runs SET finished_at = ? WHERE id = ?",
+                              (datetime.datetime.now().isoformat(timespec='seconds'), run))
+
+    def resumable_run(self, since: datetime.datetime) -> Optional[int]:
+        """The latest scrape run if it started strictly after `since` and never finished."""
+        row = self.conn.execute(
+            "SELECT id, started_at, finished_at FROM scrape_runs ORDER BY id DESC LIMIT 1"
+        ).fetchone()
+        if row is None or row[2] is not None or row[1] <= since.isoformat(timespec='seconds'):
+            return None
+        return row[0]
+
+    def completed_queries(self, run: int) -> Set[QueryKey]:
+        """The queries of a scrape run checkpointed as done."""
+        return {(source, term, country) for source, term, country in self.conn.execute(
+            "SELECT source, term, country FROM scrape_checkpoints WHERE run = ?", (run,))}
+
+    def query_stats(self) -> Dict[QueryKey, QueryStats]:
+        """The yield statistics of every query polled so far."""
+        return {(source, term, country): QueryStats(*stats)
+                for source, term, country, *stats in self.conn.execute(
+                    "SELECT source, term, country, runs, requests, new_postings, yield_rate, "
+                    "last_run FROM query_stats")}
+
+    def record_query(self, run: int, query: QueryKey, requests: int, new_postings: int,
+                     link_keys: Iterable[str]) -> None:
+        """Add one poll of a query to its statistics, with every posting it
+        found, and checkpoint the query as done in `run`."""
+        rate = new_postings / max(requests, 1)
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO scrape_checkpoints (run, source, term, country, "
+                "completed_at) VALUES (?, ?, ?, ?, ?)", (run, *query, now))
+            self.conn.execute(
+                "INSERT INTO query_stats (source, term, country, runs, requests, new_postings, "
+                "yield_rate, last_run) VALUES (?, ?, ?, 1, ?, ?, ?, ?) "
+                "ON CONFLICT (source, term, country) DO UPDATE SET "
+                "runs = runs + 1, requests = requests + excluded.requests, "
+                "new_postings = new_postings + excluded.new_postings, "
+                "yield_rate = ? * excluded.yield_rate + ? * yield_rate, "
+                "last_run = excluded.last_run",
+                (*query, requests, new_postings, rate, run, YIELD_SMOOTHING, 1 - YIELD_SMOOTHING))
+            self.conn.executemany(
+                "INSERT INTO query_postings (source, term, country, link_key, run) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT DO UPDATE SET run = excluded.run",
+                [(*query, link_key, run) for link_key in set(link_keys) if link_key])
+
+    def prune_query_postings(self, before_run: int) -> int:
+        """Forget postings queries found, and checkpoints, from before
+        `before_run`. Returns posting rows deleted."""
+        with self.conn:
+            self.conn.execute("DELETE FROM scrape_checkpoints WHERE run < ?", (before_run,))
+            return self.conn.execute("DELETE FROM query_postings WHERE run < ?",
+                                     (before_run,)).rowcount
+
+    def query_overlaps(self) -> Tuple[Dict[QueryKey, int], Dict[Tuple[QueryKey, QueryKey], int]]:
+        """How many postings each query found, and how many each pair of
+        queries of the same source and country found in common."""
+        sizes = {(source, term, country): count
+                 for source, term, country, count in self.conn.execute(
+                     "SELECT source, term, country, COUNT(*) FROM query_postings "
+                     "GROUP BY source, term, country")}
+        shared = {((source, first, country), (source, second, country)): count
+                  for source, country, first, second, count in self.conn.execute(
+                      "SELECT a.source, a.country, a.term, b.term, COUNT(*) "
+                      "FROM query_postings a JOIN query_postings b "
+                      "ON a.source = b.source AND a.country = b.country "
+                      "AND a.link_key = b.link_key AND a.term != b.term "
+                      "GROUP BY a.source, a.country, a.term, b.term")}
+        return sizes, shared
+
+    def sent_link_keys(self, chat_id: str) -> Set[str]:
+        """Link keys of every posting already sent to `chat_id`."""
+        return {link_key for (link_key,) in self.conn.execute(
+            "SELECT link_key FROM sent_jobs WHERE chat_id = ?", (chat_id,))}
+
+    def unsent_groups(self, chat_id: str,
+                      groups: Iterable[List[Internship]]) -> List[List[Internship]]:
+        """Keep the groups of reposts (see near_duplicates.py) none of whose
+        postings has been sent to `chat_id` yet."""
+        sent = self.sent_link_keys(chat_id)
+        return [group for group in groups
+                if not any(internship.link_key in sent for internship in group)]
+
+    def mark_sent(self, chat_id: str, internships: Iterable[Internship]) -> int:
+        """Record that these postings were delivered to `chat_id`. Returns rows recorded."""
+        now = datetime.datetime.now().isoformat(timespec='seconds')
+        rows = [(chat_id, internship.link_key, now)
+                for internship in internships if internship.link_key]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO sent_jobs (chat_id, link_key, sent_at) VALUES (?, ?, ?)",
+                rows)
+        return len(rows)
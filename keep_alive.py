@@ -1,10 +1,19 @@
-from flask import Flask
+from flask import Flask, Response, jsonify, request
 from threading import Thread
+import argparse
+import asyncio
+import hashlib
+import re
 import time
 import datetime
-import subprocess
 import os
 import logging
+import sqlite3
+
+from cron_trigger import CronTrigger
+from job_store import JobStore
+from pipeline_metrics import render_metrics
+import posting_index
 
 # Create necessary directories before setting up logging
 os.makedirs("logs", exist_ok=True)
@@ -20,49 +29,138 @@ logging.basicConfig(
     ]
 )
 
+# The pipeline runs in this process, so its modules, caches, scraper and
+# Telegram connection stay warm between runs
+import it_internship
+
+# When to run the pipeline (cron syntax; default: every 8 hours)
+SCRAPE_SCHEDULE = os.environ.get("SCRAPE_SCHEDULE", "0 */8 * * *")
+RETRY_DELAY_SECONDS = 60
+
 # Global variables for tracking status
 start_time = time.time()
-next_run_seconds = 28800  # 8 hours in seconds
-last_run_time = datetime.datetime.now() - datetime.timedelta(hours=9)
+next_run_time = datetime.datetime.now()
+last_run_time = None
 run_count = 0
 scraper_status = "Initializing"
 
+# The status page is pinged constantly: compile its template once, keep the
+# job count in memory (updated after each pipeline run) and reuse the
+# rendered page for a few seconds
+STATUS_CACHE_TTL = 5
+FILTERED_RESULTS_PATH = 'output/it_internships.csv'
+status_template = None
+status_page_cache = (0.0, None, None)
+
 app = Flask('')
 
-@app.route('/')
-def home():
+def compile_template(text):
+    """Split a {{PLACEHOLDER}} template into alternating literal text and names."""
+    return re.split(r'\{\{(\w+)\}\}', text)
+
+
+def render_template(parts, values):
+    """Render a compiled template with one join."""
+    return ''.join(values.get(part, '') if i % 2 else part for i, part in enumerate(parts))
+
+
+def count_filtered_jobs():
+    """Rows in the filtered results file; only read once, at startup."""
     try:
+        if os.path.exists(FILTERED_RESULTS_PATH):
+            with open(FILTERED_RESULTS_PATH, 'rb') as f:
+                return max(sum(1 for _ in f) - 1, 0)
+    except OSError:
+        pass
+    return 0
+
+
+job_count = count_filtered_jobs()
+
+
+def load_status_template():
+    """Compile status.html the first time the status page is requested."""
+    global status_template
+    if status_template is None:
         with open('status.html', 'r') as file:
-            html_template = file.read()
+            status_template = compile_template(file.read())
+    return status_template
+
+
+def render_status_page():
+    """The status page, rendered at most once per STATUS_CACHE_TTL seconds."""
+    global status_page_cache
+    rendered_at, html_content, etag = status_page_cache
+    if html_content is not None and time.monotonic() - rendered_at < STATUS_CACHE_TTL:
+        return html_content, etag
+
+    now = datetime.datetime.now()
+    uptime = time.time() - start_time
+    days, remainder = divmod(uptime, 86400)
+    hours, remainder = divmod(remainder, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    uptime_str = f"{int(days)}d {int(hours)}h {int(minutes)}m {int(seconds)}s"
+
+    html_content = render_template(load_status_template(), {
+        'CURRENT_TIME': now.strftime("%Y-%m-%d %H:%M:%S"),
+        'UPTIME': uptime_str,
+        'NEXT_RUN': next_run_time.strftime("%Y-%m-%d %H:%M:%S"),
+        'JOB_COUNT': str(job_count),
+        'RUN_COUNT': str(run_count),
+        'STATUS': "Running",
+    })
+    etag = hashlib.sha1(html_content.encode('utf-8'), usedforsecurity=False).hexdigest()
+    status_page_cache = (time.monotonic(), html_content, etag)
+    return html_content, etag
 
-        now = datetime.datetime.now()
-        uptime = time.time() - start_time
-        days, remainder = divmod(uptime, 86400)
-        hours, remainder = divmod(remainder, 3600)
-        minutes, seconds = divmod(remainder, 60)
 
-        job_count = 0
-        try:
-            if os.path.exists('output/it_internships.csv'):
-                with open('output/it_internships.csv', 'r') as f:
-                    job_count = sum(1 for _ in f) - 1
-        except:
-            pass
-
-        uptime_str = f"{int(days)}d {int(hours)}h {int(minutes)}m {int(seconds)}s"
-
-        html_content = html_template.replace('{{CURRENT_TIME}}', now.strftime("%Y-%m-%d %H:%M:%S"))
-        html_content = html_content.replace('{{UPTIME}}', uptime_str)
-        html_content = html_content.replace('{{NEXT_RUN}}', (now + datetime.timedelta(seconds=next_run_seconds)).strftime("%Y-%m-%d %H:%M:%S"))
-        html_content = html_content.replace('{{JOB_COUNT}}', str(job_count))
-        html_content = html_content.replace('{{RUN_COUNT}}', str(run_count))
-        html_content = html_content.replace('{{STATUS}}', "Running")
-
-        return html_content
+@app.route('/')
+def home():
+    try:
+        html_content, etag = render_status_page()
+        response = Response(html_content, mimetype='text/html')
+        response.set_etag(etag)
+        response.cache_control.max_age = STATUS_CACHE_TTL
+        # Answers 304 Not Modified when the pinger already has this version
+        return response.make_conditional(request)
     except Exception as e:
         logging.error(f"Error reading status page: {e}")
         return "IT Internship Scraper is alive and running! Last check: " + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint for the pipeline runs of this process."""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/internships')
+def api_internships():
+    """Posting index queries: ?q=backend interns in germany this week, and/or
+    company, country, days, report (postings, companies, dates) and limit."""
+    query_args = request.args
+    report = query_args.get('report')
+    if report is not None and report not in posting_index.REPORTS:
+        return jsonify(error=f"report must be one of {', '.join(posting_index.REPORTS)}"), 400
+    limit = query_args.get('limit', type=int)
+    if limit is not None and not 1 <= limit <= posting_index.MAX_LIMIT:
+        return jsonify(error=f"limit must be between 1 and {posting_index.MAX_LIMIT}"), 400
+    try:
+        # Read-only: a request never migrates or reindexes the store
+        store = JobStore(posting_index.JOBS_DB_FILE, read_only=True)
+    except sqlite3.OperationalError as e:
+        return jsonify(error=f"Posting index unavailable: {e}"), 503
+    try:
+        query = posting_index.build_query(
+            query_args.get('q', ''), posting_index.known_places(store),
+            company=query_args.get('company'), country=query_args.get('country'),
+            days=query_args.get('days', type=int), report=report, limit=limit)
+        query = query._replace(limit=max(1, min(query.limit, posting_index.MAX_LIMIT)))
+        return jsonify(posting_index.run_query(store, query))
+    except Exception as e:
+        logging.error(f"Error answering posting query: {e}")
+        return jsonify(error=str(e)), 500
+    finally:
+        store.close()
+
 def run():
     app.run(host='0.0.0.0', port=8080)
 
@@ -71,40 +169,47 @@ def keep_alive():
     t.start()
     logging.info("Web server started")
 
-def run_scraper():
-    global last_run_time, run_count, scraper_status
-
-    while True:
-        try:
-            now = datetime.datetime.now()
-            time_since_last_run = now - last_run_time
-
-            if time_since_last_run.total_seconds() >= 28800:
-                scraper_status = "Running scraper..."
-                logging.info("Starting scheduled scraping run")
+async def run_pipeline(resume: bool = False) -> dict:
+    """Scrape, filter and send to Telegram, like `it_internship.py --all --days=3`
+    (with `--resume` when `resume` is set)."""
+    args = argparse.Namespace(scrape=True, send=True, days=3, max_entries=20,
+                              concurrency=it_internship.SCRAPE_CONCURRENCY, resume=resume)
+    return await it_internship.main_async(args)
 
-                logging.info("Running IT internship scraper...")
-                subprocess.run(["python", "it_internship.py", "--scrape", "--days=3"], check=True)
 
-                if os.path.exists('output/it_internships.csv'):
-                    os.remove('output/it_internships.csv')
-                    logging.info("Removed existing filtered results to ensure fresh data")
+async def scheduled_runs(trigger: CronTrigger) -> None:
+    """Run the pipeline now, then every time the trigger fires."""
+    global last_run_time, next_run_time, run_count, scraper_status, job_count
 
-                logging.info("Filtering for recent internships and sending to Telegram...")
-                subprocess.run(["python", "it_internship.py", "--send", "--days=3"], check=True)
-
-                run_count += 1
-                last_run_time = now
-                scraper_status = "Idle"
-                logging.info(f"Scraping completed successfully at {now.strftime('%Y-%m-%d %H:%M:%S')}")
-                logging.info(f"Next run scheduled for: {(now + datetime.timedelta(hours=8)).strftime('%Y-%m-%d %H:%M:%S')}")
-
-            elif now.minute < 5:
-                hours_until_next_run = 8 - (time_since_last_run.total_seconds() / 3600)
-                logging.info(f"Bot is alive. Next run in approximately {hours_until_next_run:.1f} hours")
-
-            time.sleep(300)
+    # Only the retry after a failed run resumes it; scheduled runs start over
+    retrying = False
+    while True:
+        delay = (next_run_time - datetime.datetime.now()).total_seconds()
+        if delay > 0:
+            scraper_status = "Idle"
+            logging.info(f"Next run scheduled for: {next_run_time.strftime('%Y-%m-%d %H:%M:%S')}")
+            await asyncio.sleep(delay)
 
+        now = datetime.datetime.now()
+        try:
+            scraper_status = "Running scraper..."
+            logging.info("Starting scheduled scraping run")
+            summary = await run_pipeline(resume=retrying)
+            retrying = False
+            job_count = summary["jobs"]
+
+            run_count += 1
+            last_run_time = now
+            logging.info(f"Scraping completed successfully at {now.strftime('%Y-%m-%d %H:%M:%S')}")
+            next_run_time = trigger.next_after(datetime.datetime.now())
         except Exception as e:
             logging.error(f"Error in run_scraper: {e}")
-            time.sleep(60)
+            retrying = True
+            next_run_time = datetime.datetime.now() + datetime.timedelta(seconds=RETRY_DELAY_SECONDS)
+
+
+def run_scraper():
+    """Run the pipeline on SCRAPE_SCHEDULE on one long-lived event loop."""
+    trigger = CronTrigger(SCRAPE_SCHEDULE)
+    logging.info(f"Scraper schedule: {SCRAPE_SCHEDULE}")
+    asyncio.run(scheduled_runs(trigger))
@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""
+Near-Duplicate Postings
+-----------------------
+Companies repost the same internship under new job IDs, often once per city
+or with a qualifier added to the title, so link dedup cannot catch them.
+This module groups such reposts:
+1. Each posting is fingerprinted by its normalized company name plus a MinHash
+   signature of its title tokens (tokens naming the posting's own location,
+   gender markers such as "m/f/d" and internship boilerplate are ignored)
+2. Signatures are split into bands and indexed (LSH), so a posting is only
+   compared with the few postings of the same company sharing a band
+3. Candidates are confirmed by their tokens: a Jaccard similarity of at least
+   SIMILARITY_THRESHOLD, and one title must only add words to the other
+   ("Backend Intern" and "Backend Intern - Remote"), none of them saying which
+   role it is (a level, a stack or domain, a number). Titles that replace a
+   word ("- Cloud" vs "- Security", "Intern 1" vs "Intern 2") are different
+   roles however similar the rest is
+"""
+import functools
+import re
+import zlib
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from internship_record import Internship
+
+# Minimum Jaccard similarity of title tokens for two postings to be reposts
+SIMILARITY_THRESHOLD = 0.6
+
+# 16 bands of 2 rows: pairs at the threshold become candidates >99% of the time
+NUM_BANDS = 16
+ROWS_PER_BAND = 2
+NUM_HASHES = NUM_BANDS * ROWS_PER_BAND
+
+# Universal hashing (a * x + b) mod p over CRC32 token hashes
+HASH_PRIME = (1 << 61) - 1
+HASH_PARAMS = [((i * 0x9E3779B97F4A7C15 + 0x632BE59BD9B4E019) % HASH_PRIME | 1,
+                (i * 0xC2B2AE3D27D4EB4F + 0x165667B19E3779F9) % HASH_PRIME)
+               for i in range(1, NUM_HASHES + 1)]
+
+COMPANY_SUFFIXES = {
+    "inc", "ltd", "llc", "plc", "corp", "corporation", "co", "company", "gmbh",
+    "ag", "se", "sa", "sas", "sarl", "srl", "spa", "bv", "nv", "ab", "as", "oy", "group",
+}
+GENDER_TOKENS = {"m", "f", "d", "h", "w", "x", "mfd", "hf", "all", "genders", "gender"}
+# Words that say "internship" without naming the role
+BOILERPLATE_TOKENS = {
+    "intern", "interns", "internship", "internships", "stage", "stagiaire",
+    "praktikum", "praktikant", "praktikantin", "trainee", "werkstudent",
+}
+# Words that name the role: two titles differing by one of these never merge
+DISTINGUISHING_TOKENS = {
+    # Level
+    "junior", "senior", "lead", "principal", "staff", "graduate", "master",
+    "masters", "bachelor", "phd", "msc", "bsc", "apprentice", "alternance",
+    # Stack and domain
+    "frontend", "front", "backend", "back", "fullstack", "full", "web", "mobile",
+    "ios", "android", "cloud", "devops", "sre", "security", "cyber", "cybersecurity",
+    "data", "ml", "ai", "machine", "learning", "embedded", "firmware", "hardware",
+    "network", "networks", "infrastructure", "platform", "qa", "test", "testing",
+    "python", "java", "javascript", "typescript", "c", "c++", "c#", "go", "golang",
+    "rust", "kotlin", "swift", "php", "ruby", "scala", "sql", "react", "angular",
+    "vue", "node", "net", "sap", "salesforce", "ui", "ux", "game", "games",
+}
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+|[+#]+")
+
+
+def normalize_company(company: str) -> str:
+    """Lowercase a company name and drop punctuation and legal suffixes."""
+    words = TOKEN_PATTERN.findall(company.lower())
+    while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def title_tokens(title: str, location: str = "") -> FrozenSet[str]:
+    """The set of title tokens naming the role: without gender markers,
+    internship boilerplate and words that only name the posting's location."""
+    ignored = GENDER_TOKENS | BOILERPLATE_TOKENS | set(TOKEN_PATTERN.findall(location.lower()))
+    tokens = frozenset(token for token in TOKEN_PATTERN.findall(title.lower())
+                       if token not in ignored)
+    # A title made only of ignored words still needs a fingerprint
+    return tokens or frozenset(TOKEN_PATTERN.findall(title.lower()))
+
+
+@functools.lru_cache(maxsize=65536)
+def token_hashes(token: str) -> Tuple[int, ...]:
+    """The NUM_HASHES hash values of one token (titles share most tokens)."""
+    x = zlib.crc32(token.encode("utf-8"))
+    return tuple((a * x + b) % HASH_PRIME for a, b in HASH_PARAMS)
+
+
+def minhash(tokens: Iterable[str]) -> Tuple[int, ...]:
+    """MinHash signature of a token set, NUM_HASHES values long."""
+    hashes = [token_hashes(token) for token in tokens] or [token_hashes("")]
+    return tuple(map(min, zip(*hashes, strict=True)))
+
+
+def jaccard(first: FrozenSet[str], second: FrozenSet[str]) -> float:
+    """Jaccard similarity of two token sets."""
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def distinguishing(token: str) -> bool:
+    """Whether a title token says which role a posting is."""
+    return token in DISTINGUISHING_TOKENS or any(char.isdigit() for char in token)
+
+
+def same_role(first: FrozenSet[str], second: FrozenSet[str],
+              threshold: float = SIMILARITY_THRESHOLD) -> bool:
+    """Whether two title token sets name the same role: similar enough, and
+    one only adds words to the other that do not distinguish a role."""
+    if first == second:
+        return True
+    if not (first <= second or second <= first) or jaccard(first, second) < threshold:
+        return False
+    return not any(distinguishing(token) for token in first ^ second)
+
+
+def group_near_duplicates(internships: Iterable[Internship],
+                          threshold: float = SIMILARITY_THRESHOLD) -> List[List[Internship]]:
+    """Group reposts of the same posting, keeping the input order.
+
+    The first posting of each group is its representative: later postings join
+    the first group of the same company whose representative's title tokens
+    name the same role (see `same_role`).
+    """
+    groups: List[List[Internship]] = []
+    group_tokens: List[FrozenSet[str]] = []
+    buckets: Dict[Tuple[str, int, Tuple[int, ...]], List[int]] = {}
+
+    for internship in internships:
+        company = normalize_company(internship.company)
+        tokens = title_tokens(internship.title, internship.location)
+        signature = minhash(tokens)
+        band_keys = [(company, band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])
+                     for band in range(NUM_BANDS)]
+
+        match = None
+        checked: Set[int] = set()
+        for key in band_keys:
+            for group_id in buckets.get(key, ()):
+                if group_id in checked:
+                    continue
+                checked.add(group_id)
+                if same_role(tokens, group_tokens[group_id], threshold):
+                    match = group_id
+                    break
+            if match is not None:
+                break
+
+        if match is not None:
+            groups[match].append(internship)
+            continue
+
+        group_id = len(groups)
+        groups.append([internship])
+        group_tokens.append(tokens)
+        for key in band_keys:
+            buckets.setdefault(key, []).append(group_id)
+
+    return groups
+
+
+def merge_group(group: List[Internship]) -> Internship:
+    """One entry for a group: the representative posting with every location."""
+    first = group[0]
+    if len(group) == 1:
+        return first
+    locations = list(dict.fromkeys(internship.location for internship in group
+                                   if internship.location))
+    return Internship(first.company, first.title, "; ".join(locations), first.link, first.date)
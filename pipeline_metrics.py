@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+"""
+Pipeline Metrics
+----------------
+Minimal Prometheus-style metrics for the scraping pipeline (standard library
+only, so every script can record them):
+1. Counters and histograms with labels, safe to update from any thread
+2. `stage_timer` records how long each stage of a run takes
+3. `render_metrics` produces the Prometheus text exposition format served by
+   the /metrics route of keep_alive.py
+
+Metrics live in the process that records them, so they cover the runs of the
+long-lived keep_alive.py service; one-off CLI runs start from zero.
+"""
+import contextlib
+import threading
+import time
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+STAGE_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 30.0, 60.0, 300.0, 900.0, 1800.0, 3600.0)
+ROW_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+THROUGHPUT_BUCKETS = (1e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2e6)
+RATIO_BUCKETS = (0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+_registry: List["Metric"] = []
+_lock = threading.Lock()
+
+
+def escape_label(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Metric:
+    """Base class: a named metric family with label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        with _lock:
+            _registry.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """A monotonically increasing count per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[str]:
+        with _lock:
+            values = sorted(self.values.items())
+        for key, value in values:
+            yield f"{self.name}{format_labels(self.labelnames, key)} {format_value(value)}"
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        # label values -> [count per bucket..., sum]
+        self.values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with _lock:
+            counts = self.values.setdefault(key, [0] * len(self.buckets) + [0.0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            counts[-1] += value
+
+    @contextlib.contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe how long the `with` block takes, in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self) -> Iterator[str]:
+        with _lock:
+            values = sorted((key, list(counts)) for key, counts in self.values.items())
+        for key, counts in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts[:-1], strict=True):
+                cumulative += count
+                labels = format_labels(self.labelnames, key, f'le="{format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {format_value(counts[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+def render_metrics() -> str:
+    """Every registered metric in the Prometheus text exposition format."""
+    with _lock:
+        metrics = list(_registry)
+    return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# === PIPELINE METRICS ===
+SCRAPE_LATENCY = Histogram(
+    "internship_scrape_duration_seconds", "Duration of one (term, country) search",
+    ["term", "country"])
+SCRAPE_ROWS = Histogram(
+    "internship_scrape_rows", "Postings returned by one (term, country) search",
+    ["term", "country"], buckets=ROW_BUCKETS)
+SCRAPE_FAILURES = Counter(
+    "internship_scrape_failures_total", "Searches that failed after every retry",
+    ["term", "country"])
+CLASSIFIER_THROUGHPUT = Histogram(
+    "internship_classifier_titles_per_second", "Title classification throughput per batch",
+    buckets=THROUGHPUT_BUCKETS)
+CLASSIFIED_TITLES = Counter(
+    "internship_classified_titles_total", "Titles run through the IT internship classifier")
+DEDUP_RATIO = Histogram(
+    "internship_dedup_hit_ratio", "Share of postings dropped as duplicates per pass",
+    ["stage"], buckets=RATIO_BUCKETS)
+TELEGRAM_LATENCY = Histogram(
+    "telegram_request_duration_seconds", "Duration of one Bot API request", ["method"])
+TELEGRAM_RATE_LIMITED = Counter(
+    "telegram_rate_limited_total", "Bot API answers with HTTP 429", ["method"])
+STAGE_DURATION = Histogram(
+    "pipeline_stage_duration_seconds", "Duration of each stage of a pipeline run",
+    ["stage"], buckets=STAGE_BUCKETS)
+
+
+def stage_timer(stage: str):
+    """Context manager recording the duration of a main_async stage."""
+    return STAGE_DURATION.time(stage=stage)
+
+
+def observe_dedup(stage: str, total: int, unique: int) -> None:
+    """Record the share of `total` postings a dedup stage dropped."""
+    if total:
+        DEDUP_RATIO.observe((total - unique) / total, stage=stage)
+
+
+def observe_classifier(titles: int, seconds: float) -> None:
+    """Record a batch of `titles` classified in `seconds`."""
+    CLASSIFIED_TITLES.inc(titles)
+    if titles and seconds > 0:
+        CLASSIFIER_THROUGHPUT.observe(titles / seconds)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+"""
+Posting Dates
+-------------
+The one place posting dates are parsed, shared by every script:
+1. Parsed dates are cached (LRU) on the raw string - a results file only
+   holds a few hundred distinct date values, so most rows are a cache hit
+2. ISO dates take the fast fromisoformat path; "DD Mon YYYY" falls back to strptime
+3. Relative LinkedIn strings ("3 days ago", "Reposted 1 week ago", "il y a
+   2 jours", "yesterday") are resolved against today's date
+4. `date_window` computes the cutoff of a --days window once per call, so
+   filters compare dates instead of computing an age for every row
+
+Relative dates are resolved when a posting is first read and written back as
+YYYY-MM-DD, so a stored date never drifts.
+"""
+import datetime
+import functools
+import re
+from typing import Optional, Tuple
+
+DATE_FORMATS = ('%Y-%m-%d', '%d %b %Y')
+
+# Days per unit of a relative date; months and years are approximate
+RELATIVE_UNITS = {
+    "second": 0, "minute": 0, "hour": 0, "day": 1, "week": 7, "month": 30, "year": 365,
+    "seconde": 0, "heure": 0, "jour": 1, "semaine": 7, "mois": 30, "an": 365,
+}
+RELATIVE_DATE = re.compile(
+    r"(?:(\d+|an?|one|un|une)\s+(\w+)\s+ago"
+    r"|il\s+y\s+a\s+(\d+|un|une)\s+(\w+))\b"
+)
+TODAY_WORDS = ("just now", "today", "aujourd'hui", "à l'instant")
+YESTERDAY_WORDS = ("yesterday", "hier")
+
+DATE_CACHE_SIZE = 4096
+
+
+def relative_days(date_str: str) -> Optional[int]:
+    """How many days ago a relative date string is, or None if it is not one."""
+    text = date_str.lower()
+    if any(word in text for word in TODAY_WORDS):
+        return 0
+    if any(word in text for word in YESTERDAY_WORDS):
+        return 1
+    match = RELATIVE_DATE.search(text)
+    if not match:
+        return None
+    amount, unit = (match.group(1), match.group(2)) if match.group(1) else match.group(3, 4)
+    if unit not in RELATIVE_UNITS:
+        unit = unit[:-1]  # plural
+        if unit not in RELATIVE_UNITS:
+            return None
+    count = int(amount) if amount.isdigit() else 1
+    return count * RELATIVE_UNITS[unit]
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def parse_absolute_date(date_str: str) -> Optional[datetime.date]:
+    """Parse a YYYY-MM-DD or DD Mon YYYY date, or None."""
+    try:
+        # Fast path for ISO dates, which is what the scraper writes
+        return datetime.date.fromisoformat(date_str)
+    except ValueError:
+        pass
+    for date_format in DATE_FORMATS[1:]:
+        try:
+            return datetime.datetime.strptime(date_str, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def cached_relative_days(date_str: str) -> Optional[int]:
+    return relative_days(date_str)
+
+
+def parse_date(date_str: str, today: Optional[datetime.date] = None) -> Optional[datetime.date]:
+    """Parse a posting date (YYYY-MM-DD, DD Mon YYYY or relative), or None if unparseable."""
+    date_str = date_str.strip()
+    date = parse_absolute_date(date_str)
+    if date is not None:
+        return date
+    # Relative dates only cache their offset, so they stay right past midnight
+    days = cached_relative_days(date_str)
+    if days is None:
+        return None
+    return (today or datetime.date.today()) - datetime.timedelta(days=days)
+
+
+def date_window(days: int,
+                today: Optional[datetime.date] = None) -> Tuple[datetime.date, datetime.date]:
+    """The (cutoff, today) dates of a --days window: a posting is inside it
+    when cutoff <= date <= today."""
+    today = today or datetime.date.today()
+    return today - datetime.timedelta(days=days), today
@@ -0,0 +1,256 @@
+#!/usr/bin/env python
+"""
+Posting Index Queries
+---------------------
+Questions about every posting ever scraped, answered from the index kept in
+output/jobs.db (see job_store.py) instead of re-reading the CSV files:
+1. A question in plain words ("backend interns in Germany this week", "top
+   companies last 30 days", "data at capgemini per day") is parsed into title
+   terms, a company, a country, a --days window and what to report
+2. Title and company terms are looked up in the inverted index, the country
+   and the window in the (country, date) index, so an answer takes
+   milliseconds however long the history is
+3. Reports: matching postings newest first, top companies, or postings per
+   day (what simple_check.sh prints, with --summary)
+
+Usage:
+    python posting_index.py "backend interns in germany this week"
+    python posting_index.py "top companies last 30 days" --json
+    python posting_index.py --summary
+    python posting_index.py --rebuild
+
+keep_alive.py serves the same queries at /api/internships?q=...
+"""
+import argparse
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from internship_record import COUNTRY_ALIASES, place_name
+from job_store import JobStore, index_term
+from near_duplicates import TOKEN_PATTERN
+
+# Project paths
+PROJECT_ROOT = Path(os.environ.get("PROJECT_ROOT", os.path.dirname(os.path.abspath(__file__))))
+OUTPUT_DIR = PROJECT_ROOT / "output"
+RESULTS_FILE = OUTPUT_DIR / "it_results.csv"
+JOBS_DB_FILE = OUTPUT_DIR / "jobs.db"
+
+REPORTS = ("postings", "companies", "dates")
+
+# Words of a question that name no title term: every posting is an internship
+IGNORED_WORDS = {
+    "intern", "internship", "stage", "stagiaire", "alternance", "alternant",
+    "praktikum", "werkstudent", "trainee", "job", "jobs", "posting", "position", "offer",
+    "show", "find", "list", "me", "all", "new", "recent", "the", "a", "an", "for",
+    "of", "and", "with", "on", "to", "any",
+}
+
+# Time phrases, longest first, and the --days window they mean
+TIME_PHRASES = [
+    (re.compile(r"\b(?:in the )?(?:last|past) (\d+) days?\b"), lambda n: int(n)),
+    (re.compile(r"\b(?:in the )?(?:last|past) (\d+) weeks?\b"), lambda n: 7 * int(n)),
+    (re.compile(r"\b(?:since|from) (\d+) days? ago\b"), lambda n: int(n)),
+    (re.compile(r"\b(\d+) days?\b"), lambda n: int(n)),
+    (re.compile(r"\b(?:this|last|past) month\b"), lambda: 30),
+    (re.compile(r"\b(?:this|last|past) week\b"), lambda: 7),
+    (re.compile(r"\byesterday\b"), lambda: 1),
+    (re.compile(r"\btoday\b"), lambda: 0),
+]
+REPORT_PHRASES = [
+    (re.compile(r"\btop (?:\d+ )?compan(?:y|ies)\b|\bcompanies\b|\bby company\b"), "companies"),
+    (re.compile(r"\b(?:per|by|each) (?:day|date)\b|\bdaily\b"), "dates"),
+]
+TOP_COUNT = re.compile(r"\btop (\d+)\b")
+# "at Capgemini", "from SAP" (up to the next phrase)
+COMPANY_PHRASE = re.compile(r"\b(?:at|from) ([^\W\d][\w&.+-]*(?: [^\W\d][\w&.+-]*)*?)"
+                            r"(?= in\b| at\b| this\b| last\b| past\b| since\b| today\b|"
+                            r" yesterday\b| per\b| by\b|$)")
+
+
+# Most postings or companies one API answer lists
+MAX_LIMIT = 500
+
+
+class PostingQuery(NamedTuple):
+    terms: Tuple[str, ...] = ()
+    company: str = ""
+    country: str = ""
+    days: Optional[int] = None
+    report: str = "postings"
+    limit: int = 20
+
+
+def cut(text: str, match: "re.Match[str]") -> str:
+    """The text without a matched phrase, single-spaced."""
+    return " ".join((text[:match.start()] + " " + text[match.end():]).split())
+
+
+def parse_query(text: str, countries: Set[str]) -> PostingQuery:
+    """Parse a question into a query. `countries` are the place names a
+    word may be taken as a country from (the stored ones and their aliases)."""
+    text = " ".join(text.lower().split())
+    days = None
+    for pattern, window in TIME_PHRASES:
+        match = pattern.search(text)
+        if match:
+            days = window(*match.groups())
+            text = cut(text, match)
+            break
+
+    report = "postings"
+    limit = 20
+    top = TOP_COUNT.search(text)
+    if top:
+        limit = int(top.group(1))
+    for pattern, name in REPORT_PHRASES:
+        match = pattern.search(text)
+        if match:
+            report = name
+            limit = limit if top else 10
+            text = cut(text, match)
+            break
+    if top:
+        text = " ".join(TOP_COUNT.sub(" ", text).split())
+
+    company = ""
+    match = COMPANY_PHRASE.search(text)
+    if match:
+        company = match.group(1)
+        text = cut(text, match)
+
+    # A country is one or two words, after "in" or on their own
+    words = text.split()
+    country = ""
+    for size in (2, 1):
+        for start in range(len(words) - size + 1):
+            name = place_name(" ".join(words[start:start + size]))
+            if name in countries:
+                country = name
+                del words[start:start + size]
+                if start and words[start - 1] == "in":
+                    del words[start - 1]
+                break
+        if country:
+            break
+
+    terms = tuple(dict.fromkeys(
+        term for term in (index_term(token) for token in TOKEN_PATTERN.findall(" ".join(words)))
+        if term not in IGNORED_WORDS and term != "in"))
+    return PostingQuery(terms, company, country, days, report, limit)
+
+
+def known_places(store: JobStore) -> Set[str]:
+    """Place names a question may use as a country."""
+    countries = store.countries()
+    return countries | {alias for alias, country in COUNTRY_ALIASES.items() if country in countries}
+
+
+def build_query(question: str, places: Set[str], company: Optional[str] = None,
+                country: Optional[str] = None, days: Optional[int] = None,
+                report: Optional[str] = None, limit: Optional[int] = None) -> PostingQuery:
+    """Parse a question, then apply the filters given explicitly over it."""
+    overrides = {"company": company, "country": place_name(country) if country else None,
+                 "days": days, "report": report, "limit": limit}
+    return parse_query(question, places)._replace(
+        **{name: value for name, value in overrides.items() if value is not None})
+
+
+def run_query(store: JobStore, query: PostingQuery) -> Dict[str, Any]:
+    """Answer a query from the index. Returns a JSON-ready result."""
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"query": query._asdict()}
+    if query.report == "companies":
+        rows = store.top_companies(query.terms, query.country, query.days, limit=query.limit)
+        result["results"] = [{"company": company, "count": count} for company, count in rows]
+    elif query.report == "dates":
+        rows = store.postings_per_day(query.terms, query.company, query.country, query.days)
+        result["results"] = [{"date": date, "count": count} for date, count in rows]
+        result["total"] = sum(count for _, count in rows)
+    else:
+        total, internships = store.search_postings(query.terms, query.company, query.country,
+                                                   query.days, limit=query.limit)
+        result["total"] = total
+        result["results"] = [internship.to_row() for internship in internships]
+    result["milliseconds"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    query = result["query"]
+    filters = [f"{name}={value!r}" for name, value in query.items()
+               if value not in ((), "", None) and name not in ("report", "limit")]
+    print(f"{query['report']} ({', '.join(filters) or 'everything'}) "
+          f"in {result['milliseconds']} ms")
+    if "total" in result:
+        print(f"{result['total']} matching postings")
+    for i, row in enumerate(result["results"]):
+        if query["report"] == "companies":
+            print(f"  {row['company']}: {row['count']} internships")
+        elif query["report"] == "dates":
+            print(f"  {row['date'] or 'Unknown'}: {row['count']} internships")
+        else:
+            print(f"\n{i+1}. {row['company']}")
+            print(f"   Title: {row['title']}")
+            print(f"   Location: {row['location']}")
+            print(f"   Date: {row['date'] or 'Unknown Date'}")
+            print(f"   Link: {row['link']}")
+
+
+def open_store() -> JobStore:
+    """The job store, importing the results CSV the first time (as it_internship.py does)."""
+    store = JobStore(JOBS_DB_FILE)
+    if store.count(it_only=False) == 0 and os.path.exists(RESULTS_FILE):
+        from title_classifier import is_it_engineering_internship
+        print(f"Importing existing results from {RESULTS_FILE} into {JOBS_DB_FILE}...")
+        store.import_csv(str(RESULTS_FILE), is_it_engineering_internship)
+    return store
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query every scraped internship through the posting index")
+    parser.add_argument("question", nargs="*",
+                        help='A question such as "backend interns in germany this week"')
+    parser.add_argument("--company", help="Only postings from this company")
+    parser.add_argument("--country", help="Only postings in this country")
+    parser.add_argument("--days", type=int, help="Only postings from the last N days")
+    parser.add_argument("--report", choices=REPORTS, help="What to report (default: from the question)")
+    parser.add_argument("--limit", type=int, help="Most postings or companies to show")
+    parser.add_argument("--summary", action="store_true",
+                        help="Postings per day, top 10 companies and the 5 newest postings")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from the stored postings")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    store = open_store()
+    try:
+        if args.rebuild:
+            started = time.perf_counter()
+            indexed = store.rebuild_index()
+            print(f"Indexed {indexed} postings in {time.perf_counter() - started:.1f}s")
+            return
+
+        query = build_query(" ".join(args.question), known_places(store), args.company,
+                            args.country, args.days, args.report, args.limit)
+        queries: List[PostingQuery] = [query]
+        if args.summary:
+            queries = [query._replace(report="dates"),
+                       query._replace(report="companies", limit=10),
+                       query._replace(report="postings", limit=5)]
+        results = [run_query(store, query) for query in queries]
+    finally:
+        store.close()
+
+    if args.json:
+        print(json.dumps(results if args.summary else results[0], indent=2, ensure_ascii=False))
+        return
+    for result in results:
+        print_result(result)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+Query Planner
+-------------
+Decides which (term, country) searches a scrape run makes, and in what order,
+from the yield statistics the job store keeps for every query:
+1. Queries are ordered by their yield (new postings per request), so the ones
+   that pay off most are done first; queries never polled before go first of all
+2. A query whose postings were nearly all found by a higher-yield query of the
+   same source and country too is redundant: it is merged into that query
+   and not searched on its own
+3. Low-yield queries are polled less often (every few runs instead of every
+   run), so the rate budget goes where the new postings are
+
+Merged and deferred queries are still polled every MAX_POLL_INTERVAL runs, so
+their statistics follow the market when it changes.
+"""
+import math
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from job_store import QueryKey, QueryStats
+from scrape_scheduler import ScrapeTask
+
+# A query yielding this many new postings per request is polled every run;
+# one yielding a quarter of it every 4th run, and so on
+TARGET_YIELD = 1.0
+MAX_POLL_INTERVAL = 8
+
+# A query is redundant when at least this share of its postings was also found
+# by a higher-yield query, judged once it found at least MIN_OVERLAP_POSTINGS
+MERGE_CONTAINMENT = 0.9
+MIN_OVERLAP_POSTINGS = 10
+
+
+class QueryPlan(NamedTuple):
+    """The tasks of one run in order, and the queries left out of it."""
+    tasks: List[ScrapeTask]
+    merged: Dict[QueryKey, QueryKey]
+    deferred: List[ScrapeTask]
+
+
+def query_key(task: ScrapeTask) -> QueryKey:
+    return (task.source, task.term, task.country)
+
+
+def poll_interval(stats: Optional[QueryStats]) -> int:
+    """Every how many runs a query is polled, given its yield."""
+    if stats is None or stats.yield_rate >= TARGET_YIELD:
+        return 1
+    if stats.yield_rate <= 0:
+        return MAX_POLL_INTERVAL
+    return min(MAX_POLL_INTERVAL, math.ceil(TARGET_YIELD / stats.yield_rate))
+
+
+def expected_yield(stats: Optional[QueryStats]) -> float:
+    # Queries without statistics are explored first
+    return math.inf if stats is None else stats.yield_rate
+
+
+def redundant_queries(queries: Iterable[QueryKey], stats: Dict[QueryKey, QueryStats],
+                      sizes: Dict[QueryKey, int],
+                      shared: Dict[Tuple[QueryKey, QueryKey], int]) -> Dict[QueryKey, QueryKey]:
+    """Map each redundant query to the higher-yield query it is merged into."""
+    merged: Dict[QueryKey, QueryKey] = {}
+    kept: List[QueryKey] = []
+    for query in sorted(queries, key=lambda query: (-expected_yield(stats.get(query)),
+                                                     -sizes.get(query, 0))):
+        size = sizes.get(query, 0)
+        cover = None
+        if size >= MIN_OVERLAP_POSTINGS:
+            cover = next((other for other in kept
+                          if shared.get((query, other), 0) >= MERGE_CONTAINMENT * size), None)
+        if cover is None:
+            kept.append(query)
+        else:
+            merged[query] = cover
+    return merged
+
+
+def plan_queries(tasks: Iterable[ScrapeTask], run: int, stats: Dict[QueryKey, QueryStats],
+                 sizes: Dict[QueryKey, int],
+                 shared: Dict[Tuple[QueryKey, QueryKey], int]) -> QueryPlan:
+    """Order the tasks of run number `run` by yield, leaving out redundant
+    queries and low-yield queries whose turn has not come."""
+    tasks = list(tasks)
+    merged = redundant_queries([query_key(task) for task in tasks], stats, sizes, shared)
+    planned, deferred = [], []
+    for task in tasks:
+        query = query_key(task)
+        query_stats = stats.get(query)
+        since_last = run - query_stats.last_run if query_stats else MAX_POLL_INTERVAL
+        interval = MAX_POLL_INTERVAL if query in merged else poll_interval(query_stats)
+        if since_last >= interval:
+            planned.append(task)
+        else:
+            deferred.append(task)
+    planned.sort(key=lambda task: -expected_yield(stats.get(query_key(task))))
+    return QueryPlan(planned, merged, deferred)
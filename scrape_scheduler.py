@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""
+Scrape Scheduler
+----------------
+Runs scrape tasks with:
+1. One queue and worker pool per host, sized by that host's budget, so a slow
+   or throttled site never holds up the tasks of another one
+2. A token bucket per host so no site sees more than its request budget: one
+   token per task, or (with `charge_per_task` off) one per HTTP request, taken
+   by the worker through `acquire` as it sends them
+3. Jittered exponential backoff when a task fails, before it is retried up to
+   `max_retries` times
+
+The scheduler knows nothing about LinkedIn or jobpilot: the caller passes an
+async worker that runs one task and a callback that receives its results.
+"""
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+
+class ScrapeTask(NamedTuple):
+    """One unit of scraping work: a search term in a country on a host,
+    run by the scraper backend named `source`."""
+    term: str
+    country: str
+    host: str
+    source: str = ""
+
+
+class HostBudget(NamedTuple):
+    """How hard one host may be scraped: tasks in flight, and requests per
+    second with bursts up to `burst`."""
+    concurrency: int
+    rate: float
+    burst: int
+
+
+class TokenBucket:
+    """Async token bucket refilled at `rate` tokens per second, up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+def backoff_delay(attempt: int, base: float = 2.0, cap: float = 60.0) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2**attempt)]."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class ScrapeScheduler:
+    """Run scrape tasks concurrently under per-host limits.
+
+    `concurrency`, `rate_per_host` and `burst` are the budget of every host
+    without an entry in `host_budgets`. Without `charge_per_task`, workers
+    must call `acquire(host)` before each request they make.
+    """
+
+    def __init__(
+        self,
+        worker: Callable[[ScrapeTask], Awaitable[List[Any]]],
+        concurrency: int = 4,
+        rate_per_host: float = 0.6,
+        burst: int = 5,
+        max_retries: int = 3,
+        backoff_base: float = 2.0,
+        backoff_cap: float = 60.0,
+        host_budgets: Optional[Dict[str, HostBudget]] = None,
+        charge_per_task: bool = True,
+    ) -> None:
+        self.worker = worker
+        self.concurrency = max(1, concurrency)
+        self.rate_per_host = rate_per_host
+        self.burst = burst
+        self.host_budgets = dict(host_budgets or {})
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.charge_per_task = charge_per_task
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.stats = {"completed": 0, "retried": 0, "failed": 0}
+
+    def budget_for(self, host: str) -> HostBudget:
+        """The budget of a host (the default one unless configured)."""
+        default = HostBudget(self.concurrency, self.rate_per_host, self.burst)
+        return self.host_budgets.get(host, default)
+
+    def bucket_for(self, host: str) -> TokenBucket:
+        """Get (or lazily create) the token bucket for a host."""
+        if host not in self.buckets:
+            budget = self.budget_for(host)
+            self.buckets[host] = TokenBucket(budget.rate, budget.burst)
+        return self.buckets[host]
+
+    async def acquire(self, host: str) -> None:
+        """Take one request's token from a host's budget."""
+        await self.bucket_for(host).acquire()
+
+    async def run(
+        self,
+        tasks: Iterable[ScrapeTask],
+        on_result: Callable[[ScrapeTask, List[Any]], None],
+        on_failure: Optional[Callable[[ScrapeTask, BaseException], None]] = None,
+    ) -> Dict[str, int]:
+        """Run every task to completion (or final failure) and return run stats.
+        A task whose results `on_result` could not handle counts as failed."""
+        queues: Dict[str, "asyncio.Queue[tuple[ScrapeTask, int]]"] = {}
+        for task in tasks:
+            queues.setdefault(task.host, asyncio.Queue()).put_nowait((task, 0))
+
+        retry_timers: List["asyncio.Task[None]"] = []
+
+        async def requeue_later(task: ScrapeTask, attempt: int, delay: float) -> None:
+            queue = queues[task.host]
+            await asyncio.sleep(delay)
+            # Put the retry before marking the failed attempt done so that
+            # queue.join() never sees an empty queue while a retry is pending
+            await queue.put((task, attempt))
+            queue.task_done()
+
+        async def run_worker(queue: "asyncio.Queue[tuple[ScrapeTask, int]]") -> None:
+            while True:
+                task, attempt = await queue.get()
+                retrying = False
+                try:
+                    if self.charge_per_task:
+                        await self.acquire(task.host)
+                    results = await self.worker(task)
+                except Exception as e:
+                    if attempt < self.max_retries:
+                        delay = backoff_delay(attempt, self.backoff_base, self.backoff_cap)
+                        print(f"Retrying '{task.term}' in {task.country} in {delay:.1f}s: {e}")
+                        self.stats["retried"] += 1
+                        retrying = True
+                        retry_timers.append(
+                            asyncio.create_task(requeue_later(task, attempt + 1, delay))
+                        )
+                    else:
+                        print(f"Giving up on '{task.term}' in {task.country}: {e}")
+                        self.stats["failed"] += 1
+                        if on_failure:
+                            on_failure(task, e)
+                else:
+                    try:
+                        on_result(task, results)
+                    except Exception as e:
+                        # The results were not saved, so the task is not done
+                        print(f"Error handling results for '{task.term}' in {task.country}: {e}")
+                        self.stats["failed"] += 1
+                        if on_failure:
+                            on_failure(task, e)
+                    else:
+                        self.stats["completed"] += 1
+                finally:
+                    if not retrying:
+                        queue.task_done()
+
+        workers = [
+            asyncio.create_task(run_worker(queue))
+            for host, queue in queues.items()
+            for _ in range(max(1, self.budget_for(host).concurrency))
+        ]
+        try:
+            await asyncio.gather(*(queue.join() for queue in queues.values()))
+        finally:
+            for worker_task in workers + retry_timers:
+                worker_task.cancel()
+            await asyncio.gather(*workers, *retry_timers, return_exceptions=True)
+
+        return self.stats
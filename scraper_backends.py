@@ -0,0 +1,397 @@
+#!/usr/bin/env python
+"""
+Scraper Backends
+----------------
+Every source of postings is a backend that the scrape scheduler drives:
+1. A backend turns the search terms and countries into its own scrape tasks
+   and has its own host budget (searches in flight, requests per second), so
+   a slow source only ever waits on itself
+2. `search` runs one task and returns `Internship` records, so every source
+   goes through the same classification, job store and link dedup
+3. Backends keep their clients between runs, so the long-lived keep_alive.py
+   service does not rebuild them every time
+4. Responses go through the on-disk HTTP cache (http_cache.py), search pages
+   with the search TTL
+5. LinkedIn searches are sorted by date and paged only until a page holds
+   nothing but postings older than the --days window or already stored, so a
+   run fetches the new delta whatever the page limit
+6. With a `base_url`, LinkedIn requests go to that server instead (replay
+   mode, e.g. benchmarks/fake_linkedin.py), with the same paths and queries
+
+Two kinds are provided: `JobpilotBackend` wraps a jobpilot scraper (with
+`LinkedInBackend` for LinkedIn's paged search), and `CareerFeedBackend` reads a company careers feed published as JSON (e.g.
+Greenhouse or Lever job boards), described in career_feeds.json.
+"""
+import asyncio
+import collections
+import datetime
+import json
+import urllib.error
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Set
+
+import httpx
+
+from http_cache import CachingTransport, ResponseCache
+from internship_record import Internship
+from posting_dates import parse_date
+from scrape_scheduler import HostBudget, ScrapeTask
+
+try:
+    from jobpilot import scrapers as jobpilot_scrapers
+    JOBPILOT_AVAILABLE = True
+except ImportError:
+    jobpilot_scrapers = None
+    JOBPILOT_AVAILABLE = False
+    print("Warning: jobpilot module not available. Scraping functionality will be disabled.")
+
+FEED_TIMEOUT = 30
+FEED_USER_AGENT = "Internship-Scraper/1.0"
+
+# Returns which of the given link keys are already in the job store
+KnownKeys = Callable[[Iterable[str]], Set[str]]
+
+
+class SearchReport(NamedTuple):
+    """What one search cost and saw: requests made and the link key of every
+    posting found, including the ones not returned as already stored or old."""
+    requests: int
+    link_keys: List[str]
+
+
+# Posting dates remembered from LinkedIn search cards, most recent first out
+POSTED_DATES_SIZE = 10000
+
+# Field paths of a Greenhouse job board feed, the default for career feeds
+DEFAULT_FEED_FIELDS = {
+    "title": "title",
+    "location": "location.name",
+    "link": "absolute_url",
+    "date": "updated_at",
+}
+
+
+def convert_jobpilot_results(jobs: List[Any],
+                             posted_dates: Optional[Dict[str, str]] = None) -> List[Internship]:
+    """Convert jobpilot job results to internship records, dated from
+    `posted_dates` (link -> date) where the search page gave a date. A
+    posting without a parseable date keeps it unknown."""
+    results = []
+    posted_dates = posted_dates or {}
+
+    for job in jobs:
+        if not hasattr(job, 'company') or not hasattr(job, 'title') or not hasattr(job, 'link'):
+            continue
+
+        # The search card is the only source of the posting date
+        posting_date = parse_date(posted_dates[job.link]) if job.link in posted_dates else None
+
+        results.append(Internship(
+            company=job.company.name if hasattr(job.company, 'name') else 'Unknown Company',
+            title=job.title,
+            location=str(job.location),
+            link=job.link,
+            date=posting_date  # Add the posting date to our data
+        ))
+    return results
+
+
+class ScraperBackend:
+    """Base class: one source of postings with its own host budget."""
+
+    def __init__(self, name: str, host: str, budget: HostBudget) -> None:
+        self.name = name
+        self.host = host
+        self.budget = budget
+        self.reports: Dict[ScrapeTask, SearchReport] = {}
+        # Takes a token of the host's budget; set by the scheduler of each run
+        self.throttle: Optional[Callable[[], Awaitable[None]]] = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+    def available(self) -> bool:
+        """Whether the backend can run in this environment."""
+        return True
+
+    async def charge_request(self) -> None:
+        """Wait for the host's budget to allow one more request."""
+        if self.throttle is not None:
+            await self.throttle()
+
+    def tasks(self, search_terms: List[str], countries: List[str]) -> List[ScrapeTask]:
+        """The scrape tasks of one run: by default every (term, country) pair."""
+        return [ScrapeTask(term, country, self.host, self.name)
+                for term in search_terms
+                for country in countries]
+
+    def pop_report(self, task: ScrapeTask, results: List[Internship]) -> SearchReport:
+        """The report of a finished search; by default one request that found
+        exactly its results."""
+        return self.reports.pop(task, SearchReport(1, [result.link_key for result in results]))
+
+    async def search(self, task: ScrapeTask, known_keys: Optional[KnownKeys] = None,
+                     cutoff: Optional[datetime.date] = None) -> List[Internship]:
+        """Run one task. `known_keys` tells which postings are already stored,
+        and `cutoff` is the oldest posting date of interest, so sources that
+        can tell may skip fetching what is not needed."""
+        raise NotImplementedError
+
+
+class ThrottledTransport(httpx.AsyncBaseTransport):
+    """httpx transport charging every request to its backend's host budget."""
+
+    def __init__(self, backend: ScraperBackend,
+                 transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        self.backend = backend
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self.backend.charge_request()
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+class JobpilotBackend(ScraperBackend):
+    """A jobpilot scraper class, created once and reused by every run.
+
+    With a `cache`, search pages are cached for `search_ttl` seconds.
+    """
+
+    def __init__(self, name: str, host: str, budget: HostBudget,
+                 scraper_class: str, limit: int = 10,
+                 cache: Optional[ResponseCache] = None, search_ttl: float = 0) -> None:
+        super().__init__(name, host, budget)
+        self.scraper_class = scraper_class
+        self.limit = limit
+        self.cache = cache
+        self.search_ttl = search_ttl
+        self._scraper = None
+
+    def available(self) -> bool:
+        return JOBPILOT_AVAILABLE and hasattr(jobpilot_scrapers, self.scraper_class)
+
+    def make_scraper(self) -> Any:
+        return getattr(jobpilot_scrapers, self.scraper_class)()
+
+    @property
+    def scraper(self) -> Any:
+        if self._scraper is None:
+            self._scraper = self.make_scraper()
+            # Every request that reaches the network takes a token (cache hits don't)
+            transport: httpx.AsyncBaseTransport = ThrottledTransport(self)
+            if self.cache is not None:
+                transport = CachingTransport(self.cache, self.cache_ttl, transport)
+            # jobpilot scrapers make every request through their httpx client
+            self._scraper._client = httpx.AsyncClient(
+                transport=transport, event_hooks={"request": [self.prepare_request]})
+        return self._scraper
+
+    async def prepare_request(self, request: httpx.Request) -> None:
+        """Adjust a request before it is sent (or answered from the cache)."""
+
+    def cache_ttl(self, request: httpx.Request) -> Optional[float]:
+        """TTL of a request: the search TTL for search pages, none otherwise."""
+        return self.search_ttl if "keywords" in request.url.params else None
+
+    async def search(self, task: ScrapeTask, known_keys: Optional[KnownKeys] = None,
+                     cutoff: Optional[datetime.date] = None) -> List[Internship]:
+        # Retries are handled by the scheduler with jittered backoff,
+        # so jobpilot only gets a single attempt per call
+        jobs = await self.scraper.scrape(
+            jobpilot_scrapers.ScraperInput(keywords=task.term, location=task.country,
+                                           limit=self.limit),
+            concurrent=False,
+            max_retries=1,
+            retry_delay=0
+        )
+        return convert_jobpilot_results(jobs)
+
+
+if JOBPILOT_AVAILABLE:
+    class DatedLinkedInScraper(jobpilot_scrapers.LinkedInScraper):
+        """LinkedInScraper that keeps the posting date of each search card,
+        which jobpilot's Job model has no field for."""
+
+        def __init__(self, limiter_tasks: int = 5, limiter_seconds: float = 8) -> None:
+            super().__init__(limiter_tasks, limiter_seconds)
+            self.posted_dates: "collections.OrderedDict[str, str]" = collections.OrderedDict()
+
+        def parse_job(self, raw_job: Any) -> Any:
+            job = super().parse_job(raw_job)
+            posted = raw_job.find("time")
+            if posted is not None and posted.has_attr("datetime"):
+                self.posted_dates[job.link] = posted["datetime"]
+                self.posted_dates.move_to_end(job.link)
+                if len(self.posted_dates) > POSTED_DATES_SIZE:
+                    self.posted_dates.popitem(last=False)
+            return job
+
+
+class LinkedInBackend(JobpilotBackend):
+    """LinkedIn search, newest postings first, paged until nothing is new.
+
+    `limit` only caps how deep a busy query may page; most queries stop after
+    their first page once the postings of previous runs are stored. With a
+    `base_url` ("http://127.0.0.1:8765"), every request goes to that server.
+    """
+
+    def __init__(self, name: str, host: str, budget: HostBudget, limit: int = 200,
+                 base_url: str = "", **options: Any) -> None:
+        super().__init__(name, host, budget, 'LinkedInScraper', limit, **options)
+        self.base_url = httpx.URL(base_url) if base_url else None
+
+    def make_scraper(self) -> Any:
+        # jobpilot's own limiter follows the host budget, which the scheduler
+        # already enforces, so raising LINKEDIN_RATE is not capped at 5 per 8s
+        return DatedLinkedInScraper(max(self.budget.burst, 1),
+                                    max(self.budget.burst, 1) / self.budget.rate)
+
+    async def prepare_request(self, request: httpx.Request) -> None:
+        # Search pages sorted by date, so paging can stop at the first stale page
+        if request.url.path.endswith("/search"):
+            request.url = request.url.copy_merge_params({"sortBy": "DD"})
+        if self.base_url is not None:
+            request.url = request.url.copy_with(scheme=self.base_url.scheme,
+                                                host=self.base_url.host,
+                                                port=self.base_url.port)
+            request.headers["Host"] = request.url.netloc.decode("ascii")
+
+    async def search(self, task: ScrapeTask, known_keys: Optional[KnownKeys] = None,
+                     cutoff: Optional[datetime.date] = None) -> List[Internship]:
+        """The postings of one query newer than `cutoff` and not stored yet."""
+        scraper = self.scraper
+        scraper_input = jobpilot_scrapers.ScraperInput(
+            keywords=task.term, location=task.country, limit=self.limit)
+        internships: List[Internship] = []
+        seen: List[str] = []
+        pages = 0
+        for start in range(0, min(self.limit, scraper.START_LIMIT), scraper.RESULTS_PER_PAGE):
+            # Retries are handled by the scheduler with jittered backoff (pages
+            # already fetched come back from the HTTP cache)
+            page = await scraper.get_jobs(scraper_input, start, max_retries=1, retry_delay=0)
+            pages += 1
+            page_internships = convert_jobpilot_results(page, scraper.posted_dates)
+            seen.extend(internship.link_key for internship in page_internships)
+            known = known_keys([internship.link_key for internship in page_internships]) \
+                if known_keys else set()
+            fresh = [internship for internship in page_internships
+                     if internship.link_key not in known
+                     and (cutoff is None or internship.date is None or internship.date >= cutoff)]
+            internships.extend(fresh)
+            if not fresh or len(page) < scraper.RESULTS_PER_PAGE:
+                break
+        self.reports[task] = SearchReport(pages, seen)
+        return internships
+
+
+def field_value(item: Any, path: str) -> Any:
+    """Follow a dotted path ("location.name") into a decoded JSON object."""
+    for key in path.split('.') if path else ():
+        if not isinstance(item, dict):
+            return None
+        item = item.get(key)
+    return item
+
+
+class CareerFeedBackend(ScraperBackend):
+    """A careers feed served as JSON: one task per run, whatever the terms.
+
+    `feed` holds the feed's `name`, `url` and `company`, where the list of
+    jobs is (`items`, a dotted path; empty when the document is the list) and
+    the dotted path of each field in a job (`fields`, Greenhouse by default).
+    """
+
+    def __init__(self, feed: Dict[str, Any], budget: HostBudget,
+                 cache: Optional[ResponseCache] = None, ttl: float = 0) -> None:
+        host = urllib.parse.urlsplit(feed['url']).hostname or feed['url']
+        super().__init__(feed['name'], host, budget)
+        self.url = feed['url']
+        self.cache = cache
+        self.ttl = float(feed.get('cache_ttl', ttl))
+        self.company = feed.get('company', feed['name'])
+        self.items = feed.get('items', 'jobs')
+        self.fields = {**DEFAULT_FEED_FIELDS, **feed.get('fields', {})}
+
+    def tasks(self, search_terms: List[str], countries: List[str]) -> List[ScrapeTask]:
+        return [ScrapeTask(self.name, "any", self.host, self.name)]
+
+    def fetch(self) -> Any:
+        headers = {"Accept": "application/json", "User-Agent": FEED_USER_AGENT}
+        entry = self.cache.get(self.url) if self.cache is not None else None
+        if entry is not None:
+            if entry.is_fresh(self.ttl):
+                self.cache.stats["hits"] += 1
+                return json.loads(entry.body)
+            headers.update(entry.validators())
+        request = urllib.request.Request(self.url, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=FEED_TIMEOUT) as response:
+                body = response.read()
+                if self.cache is not None:
+                    self.cache.stats["misses"] += 1
+                    self.cache.put(self.url, response.status, dict(response.headers), body)
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or entry is None:
+                raise
+            self.cache.stats["revalidated"] += 1
+            body = self.cache.touch(self.url, entry).body
+        return json.loads(body)
+
+    def convert(self, document: Any) -> List[Internship]:
+        """Map the jobs of a feed document to internship records."""
+        items = field_value(document, self.items) if self.items else document
+        results = []
+        for item in items or ():
+            title, link = field_value(item, self.fields['title']), field_value(item, self.fields['link'])
+            if not title or not link:
+                continue
+            company = field_value(item, self.fields['company']) if 'company' in self.fields else None
+            date_value = str(field_value(item, self.fields['date']) or "")
+            # Feeds usually carry full timestamps; the day is all that is kept
+            posting_date = parse_date(date_value[:10]) or parse_date(date_value) if date_value else None
+            results.append(Internship(
+                company=str(company or self.company),
+                title=str(title),
+                location=str(field_value(item, self.fields['location']) or ""),
+                link=str(link),
+                date=posting_date
+            ))
+        return results
+
+    async def search(self, task: ScrapeTask, known_keys: Optional[KnownKeys] = None,
+                     cutoff: Optional[datetime.date] = None) -> List[Internship]:
+        await self.charge_request()
+        return self.convert(await asyncio.to_thread(self.fetch))
+
+
+def load_career_feeds(path: Path, default_budget: HostBudget,
+                      cache: Optional[ResponseCache] = None,
+                      ttl: float = 0) -> List[CareerFeedBackend]:
+    """The career feed backends listed in a JSON file (none if it is missing).
+
+    A feed may set its own `concurrency`, `rate` and `burst` (feeds on the
+    same host share the budget of the first one) and its own `cache_ttl`.
+    """
+    if not path.exists():
+        return []
+    with open(path, 'r', encoding='utf-8') as file:
+        feeds = json.load(file)
+    return [CareerFeedBackend(feed, HostBudget(
+                int(feed.get('concurrency', default_budget.concurrency)),
+                float(feed.get('rate', default_budget.rate)),
+                int(feed.get('burst', default_budget.burst))), cache, ttl)
+            for feed in feeds]
+
+
+def host_budgets(backends: List[ScraperBackend]) -> Dict[str, HostBudget]:
+    """The scheduler budget of every backend host."""
+    budgets: Dict[str, HostBudget] = {}
+    for backend in backends:
+        budgets.setdefault(backend.host, backend.budget)
+    return budgets
+
@@ -3,208 +3,103 @@
 Send IT Internships to Telegram (No External Dependencies)
 ---------------------------------------------------------
 This script sends filtered internship results to Telegram using only standard library.
+Postings the chat has already received (tracked in output/jobs.db, shared with
+it_internship.py) are never sent again. Every chat in subscriptions.json (see
+subscriptions.py) gets the postings its profile matches, chats in parallel.
 """
-import csv
 import os
-import json
-import urllib.request
-import urllib.parse
-import datetime
+import itertools
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List
+
+from internship_record import Internship, iter_internships
+from job_store import JobStore
+from near_duplicates import group_near_duplicates, merge_group
+from posting_dates import date_window
+from subscriptions import SubscriptionIndex, load_subscriptions, widest_window
+from telegram_client import TelegramClient, paginate
 
 # Configuration
 BOT_TOKEN = os.environ.get("BOT_TOKEN", "8041545402:AAFvZBdheN74kl6_juAfPPJ-wVNCSi7Yq6k")
 CHAT_ID = os.environ.get("CHAT_ID", "-1002680765834")
 MAX_ENTRIES = int(os.environ.get("MAX_ENTRIES", "20"))
+MAX_DAYS = 3
+TELEGRAM_SEND_WORKERS = int(os.environ.get("TELEGRAM_SEND_WORKERS", "8"))
 
 # Project paths
 PROJECT_ROOT = Path(os.environ.get("PROJECT_ROOT", os.path.dirname(os.path.abspath(__file__))))
 OUTPUT_DIR = PROJECT_ROOT / "output"
 FILTERED_RESULTS_FILE = OUTPUT_DIR / "it_internships.csv"
+JOBS_DB_FILE = OUTPUT_DIR / "jobs.db"
+SUBSCRIPTIONS_FILE = Path(os.environ.get("SUBSCRIPTIONS_FILE", PROJECT_ROOT / "subscriptions.json"))
 
-def read_csv_data(file_path: str) -> List[Dict[str, str]]:
+def read_csv_data(file_path: str) -> List[Internship]:
     """Read internship data from a CSV file."""
     if not os.path.exists(file_path):
         print(f"Warning: File {file_path} does not exist")
         return []
         
-    internships = []
     try:
         with open(file_path, 'r', encoding='utf-8') as file:
-            reader = csv.DictReader(file, delimiter='|')
-            for row in reader:
-                internships.append(row)
-        return internships
+            return list(iter_internships(file))
     except Exception as e:
         print(f"Error reading CSV file {file_path}: {e}")
         return []
 
 
-def send_to_telegram(message: str) -> bool:
-    """Send a message to Telegram using urllib instead of requests."""
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-    
-    # Prepare the payload
-    payload = {
-        'chat_id': CHAT_ID,
-        'text': message,
-        'disable_web_page_preview': True
-    }
-    
+def send_to_telegram(client: TelegramClient, chat_id: str, pages: List[str]) -> bool:
+    """Send pre-split messages to one chat over the client's keep-alive connections."""
     try:
-        # Convert payload to JSON
-        data = json.dumps(payload).encode('utf-8')
-        
-        # Create the request
-        req = urllib.request.Request(
-            url,
-            data=data,
-            headers={'Content-Type': 'application/json'}
-        )
-        
-        # Send the request
-        with urllib.request.urlopen(req) as response:
-            result = json.loads(response.read().decode('utf-8'))
-            
-            if result.get('ok'):
-                print(f"Message successfully sent to Telegram chat {CHAT_ID}")
-                return True
-            else:
-                print(f"Failed to send message. Response: {result}")
-                return False
-                
+        return client.send_messages(chat_id, pages)
     except Exception as e:
         print(f"Error sending to Telegram: {e}")
-        
-        # If message is too long, try splitting and sending in chunks
-        if str(e).find('413') >= 0 or len(message) > 4000:
-            print("Message too long, splitting into chunks...")
-            
-            # Split message into chunks
-            chunks = []
-            current_chunk = ""
-            
-            for line in message.split('\n\n'):
-                if len(current_chunk) + len(line) + 2 > 3900:  # +2 for newline chars
-                    chunks.append(current_chunk)
-                    current_chunk = line + "\n\n"
-                else:
-                    current_chunk += line + "\n\n"
-            
-            if current_chunk:
-                chunks.append(current_chunk)
-            
-            # Send chunks
-            success = True
-            for i, chunk in enumerate(chunks):
-                chunk_payload = {
-                    'chat_id': CHAT_ID,
-                    'text': f"Part {i+1}/{len(chunks)}\n\n{chunk}",
-                    'disable_web_page_preview': True
-                }
-                
-                try:
-                    # Convert chunk payload to JSON
-                    chunk_data = json.dumps(chunk_payload).encode('utf-8')
-                    
-                    # Create the request
-                    chunk_req = urllib.request.Request(
-                        url,
-                        data=chunk_data,
-                        headers={'Content-Type': 'application/json'}
-                    )
-                    
-                    # Send the request
-                    with urllib.request.urlopen(chunk_req) as chunk_response:
-                        chunk_result = json.loads(chunk_response.read().decode('utf-8'))
-                        
-                        if not chunk_result.get('ok'):
-                            print(f"Failed to send chunk {i+1}. Response: {chunk_result}")
-                            success = False
-                        else:
-                            print(f"Chunk {i+1}/{len(chunks)} sent successfully")
-                            
-                except Exception as chunk_error:
-                    print(f"Error sending chunk {i+1}: {chunk_error}")
-                    success = False
-                    
-                # Add a short delay between chunks to avoid rate limiting
-                time.sleep(1)
-                
-            return success
-            
         return False
 
 
-def format_message(internships: List[Dict[str, str]], max_entries: int = 20) -> str:
-    """Format internship data for a message."""
+def format_message(internships: List[Internship], max_entries: int = 20) -> List[str]:
+    """Format internship data as Telegram-sized messages, never splitting an entry."""
     total_count = len(internships)
     
-    message = f"🚀 IT Engineering Internships & Alternances 🚀\n\n"
-    message += f"⏰ STRICTLY 3-DAY MAXIMUM LISTINGS ONLY ⏰\n"
-    message += f"Latest IT opportunities (Updated: {time.strftime('%d %b %Y')})\n\n"
+    header = (f"🚀 IT Engineering Internships & Alternances 🚀\n\n"
+              f"⏰ STRICTLY 3-DAY MAXIMUM LISTINGS ONLY ⏰\n"
+              f"Latest IT opportunities (Updated: {time.strftime('%d %b %Y')})")
     
     # Only show a subset of the internships
     shown_internships = internships[:max_entries]
     
+    entries = []
     for i, internship in enumerate(shown_internships):
-        company = internship.get('company', 'Unknown Company')
-        title = internship.get('title', 'Unknown Position')
-        location = internship.get('location', 'Unknown Location')
-        link = internship.get('link', '#')
-        date = internship.get('date', 'Unknown Date')
-        
-        message += f"{i+1}. {company}\n"
-        message += f"📌 {title}\n"
-        message += f"📍 {location}\n"
-        message += f"🗓 Posted: {date}\n"
-        message += f"🔗 {link}\n\n"
+        company = internship.company or 'Unknown Company'
+        title = internship.title or 'Unknown Position'
+        location = internship.location or 'Unknown Location'
+        link = internship.link or '#'
+        date = internship.date_str or 'Unknown Date'
+        entries.append(f"{i+1}. {company}\n📌 {title}\n📍 {location}\n🗓 Posted: {date}\n🔗 {link}")
     
     # Add summary if there are more
+    footer = ""
     if total_count > max_entries:
-        message += f"\n...and {total_count - max_entries} more opportunities"
+        footer = f"...and {total_count - max_entries} more opportunities"
     
-    return message
+    return paginate(entries, header, footer)
 
 
-def filter_by_date(internships: List[Dict[str, str]], max_days: int = 3) -> List[Dict[str, str]]:
+def filter_by_date(internships: List[Internship], max_days: int = 3) -> List[Internship]:
     """Filter internships to only include those that are max_days old or newer."""
-    today = datetime.datetime.now().date()
+    cutoff, today = date_window(max_days)
     filtered = []
     
     print(f"Applying strict {max_days}-day filter...")
     
     for internship in internships:
-        try:
-            # Get the date from the internship data
-            date_str = internship.get('date', '')
-            
-            # Skip entries without dates
-            if not date_str:
-                continue
-                
-            # Parse the date
-            try:
-                post_date = datetime.datetime.strptime(date_str, '%Y-%m-%d').date()
-            except ValueError:
-                try:
-                    post_date = datetime.datetime.strptime(date_str, '%d %b %Y').date()
-                except ValueError:
-                    # If we can't parse the date, skip this entry
-                    continue
-            
-            # Calculate days difference
-            days_old = (today - post_date).days
-            
-            # Only keep entries that are exactly max_days old or newer
-            if 0 <= days_old <= max_days:
-                filtered.append(internship)
-                
-        except Exception as e:
-            print(f"Error processing date: {e}")
-            # Skip this entry if there's an error
+        # Dates are parsed when the file is read; skip entries without a (parseable) date
+        post_date = internship.date
+        
+        # Only keep entries that are exactly max_days old or newer
+        if post_date is not None and cutoff <= post_date <= today:
+            filtered.append(internship)
     
     print(f"After strict filtering: {len(filtered)} internships are {max_days} days old or newer")
     return filtered
@@ -228,20 +123,47 @@ def main() -> None:
         print("No internships to process")
         return
     
-    # Apply strict 3-day filtering
-    recent_internships = filter_by_date(internships, max_days=3)
+    # Apply strict 3-day filtering (or the longest window a subscriber asks for)
+    subscriptions = load_subscriptions(SUBSCRIPTIONS_FILE, CHAT_ID)
+    max_days = widest_window(subscriptions, MAX_DAYS)
+    recent_internships = filter_by_date(internships, max_days=max_days) if max_days >= 0 else internships
     
     if not recent_internships:
-        print("No internships within the 3-day limit to send")
+        print(f"No internships within the {max_days}-day limit to send")
         return
     
-    # Format the message
-    message = format_message(recent_internships, MAX_ENTRIES)
-    print(f"Formatted message with {min(len(recent_internships), MAX_ENTRIES)} internships")
+    assignments = SubscriptionIndex(subscriptions).assign(recent_internships, MAX_DAYS)
     
-    # Send to Telegram
-    print("Sending to Telegram...")
-    send_to_telegram(message)
+    store = JobStore(JOBS_DB_FILE)
+    try:
+        deliveries = []
+        for chat_id, chat_internships in assignments.items():
+            # Collapse reposts of the same internship into one entry listing every location,
+            # and skip postings this chat has already received
+            groups = store.unsent_groups(chat_id, group_near_duplicates(chat_internships))
+            if not groups:
+                print(f"Every recent internship has already been sent to chat {chat_id}")
+                continue
+            
+            # Format the message
+            pages = format_message([merge_group(group) for group in groups], MAX_ENTRIES)
+            print(f"Chat {chat_id}: formatted {len(pages)} message(s) with "
+                  f"{min(len(groups), MAX_ENTRIES)} new internships")
+            deliveries.append((chat_id, groups, pages))
+        
+        # Send to Telegram, chats in parallel within the bot's global budget
+        if deliveries:
+            print(f"Sending to {len(deliveries)} Telegram chat(s)...")
+            with TelegramClient(BOT_TOKEN) as client:
+                with ThreadPoolExecutor(max_workers=TELEGRAM_SEND_WORKERS) as executor:
+                    results = list(executor.map(
+                        lambda delivery: send_to_telegram(client, delivery[0], delivery[2]),
+                        deliveries))
+            for (chat_id, groups, _), success in zip(deliveries, results, strict=True):
+                if success:
+                    store.mark_sent(chat_id, itertools.chain.from_iterable(groups[:MAX_ENTRIES]))
+    finally:
+        store.close()
     
     print("=" * 60)
     print("COMPLETED")
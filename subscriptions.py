@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Chat Subscriptions
+------------------
+One scrape feeds many Telegram chats. subscriptions.json lists them, one
+entry per chat, each with its own profile:
+1. `keywords`: the title must contain one of them (whole words; a keyword of
+   several words needs all of them); none means every IT internship
+2. `countries`: one part of the location ("Berlin, Germany") must be one of
+   them; names in other languages ("Deutschland") count as the country
+3. `days`: how recent a posting must be (default: --days)
+
+Postings are matched against every subscriber at once: an inverted index
+maps title tokens and location parts to the subscribers asking for them, so
+a posting costs one lookup per token however many chats there are. Without
+subscriptions.json, CHAT_ID is the only subscriber and gets everything.
+"""
+import collections
+import datetime
+import json
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from internship_record import Internship, place_name
+from near_duplicates import TOKEN_PATTERN
+from posting_dates import date_window
+
+
+class Subscription(NamedTuple):
+    chat_id: str
+    keywords: Tuple[str, ...] = ()
+    countries: Tuple[str, ...] = ()
+    days: Optional[int] = None
+    name: str = ""
+
+
+def location_places(location: str) -> Set[str]:
+    """Every part of a location (or of each location of a merged group),
+    with country names normalized."""
+    return {place_name(part) for entry in location.split(';') for part in entry.split(',')
+            if part.strip()}
+
+
+def load_subscriptions(path: Path, default_chat_id: str) -> List[Subscription]:
+    """The subscribers listed in a JSON file, or only `default_chat_id`
+    (without filters) if the file is missing."""
+    if not path.exists():
+        return [Subscription(str(default_chat_id))]
+    with open(path, 'r', encoding='utf-8') as file:
+        entries = json.load(file)
+    subscriptions: Dict[str, Subscription] = {}
+    for entry in entries:
+        chat_id = str(entry['chat_id'])
+        if chat_id in subscriptions:
+            print(f"Warning: chat {chat_id} is subscribed twice in {path}; using the last entry")
+        days = entry.get('days')
+        subscriptions[chat_id] = Subscription(
+            chat_id,
+            tuple(keyword.lower() for keyword in entry.get('keywords', ())),
+            tuple(place_name(country) for country in entry.get('countries', ())),
+            int(days) if days is not None else None,
+            entry.get('name', ''))
+    return list(subscriptions.values())
+
+
+def widest_window(subscriptions: Iterable[Subscription], default_days: int) -> int:
+    """The --days window covering every subscriber's (-1: no limit)."""
+    windows = [default_days] + [subscription.days for subscription in subscriptions
+                                if subscription.days is not None]
+    return -1 if any(days < 0 for days in windows) else max(windows)
+
+
+class SubscriptionIndex:
+    """Inverted index from title tokens and places to the subscribers
+    asking for them."""
+
+    def __init__(self, subscriptions: Iterable[Subscription]) -> None:
+        self.subscriptions = list(subscriptions)
+        # First token of a keyword -> (subscriber, every token of the keyword)
+        self.keywords: Dict[str, List[Tuple[int, FrozenSet[str]]]] = collections.defaultdict(list)
+        self.places: Dict[str, Set[int]] = collections.defaultdict(set)
+        self.any_keyword: Set[int] = set()
+        self.any_place: Set[int] = set()
+        for number, subscription in enumerate(self.subscriptions):
+            keyword_tokens = [TOKEN_PATTERN.findall(keyword) for keyword in subscription.keywords]
+            keyword_tokens = [tokens for tokens in keyword_tokens if tokens]
+            for tokens in keyword_tokens:
+                self.keywords[tokens[0]].append((number, frozenset(tokens)))
+            if not keyword_tokens:
+                self.any_keyword.add(number)
+            for place in subscription.countries:
+                self.places[place].add(number)
+            if not subscription.countries:
+                self.any_place.add(number)
+
+    def match(self, internship: Internship) -> Set[int]:
+        """Numbers of the subscribers whose keywords and countries the
+        posting matches (the date is checked by `assign`)."""
+        tokens = set(TOKEN_PATTERN.findall(internship.title.lower()))
+        matched = set(self.any_keyword)
+        for token in tokens:
+            for number, needed in self.keywords.get(token, ()):
+                if needed <= tokens:
+                    matched.add(number)
+        if not matched:
+            return matched
+        placed = set(self.any_place)
+        for place in location_places(internship.location):
+            placed |= self.places.get(place, set())
+        return matched & placed
+
+    def assign(self, internships: Iterable[Internship], default_days: int,
+               today: Optional[datetime.date] = None) -> Dict[str, List[Internship]]:
+        """The postings of each subscriber's chat, in the order given. The
+        --days window is applied like iter_recent_internships does."""
+        windows: List[Optional[Tuple[datetime.date, datetime.date]]] = []
+        for subscription in self.subscriptions:
+            days = subscription.days if subscription.days is not None else default_days
+            if days < 0:
+                windows.append(None)
+                continue
+            cutoff, last_day = date_window(days, today)
+            windows.append((cutoff, last_day if days == 0 else datetime.date.max))
+        assigned: Dict[str, List[Internship]] = {
+            subscription.chat_id: [] for subscription in self.subscriptions}
+        for internship in internships:
+            for number in self.match(internship):
+                window = windows[number]
+                if window is None or (internship.date is not None
+                                      and window[0] <= internship.date <= window[1]):
+                    assigned[self.subscriptions[number].chat_id].append(internship)
+        return assigned
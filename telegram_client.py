@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+"""
+Telegram Delivery Client
+------------------------
+One Bot API client for it_internship.py and send_to_telegram.py (standard
+library only):
+1. Requests reuse a keep-alive HTTPS connection (one per thread) instead of
+   opening a new connection for every message and chunk
+2. Each chat has its own send budget (Telegram allows about one message per
+   second in a private chat and 20 per minute in a group or channel), so chunks
+   go out back to back until the budget is used, then wait just long enough;
+   the bot's global budget (30 messages per second) is shared by every chat,
+   so threads delivering to many chats at once stay within it together
+3. A 429 answer is retried after the `retry_after` seconds Telegram asks for;
+   dropped connections are reopened and retried with jittered backoff
+4. `paginate` packs message entries into pages under Telegram's 4096-character
+   limit before sending, so a long digest costs one request per page and is
+   never rejected as too long first
+
+TELEGRAM_API_URL points every client at another Bot API server, such as a
+local Bot API server or the stand-in of benchmarks/fake_telegram.py.
+"""
+import collections
+import http.client
+import itertools
+import json
+import os
+import threading
+import time
+import urllib.parse
+import uuid
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from pipeline_metrics import TELEGRAM_LATENCY, TELEGRAM_RATE_LIMITED
+from scrape_scheduler import backoff_delay
+
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+
+# (messages, seconds) a chat accepts; group and channel IDs are negative
+PRIVATE_CHAT_LIMIT = (1, 1.0)
+GROUP_CHAT_LIMIT = (20, 60.0)
+# (messages, seconds) a bot may send across all chats
+GLOBAL_LIMIT = (30, 1.0)
+# Windows are kept this much longer than Telegram's, so network jitter
+# never makes two messages land closer together than it allows
+SAFETY_MARGIN = 1.1
+
+# Longest text a single sendMessage accepts, in UTF-16 code units
+MESSAGE_LIMIT = 4096
+CAPTION_LIMIT = 1024
+BLOCK_SEPARATOR = "\n\n"
+PART_PREFIX = "Part {}/{}\n\n"
+
+
+def chat_limit(chat_id: str) -> Tuple[int, float]:
+    """The (messages, seconds) send budget of a chat."""
+    return GROUP_CHAT_LIMIT if str(chat_id).startswith('-') else PRIVATE_CHAT_LIMIT
+
+
+class ChatRateLimiter:
+    """Sliding-window send budget per chat, plus the bot's global budget,
+    shared by every thread. A message counts from when Telegram answered it
+    (see `sent`), as that is the latest it can have been accepted."""
+
+    def __init__(self, global_limit: Tuple[int, float] = GLOBAL_LIMIT) -> None:
+        self._sent: Dict[str, Deque[float]] = {}
+        self._global_limit = global_limit
+        self._global_sent: Deque[float] = collections.deque()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _delay(sent: Deque[float], limit: int, period: float, now: float) -> float:
+        """How long until a window allows one more message (0 if it does)."""
+        period *= SAFETY_MARGIN
+        while sent and now - sent[0] >= period:
+            sent.popleft()
+        return 0.0 if len(sent) < limit else period - (now - sent[0])
+
+    def wait(self, chat_id: str) -> float:
+        """Block until `chat_id` may receive another message, and reserve it.
+        Returns the reservation to pass to `sent`."""
+        limit, period = chat_limit(chat_id)
+        while True:
+            with self._lock:
+                sent = self._sent.setdefault(str(chat_id), collections.deque())
+                now = time.monotonic()
+                delay = max(self._delay(sent, limit, period, now),
+                            self._delay(self._global_sent, *self._global_limit, now))
+                if delay <= 0:
+                    sent.append(now)
+                    self._global_sent.append(now)
+                    return now
+            time.sleep(delay)
+
+    def sent(self, chat_id: str, reserved: float) -> None:
+        """Move a reserved message to now, when its answer arrived."""
+        with self._lock:
+            now = time.monotonic()
+            for sent in (self._sent.get(str(chat_id)), self._global_sent):
+                if sent is not None and reserved in sent:
+                    sent.remove(reserved)
+                    sent.append(now)
+
+    def hold(self, chat_id: str, seconds: float) -> None:
+        """Treat the chat's budget as used up for `seconds` (after a 429)."""
+        limit, period = chat_limit(chat_id)
+        with self._lock:
+            start = time.monotonic() + seconds - period
+            self._sent[str(chat_id)] = collections.deque([start] * limit)
+
+
+class TelegramClient:
+    """Bot API client with keep-alive connections and per-chat pacing."""
+
+    def __init__(self, bot_token: str, base_url: str = TELEGRAM_API_URL,
+                 timeout: float = 30.0, max_retries: int = 3) -> None:
+        self.bot_token = bot_token
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limiter = ChatRateLimiter()
+        self.stats = {"requests": 0, "retries": 0, "rate_limited": 0}
+
+        url = urllib.parse.urlsplit(base_url)
+        self._scheme = url.scheme
+        self._host = url.hostname
+        self._port = url.port
+        self._path = url.path.rstrip('/')
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+    def __enter__(self) -> "TelegramClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local.__dict__.clear()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection_class = (http.client.HTTPConnection if self._scheme == 'http'
+                                else http.client.HTTPSConnection)
+            connection = connection_class(self._host, self._port, timeout=self.timeout)
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+    def _drop_connection(self) -> None:
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+            with self._connections_lock:
+                if connection in self._connections:
+                    self._connections.remove(connection)
+
+    def _post(self, method: str, body: bytes, content_type: str) -> Dict[str, Any]:
+        connection = self._connection()
+        with TELEGRAM_LATENCY.time(method=method):
+            connection.request("POST", f"{self._path}/bot{self.bot_token}/{method}", body,
+                               headers={"Content-Type": content_type})
+            response = connection.getresponse()
+            data = response.read()
+        self.stats["requests"] += 1
+        try:
+            return json.loads(data.decode('utf-8'))
+        except ValueError:
+            return {"ok": False, "error_code": response.status,
+                    "description": data[:200].decode('utf-8', 'replace')}
+
+    def call(self, method: str, payload: Dict[str, Any],
+             chat_id: Optional[str] = None, body: Optional[bytes] = None,
+             content_type: str = "application/json") -> Dict[str, Any]:
+        """Call a Bot API method and return its JSON answer.
+
+        Waits for the chat's send budget first when `chat_id` is given. A 429 is
+        retried after its retry_after, a network error after a jittered backoff;
+        after `max_retries` retries the last answer (or error) is returned.
+        """
+        if body is None:
+            body = json.dumps(payload).encode('utf-8')
+        attempt = 0
+        while True:
+            if chat_id is not None:
+                reserved = self.rate_limiter.wait(chat_id)
+            try:
+                result = self._post(method, body, content_type)
+            except (http.client.HTTPException, OSError) as e:
+                if chat_id is not None:
+                    self.rate_limiter.sent(chat_id, reserved)
+                # Usually an idle keep-alive connection the server closed
+                self._drop_connection()
+                if attempt >= self.max_retries:
+                    return {"ok": False, "description": f"{type(e).__name__}: {e}"}
+                time.sleep(backoff_delay(attempt, base=0.5, cap=10.0) if attempt else 0)
+                attempt += 1
+                self.stats["retries"] += 1
+                continue
+
+            if chat_id is not None:
+                self.rate_limiter.sent(chat_id, reserved)
+            if result.get('ok') or result.get('error_code') != 429:
+                return result
+
+            self.stats["rate_limited"] += 1
+            TELEGRAM_RATE_LIMITED.inc(method=method)
+            retry_after = float(result.get('parameters', {}).get('retry_after', 1))
+            if attempt >= self.max_retries:
+                return result
+            print(f"Telegram rate limit hit, retrying in {retry_after:g}s")
+            if chat_id is not None:
+                self.rate_limiter.hold(chat_id, retry_after)
+            else:
+                time.sleep(retry_after)
+            attempt += 1
+            self.stats["retries"] += 1
+
+    def send_message(self, chat_id: str, text: str, **options: Any) -> Dict[str, Any]:
+        """sendMessage with link previews off; returns Telegram's answer."""
+        payload = {'chat_id': chat_id, 'text': text, 'disable_web_page_preview': True}
+        payload.update(options)
+        return self.call("sendMessage", payload, chat_id=chat_id)
+
+    def send_document(self, chat_id: str, filename: str, data: bytes,
+                      caption: str = "", mime_type: str = "application/octet-stream") -> Dict[str, Any]:
+        """sendDocument with an in-memory file; returns Telegram's answer."""
+        fields = {'chat_id': str(chat_id)}
+        if caption:
+            fields['caption'] = truncate(caption, CAPTION_LIMIT)
+        body, content_type = encode_multipart(fields, 'document', filename, data, mime_type)
+        return self.call("sendDocument", fields, chat_id=chat_id, body=body,
+                         content_type=content_type)
+
+    def send_messages(self, chat_id: str, texts: Iterable[str]) -> bool:
+        """Send messages to one chat in order, paced by its send budget:
+        one request per message unless Telegram asks to retry.
+        Returns True if every message was delivered."""
+        texts = list(texts)
+        success = True
+        for i, text in enumerate(texts):
+            result = self.send_message(chat_id, text)
+            if not result.get('ok'):
+                print(f"Failed to send part {i+1}/{len(texts)}. Response: {result}")
+                success = False
+            elif len(texts) > 1:
+                print(f"Part {i+1}/{len(texts)} sent successfully")
+        if success:
+            print(f"Message successfully sent to Telegram chat {chat_id}")
+        return success
+
+
+_shared_clients: Dict[Tuple[str, str], TelegramClient] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def shared_client(bot_token: str, base_url: str = TELEGRAM_API_URL) -> TelegramClient:
+    """The process-wide client for a bot, so long-running processes keep
+    their connections and chat budgets between runs."""
+    with _shared_clients_lock:
+        key = (bot_token, base_url)
+        if key not in _shared_clients:
+            _shared_clients[key] = TelegramClient(bot_token, base_url)
+        return _shared_clients[key]
+
+
+def encode_multipart(fields: Dict[str, str], file_field: str, filename: str,
+                     data: bytes, mime_type: str) -> Tuple[bytes, str]:
+    """Encode form fields and one file as multipart/form-data.
+    Returns (body, content type)."""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+                     f'{value}\r\n'.encode('utf-8'))
+    parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+                 f'filename="{filename}"\r\nContent-Type: {mime_type}\r\n\r\n'.encode('utf-8'))
+    parts.append(data)
+    parts.append(f'\r\n--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def telegram_length(text: str) -> int:
+    """Length of a text as Telegram counts it, in UTF-16 code units
+    (an emoji outside the BMP counts twice)."""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def truncate(text: str, limit: int) -> str:
+    """Cut a text to at most `limit` UTF-16 code units, never inside a character."""
+    if telegram_length(text) <= limit:
+        return text
+    text = text[:limit - 1]
+    while telegram_length(text) > limit - 1:
+        text = text[:-1]
+    return text + "…"
+
+
+def pack_blocks(blocks: List[str], budget: int) -> List[List[str]]:
+    """Group blocks in order into pages of at most `budget` UTF-16 code units."""
+    separator_length = telegram_length(BLOCK_SEPARATOR)
+    pages: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for block in blocks:
+        block = truncate(block, budget)
+        block_length = telegram_length(block)
+        if current and size + separator_length + block_length > budget:
+            pages.append(current)
+            current, size = [], 0
+        size += block_length + (separator_length if current else 0)
+        current.append(block)
+    if current:
+        pages.append(current)
+    return pages
+
+
+def paginate(entries: Iterable[str], header: str = "", footer: str = "",
+             limit: int = MESSAGE_LIMIT) -> List[str]:
+    """Pack message blocks into as few Telegram messages as possible.
+
+    The header opens the first page and the footer closes the last one; an
+    entry is never split across pages (an entry too long for any page is
+    truncated). With more than one page, each page starts with "Part i/n".
+    """
+    blocks = [block for block in itertools.chain([header], entries, [footer]) if block]
+    # Room is kept for a "Part i/n" prefix of up to 3 digits; a digest of
+    # 1000 pages or more is packed again with room for the longer prefix
+    digits = 3
+    while True:
+        pages = pack_blocks(blocks, limit - telegram_length(PART_PREFIX.format(*["9" * digits] * 2)))
+        if len(str(len(pages))) <= digits:
+            break
+        digits = len(str(len(pages)))
+
+    texts = [BLOCK_SEPARATOR.join(page) for page in pages]
+    if len(texts) > 1:
+        texts = [PART_PREFIX.format(i + 1, len(texts)) + text for i, text in enumerate(texts)]
+    return texts
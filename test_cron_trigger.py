@@ -0,0 +1,57 @@
+import datetime
+
+import pytest
+
+from cron_trigger import CronTrigger, parse_field
+
+
+def at(*args):
+    return datetime.datetime(*args)
+
+
+@pytest.mark.parametrize("field, lowest, highest, values", [
+    ("*", 0, 59, set(range(60))),
+    ("5", 0, 59, {5}),
+    ("1-5", 0, 7, {1, 2, 3, 4, 5}),
+    ("0,30", 0, 59, {0, 30}),
+    ("*/8", 0, 23, {0, 8, 16}),
+    ("9-17/2", 0, 23, {9, 11, 13, 15, 17}),
+    ("10/20", 0, 59, {10, 30, 50}),
+])
+def test_parse_field(field, lowest, highest, values):
+    assert parse_field(field, lowest, highest).values == values
+
+
+@pytest.mark.parametrize("expression", [
+    "* * * *", "* * * * * *", "60 * * * *", "* 24 * * *", "* * 0 * *",
+    "* * * 13 *", "* * * * 8", "5-1 * * * *", "*/0 * * * *", "x * * * *",
+])
+def test_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        CronTrigger(expression)
+
+
+@pytest.mark.parametrize("expression, moment, expected", [
+    # Strictly after: a moment on the trigger moves on to the next one
+    ("0 9 * * *", at(2024, 3, 8, 9, 0), at(2024, 3, 9, 9, 0)),
+    ("0 9 * * *", at(2024, 3, 8, 8, 59, 30), at(2024, 3, 8, 9, 0)),
+    ("*/8 * * * *", at(2024, 3, 8, 23, 59), at(2024, 3, 9, 0, 0)),
+    ("0 */8 * * *", at(2024, 3, 8, 8, 0), at(2024, 3, 8, 16, 0)),
+    # Weekdays: 2024-03-08 is a Friday
+    ("0 9 * * 1-5", at(2024, 3, 8, 9, 0), at(2024, 3, 11, 9, 0)),
+    ("30 6 * * 0", at(2024, 3, 8, 0, 0), at(2024, 3, 10, 6, 30)),
+    ("30 6 * * 7", at(2024, 3, 8, 0, 0), at(2024, 3, 10, 6, 30)),
+    # Both day fields restricted: either one matches
+    ("0 0 13 * 5", at(2024, 3, 8, 12, 0), at(2024, 3, 13, 0, 0)),
+    ("0 0 1 * 3", at(2024, 3, 1, 12, 0), at(2024, 3, 6, 0, 0)),
+    # Months and leap days
+    ("0 0 1 1 *", at(2024, 3, 8, 0, 0), at(2025, 1, 1, 0, 0)),
+    ("0 0 29 2 *", at(2024, 3, 1, 0, 0), at(2028, 2, 29, 0, 0)),
+])
+def test_next_after(expression, moment, expected):
+    assert CronTrigger(expression).next_after(moment) == expected
+
+
+def test_never_fires():
+    with pytest.raises(ValueError):
+        CronTrigger("0 0 31 2 *").next_after(at(2024, 1, 1))
@@ -0,0 +1,136 @@
+import datetime
+import sqlite3
+
+import pytest
+
+from internship_record import Internship, normalize_link
+from job_store import INDEX_VERSION, JobStore, earliest_date
+
+# The jobs table as the first job store created it, before link keys were
+# canonical and before the posting index (user_version 0)
+OLD_SCHEMA = """
+CREATE TABLE jobs (
+    id INTEGER PRIMARY KEY,
+    link_key TEXT NOT NULL,
+    company TEXT NOT NULL,
+    title TEXT NOT NULL,
+    location TEXT NOT NULL,
+    link TEXT NOT NULL,
+    date TEXT NOT NULL,
+    is_it INTEGER NOT NULL DEFAULT 0,
+    first_seen TEXT NOT NULL
+);
+CREATE UNIQUE INDEX idx_jobs_link_key ON jobs (link_key);
+"""
+
+
+def old_store(path, postings):
+    conn = sqlite3.connect(str(path))
+    conn.executescript(OLD_SCHEMA)
+    conn.executemany(
+        "INSERT INTO jobs (link_key, company, title, location, link, date, is_it, first_seen)"
+        " VALUES (?, ?, ?, ?, ?, ?, 1, '2024-01-01')",
+        [(normalize_link(link), company, title, location, link, date)
+         for company, title, location, link, date in postings])
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "output" / "jobs.db"
+
+
+def test_earliest_date():
+    assert earliest_date("2024-03-02", "2024-03-01") == "2024-03-01"
+    assert earliest_date("", "2024-03-01") == "2024-03-01"
+    assert earliest_date("2024-03-02", "") == "2024-03-02"
+    assert earliest_date("", "") == ""
+
+
+def test_old_store_is_migrated(db_path):
+    db_path.parent.mkdir()
+    old_store(db_path, [
+        ("Acme", "Backend Intern", "Berlin, Deutschland",
+         "https://www.linkedin.com/jobs/view/backend-intern-at-acme-123?trk=a", "2024-03-05"),
+        ("Acme", "Backend Intern", "Berlin, Germany",
+         "https://de.linkedin.com/jobs/view/123/", "2024-03-02"),
+        ("Beta", "Data Intern", "Paris, France", "https://jobs.beta.com/data-intern", ""),
+    ])
+
+    store = JobStore(db_path)
+    assert store.conn.execute("PRAGMA user_version").fetchone()[0] == INDEX_VERSION
+    rows = store.conn.execute(
+        "SELECT link_key, date, country FROM jobs ORDER BY id").fetchall()
+    # Both LinkedIn links are job 123: one row remains, with the earlier date
+    assert rows == [("linkedin:123", "2024-03-02", "germany"),
+                    ("jobs.beta.com/data-intern", "", "france")]
+    assert store.countries() == {"germany", "france"}
+    total, postings = store.search_postings(["backend"], country="germany")
+    assert (total, [job.company for job in postings]) == (1, ["Acme"])
+    store.close()
+
+    # A migrated store opens read-only, and is not migrated again
+    store = JobStore(db_path, read_only=True)
+    assert store.count() == 2
+    store.close()
+
+
+def test_read_only_refuses_an_old_store(db_path):
+    db_path.parent.mkdir()
+    old_store(db_path, [])
+    with pytest.raises(sqlite3.OperationalError):
+        JobStore(db_path, read_only=True)
+
+
+def test_rekey_links_keeps_a_known_date(db_path):
+    store = JobStore(db_path)
+    store.conn.executemany(
+        "INSERT INTO jobs (link_key, company, title, location, link, date, first_seen)"
+        " VALUES (?, 'Acme', 'Intern', 'Berlin, Germany', ?, ?, '2024-01-01')",
+        [("old-a", "https://www.linkedin.com/jobs/view/7", ""),
+         ("old-b", "https://linkedin.com/jobs/view/intern-7?refId=x", "2024-02-01"),
+         ("old-c", "https://example.com/job/8/", "")])
+    assert store.rekey_links() == 1
+    assert store.conn.execute("SELECT link_key, date FROM jobs ORDER BY id").fetchall() == [
+        ("linkedin:7", "2024-02-01"), ("example.com/job/8", "")]
+    store.close()
+
+
+def test_rekey_links_swaps_keys(db_path):
+    store = JobStore(db_path)
+    # Each row holds the key the other one should get
+    store.conn.executemany(
+        "INSERT INTO jobs (link_key, company, title, location, link, date, first_seen)"
+        " VALUES (?, 'Acme', 'Intern', '', ?, '', '2024-01-01')",
+        [("example.com/b", "https://example.com/a"), ("example.com/a", "https://example.com/b")])
+    assert store.rekey_links() == 0
+    assert store.conn.execute("SELECT link_key, link FROM jobs ORDER BY id").fetchall() == [
+        ("example.com/a", "https://example.com/a"), ("example.com/b", "https://example.com/b")]
+    store.close()
+
+
+def test_upsert_keeps_the_earliest_known_date(db_path):
+    store = JobStore(db_path)
+    link = "https://www.linkedin.com/jobs/view/42"
+
+    def scrape(date):
+        store.upsert_many([Internship("Acme", "Cloud Intern", "Lyon, France", link, date)],
+                          lambda title: True)
+        return store.conn.execute("SELECT date FROM jobs").fetchone()[0]
+
+    assert scrape(None) == ""
+    assert scrape(datetime.date(2024, 5, 3)) == "2024-05-03"
+    assert scrape(datetime.date(2024, 5, 1)) == "2024-05-01"
+    assert scrape(datetime.date(2024, 5, 4)) == "2024-05-01"
+    assert scrape(None) == "2024-05-01"
+    store.close()
+
+
+def test_filtered_links(db_path):
+    store = JobStore(db_path)
+    store.add_filtered_links(["a", "b", ""])
+    assert store.filtered_link_keys(["a", "c"]) == {"a"}
+    store.add_filtered_links(["c"], replace=True)
+    assert store.filtered_link_keys(["a", "b", "c"]) == {"c"}
+    store.close()
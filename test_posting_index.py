@@ -0,0 +1,66 @@
+import pytest
+
+from posting_index import PostingQuery, parse_query
+
+COUNTRIES = {"germany", "france", "united states"}
+
+
+@pytest.mark.parametrize("question, days", [
+    ("backend interns this week", 7),
+    ("backend interns last 30 days", 30),
+    ("backend interns in the past 2 weeks", 14),
+    ("backend interns since 3 days ago", 3),
+    ("backend interns this month", 30),
+    ("backend interns yesterday", 1),
+    ("backend interns today", 0),
+    ("backend interns", None),
+])
+def test_time_phrases(question, days):
+    query = parse_query(question, COUNTRIES)
+    assert query.days == days
+    assert query.terms == ("backend",)
+
+
+def test_country_after_in():
+    assert parse_query("backend interns in germany this week", COUNTRIES) == PostingQuery(
+        terms=("backend",), country="germany", days=7)
+
+
+def test_country_in_its_own_language():
+    assert parse_query("data in Deutschland", COUNTRIES).country == "germany"
+
+
+def test_two_word_country():
+    query = parse_query("cloud intern united states yesterday", COUNTRIES)
+    assert query.country == "united states"
+    assert query.terms == ("cloud",)
+
+
+def test_unknown_place_stays_a_term():
+    query = parse_query("backend in narnia", COUNTRIES)
+    assert query.country == ""
+    assert query.terms == ("backend", "narnia")
+
+
+def test_companies_report():
+    assert parse_query("top companies last 30 days", COUNTRIES) == PostingQuery(
+        days=30, report="companies", limit=10)
+
+
+def test_top_count_sets_the_limit():
+    query = parse_query("top 5 companies in france", COUNTRIES)
+    assert (query.report, query.limit, query.country) == ("companies", 5, "france")
+
+
+def test_dates_report_with_company():
+    query = parse_query("data at Capgemini per day", COUNTRIES)
+    assert (query.terms, query.company, query.report) == (("data",), "capgemini", "dates")
+
+
+def test_company_ends_at_the_next_phrase():
+    query = parse_query("security jobs from SAP in germany today", COUNTRIES)
+    assert (query.company, query.country, query.days) == ("sap", "germany", 0)
+
+
+def test_terms_are_index_terms():
+    assert parse_query("show me python developers", COUNTRIES).terms == ("python", "developer")
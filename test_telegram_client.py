@@ -0,0 +1,104 @@
+import pytest
+
+import telegram_client
+from telegram_client import (
+    MESSAGE_LIMIT, SAFETY_MARGIN, ChatRateLimiter, paginate, telegram_length, truncate
+)
+
+
+class FakeClock:
+    """Stands in for the time module: sleeping moves the clock on, and like
+    a real sleep slightly overshoots."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds + 1e-6
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(telegram_client, "time", clock)
+    return clock
+
+
+def send(limiter, chat_id, count):
+    """Send `count` messages, answered at once; returns when each was sent."""
+    times = []
+    for _ in range(count):
+        limiter.sent(chat_id, limiter.wait(chat_id))
+        times.append(telegram_client.time.monotonic())
+    return times
+
+
+def test_private_chat_gets_one_message_per_second(clock):
+    times = send(ChatRateLimiter(), "12345", 3)
+    assert times == pytest.approx(
+        [100.0, 100.0 + SAFETY_MARGIN, 100.0 + 2 * SAFETY_MARGIN], abs=1e-3)
+
+
+def test_group_chat_gets_twenty_messages_per_minute(clock):
+    times = send(ChatRateLimiter(), "-100123", 21)
+    assert times[:20] == [100.0] * 20
+    assert times[20] == pytest.approx(100.0 + 60 * SAFETY_MARGIN, abs=1e-3)
+
+
+def test_chats_share_the_global_budget(clock):
+    limiter = ChatRateLimiter(global_limit=(2, 1.0))
+    times = [send(limiter, chat_id, 1)[0] for chat_id in ("1", "2", "3")]
+    assert times == pytest.approx([100.0, 100.0, 100.0 + SAFETY_MARGIN], abs=1e-3)
+
+
+def test_hold_after_too_many_requests(clock):
+    limiter = ChatRateLimiter()
+    limiter.hold("-100123", 30)
+    # The full window (with its safety margin) runs from 30s before the hold ends
+    assert send(limiter, "-100123", 1) == pytest.approx(
+        [130.0 + 60 * (SAFETY_MARGIN - 1)], abs=1e-3)
+
+
+def test_telegram_length_counts_utf16_units():
+    assert telegram_length("abc") == 3
+    assert telegram_length("é") == 1
+    assert telegram_length("🚀") == 2
+
+
+def test_truncate_never_splits_a_character():
+    assert truncate("🚀" * 10, 6) == "🚀🚀…"
+    assert truncate("short", 10) == "short"
+
+
+def test_single_page_has_no_part_prefix():
+    assert paginate(["one", "two"], header="Header", footer="Footer") == [
+        "Header\n\none\n\ntwo\n\nFooter"]
+
+
+def test_pages_fit_the_limit_in_utf16_units():
+    # Emoji count twice, so a page of them holds half as many characters
+    entries = [f"🚀 Posting {i} " + "🔥" * 150 for i in range(100)]
+    pages = paginate(entries, header="New internships", footer="That's all")
+    assert len(pages) > 1
+    assert all(telegram_length(page) <= MESSAGE_LIMIT for page in pages)
+    assert pages[0].startswith(f"Part 1/{len(pages)}\n\nNew internships")
+    assert pages[-1].endswith("That's all")
+    # Every entry is on exactly one page, in order
+    text = "".join(pages)
+    positions = [text.index(f"Posting {i} ") for i in range(100)]
+    assert positions == sorted(positions)
+
+
+def test_entry_longer_than_a_page_is_truncated():
+    pages = paginate(["x" * 10000, "tail"])
+    assert len(pages) == 2
+    assert all(telegram_length(page) <= MESSAGE_LIMIT for page in pages)
+    assert "…" in pages[0]
+
+
+def test_custom_limit():
+    pages = paginate([f"entry {i}" for i in range(50)], limit=100)
+    assert all(telegram_length(page) <= 100 for page in pages)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""
+Job Title Classifier
+--------------------
+Decides whether a job title is an IT engineering internship/alternance.
+
+All keyword sets are compiled once into a single regular expression:
+1. Keywords only match as whole words, so "it" no longer matches inside
+   "security" or "recruiter"
+2. The alternation is built from a character trie, so shared prefixes
+   ("intern", "internship") are only tried once per position
+3. One scan of the title returns all three verdicts (IT, internship, excluded)
+
+Both it_internship.py and enhance_filtering.py use this module, so they
+always agree on what counts as an IT engineering internship.
+"""
+import re
+from typing import Dict, Iterable, List, NamedTuple
+
+# IT Engineering keywords for filtering
+IT_KEYWORDS = [
+    "software", "developer", "development", "engineering", "it", "tech",
+    "computer", "programming", "web", "mobile", "data", "devops", "cloud",
+    "fullstack", "backend", "frontend", "qa", "sde", "swe", "code", "coding",
+    "systems", "cybersecurity", "database", "application", "ai", "machine learning",
+    "computer science", "data science", "python", "java", "javascript", "typescript",
+    "c++", "c#", "react", "angular", "node", "aws", "azure", "docker", "kubernetes",
+    "gitlab", "github"
+]
+
+# Internship/alternance keywords
+INTERNSHIP_KEYWORDS = ["intern", "internship", "alternance", "stage", "trainee"]
+
+# Exclusion terms - positions we don't want even if they match other criteria
+EXCLUDE_TERMS = [
+    "non-tech", "non tech", "accounting", "finance", "sales", "marketing",
+    "recruiter", "hr", "human resources", "administrative", "business development"
+]
+
+IT_FLAG = 1
+INTERNSHIP_FLAG = 2
+EXCLUDED_FLAG = 4
+ALL_FLAGS = IT_FLAG | INTERNSHIP_FLAG | EXCLUDED_FLAG
+
+# Plural forms are only generated for real words, so "it" never matches "its"
+MIN_PLURAL_LENGTH = 4
+
+
+class TitleVerdict(NamedTuple):
+    """The three keyword verdicts for one job title."""
+    is_it: bool
+    is_internship: bool
+    is_excluded: bool
+
+    @property
+    def is_it_internship(self) -> bool:
+        """IT and internship, without any exclusion term."""
+        return self.is_it and self.is_internship and not self.is_excluded
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Build a regex alternation for `words` that shares common prefixes."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A word ends here, so the rest of the branch is optional
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+class TitleClassifier:
+    """Single-pass, whole-word keyword classifier for job titles."""
+
+    def __init__(self, it_keywords: List[str], internship_keywords: List[str],
+                 exclude_terms: List[str]) -> None:
+        flags: Dict[str, int] = {}
+        for keywords, flag in ((it_keywords, IT_FLAG),
+                               (internship_keywords, INTERNSHIP_FLAG),
+                               (exclude_terms, EXCLUDED_FLAG)):
+            for keyword in keywords:
+                keyword = keyword.strip().lower()
+                flags[keyword] = flags.get(keyword, 0) | flag
+                if len(keyword) >= MIN_PLURAL_LENGTH and keyword[-1].isalpha():
+                    plural = keyword + 's'
+                    flags[plural] = flags.get(plural, 0) | flag
+
+        # Longer phrases win over the words inside them ("business development"
+        # over "development"), so give each phrase the verdicts of its words too
+        for term in flags:
+            if ' ' in term or '-' in term:
+                for other, other_flags in list(flags.items()):
+                    if other != term and re.search(rf'(?<!\w){re.escape(other)}(?!\w)', term):
+                        flags[term] |= other_flags
+
+        self.flags = flags
+        self.pattern = re.compile(rf'(?<!\w){trie_pattern(flags)}(?!\w)')
+
+    def match_flags(self, title: str) -> int:
+        """Return the OR of the verdict flags of every keyword in the title."""
+        flags = self.flags
+        matched = 0
+        for term in self.pattern.findall(title.lower()):
+            matched |= flags[term]
+        return matched
+
+    def classify(self, title: str) -> TitleVerdict:
+        """Return the IT, internship and exclusion verdicts for a title."""
+        matched = self.match_flags(title)
+        return TitleVerdict(bool(matched & IT_FLAG),
+                            bool(matched & INTERNSHIP_FLAG),
+                            bool(matched & EXCLUDED_FLAG))
+
+    def is_it_internship(self, title: str) -> bool:
+        """IT and internship, without any exclusion term."""
+        return self.match_flags(title) & ALL_FLAGS == IT_FLAG | INTERNSHIP_FLAG
+
+
+DEFAULT_CLASSIFIER = TitleClassifier(IT_KEYWORDS, INTERNSHIP_KEYWORDS, EXCLUDE_TERMS)
+
+
+def classify_title(title: str) -> TitleVerdict:
+    """Classify a title with the default keyword sets."""
+    return DEFAULT_CLASSIFIER.classify(title)
+
+
+def is_it_engineering_internship(title: str) -> bool:
+    """Check if a job title is an IT engineering internship/alternance."""
+    if not title:
+        return False
+    return DEFAULT_CLASSIFIER.is_it_internship(title)